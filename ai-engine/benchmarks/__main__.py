@@ -0,0 +1,77 @@
+"""Run ai-engine benchmarks and write results as JSON.
+
+Usage (from the ai-engine directory):
+
+    python -m benchmarks micro --sizes 10,1000,100000
+    python -m benchmarks load --endpoints chat,career-match --concurrency 100 --llm-latency-ms 300
+    python -m benchmarks all --output bench_results.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return "unknown"
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="OpportunityAI Engine benchmarks")
+    parser.add_argument("suite", choices=["micro", "load", "all"])
+    parser.add_argument("--sizes", default="10,1000,10000,100000",
+                        help="Comma-separated synthetic catalog sizes for microbenchmarks")
+    parser.add_argument("--iterations", type=int, default=10000, help="Calls per microbenchmark")
+    parser.add_argument("--endpoints", default="chat,career-match,recommendations")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--with-cache", action="store_true", help="Keep the completion cache enabled")
+    parser.add_argument("--output", default="bench_results.json")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    logging.basicConfig(level=logging.INFO)
+    # Keep per-request service logs out of the measurements
+    for name in ("main", "httpx", "services"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args)
+        },
+        "micro": [],
+        "load": []
+    }
+
+    if args.suite in ("micro", "all"):
+        from benchmarks.micro import run_micro
+        sizes = [int(size) for size in args.sizes.split(",") if size]
+        results["micro"] = run_micro(sizes, args.iterations)
+
+    if args.suite in ("load", "all"):
+        from benchmarks.load import run_load
+        endpoints = [endpoint for endpoint in args.endpoints.split(",") if endpoint]
+        results["load"] = asyncio.run(run_load(
+            endpoints, args.requests, args.concurrency, args.llm_latency_ms,
+            llm_error_rate=args.llm_error_rate, use_cache=args.with_cache
+        ))
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+from typing import List, Dict, Any
+import asyncio
+import time
+import logging
+
+import httpx
+
+from benchmarks.stats import summarize
+from benchmarks.stub_openai import StubOpenAITransport, install_stub
+from benchmarks.synthetic import MESSAGES, synthetic_profiles
+
+logger = logging.getLogger(__name__)
+
+ENDPOINTS = ["chat", "career-match", "recommendations"]
+
+def request_for(endpoint: str, i: int, unique_messages: bool) -> Dict[str, Any]:
+    """Build the path and JSON body for the i-th request against an endpoint"""
+    if endpoint == "chat":
+        message = MESSAGES[i % len(MESSAGES)]
+        if unique_messages:
+            message = f"{message} (request {i})"
+        return {"path": "/chat", "json": {"message": message, "conversation_history": []}}
+    if endpoint == "career-match":
+        profile = synthetic_profiles(1, seed=i)[0]
+        return {"path": "/career-match", "json": profile}
+    if endpoint == "recommendations":
+        interest_sets = [["technology"], ["aviation", "mechanics"], ["medical", "leadership"]]
+        return {"path": "/recommendations", "json": {"interests": interest_sets[i % len(interest_sets)]}}
+    raise ValueError(f"Unknown endpoint: {endpoint}")
+
+async def run_endpoint(app, endpoint: str, requests: int, concurrency: int,
+                       unique_messages: bool) -> Dict[str, Any]:
+    """Drive one endpoint through the ASGI app with a fixed number of concurrent workers"""
+    durations: List[float] = []
+    statuses: Dict[str, int] = {}
+    next_index = 0
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                                 timeout=None) as client:
+        async def worker():
+            nonlocal next_index
+            while next_index < requests:
+                i = next_index
+                next_index += 1
+                spec = request_for(endpoint, i, unique_messages)
+                start = time.perf_counter()
+                response = await client.post(spec["path"], json=spec["json"])
+                durations.append((time.perf_counter() - start) * 1000)
+                statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    result = {
+        "benchmark": f"load.{endpoint}",
+        "params": {"requests": requests, "concurrency": concurrency},
+        "status_codes": statuses,
+        **summarize(durations, elapsed)
+    }
+    result["requests_per_second"] = result.pop("ops_per_second")
+    logger.info(f"{endpoint}: p50={result['p50_ms']}ms p95={result['p95_ms']}ms p99={result['p99_ms']}ms "
+                f"({result['requests_per_second']} req/s)")
+    return result
+
+async def run_load(endpoints: List[str], requests: int, concurrency: int, llm_latency_ms: float,
+                   llm_error_rate: float = 0.0, use_cache: bool = False) -> List[Dict[str, Any]]:
+    """Load-test the ai-engine app in-process against a stubbed OpenAI backend"""
+    import main
+
+    main.build_services()
+    transport = StubOpenAITransport(latency_ms=llm_latency_ms, error_rate=llm_error_rate, seed=1)
+    install_stub(main.chat_service, transport)
+    if not use_cache:
+        main.chat_service.completion_cache = None
+
+    results = []
+    # ASGITransport does not run lifespan events, so start the app's services here
+    async with main.lifespan(main.app):
+        await main.wait_until_ready()
+        for endpoint in endpoints:
+            result = await run_endpoint(main.app, endpoint, requests, concurrency, unique_messages=not use_cache)
+            result["params"].update({"llm_latency_ms": llm_latency_ms, "llm_error_rate": llm_error_rate,
+                                     "completion_cache": use_cache})
+            results.append(result)
+    return results
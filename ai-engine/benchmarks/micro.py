@@ -0,0 +1,104 @@
+from typing import List, Dict, Any, Callable
+import asyncio
+import time
+import logging
+
+from services.career_matcher import CareerMatcher, CareerCatalogSnapshot
+from services.recommendation_engine import RecommendationEngine
+from services.chat_service import ChatService
+from services.semantic_index import HashedNgramEncoder
+from benchmarks.stats import summarize
+from benchmarks.synthetic import synthetic_catalog, synthetic_profiles, MESSAGES
+
+logger = logging.getLogger(__name__)
+
+def measure(name: str, operation: Callable[[int], Any], iterations: int, **params) -> Dict[str, Any]:
+    """Time each call of operation(i) and summarize"""
+    durations = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        op_start = time.perf_counter()
+        operation(i)
+        durations.append((time.perf_counter() - op_start) * 1000)
+    elapsed = time.perf_counter() - start
+    result = {"benchmark": name, "params": params, **summarize(durations, elapsed)}
+    logger.info(f"{name} {params}: p50={result['p50_ms']}ms p99={result['p99_ms']}ms "
+                f"({result['ops_per_second']} ops/s)")
+    return result
+
+def matcher_for(size: int, scoring_mode: str = "index") -> CareerMatcher:
+    matcher = CareerMatcher()
+    encoder = HashedNgramEncoder() if scoring_mode == "semantic" else None
+    matcher.snapshot = CareerCatalogSnapshot.build(synthetic_catalog(size), version=f"synthetic-{size}",
+                                                   semantic_encoder=encoder)
+    matcher.scoring_mode = scoring_mode
+    return matcher
+
+def bench_match_score(sizes: List[int], iterations: int) -> List[Dict[str, Any]]:
+    """CareerMatcher._calculate_match_score, one call per career per profile"""
+    results = []
+    profiles = synthetic_profiles(64)
+    for size in sizes:
+        matcher = matcher_for(size)
+        careers = matcher.career_database
+        calls = min(iterations, len(careers) * len(profiles))
+
+        def operation(i):
+            profile = profiles[i % len(profiles)]
+            matcher._calculate_match_score(careers[i % len(careers)], profile["interests"], profile["skills"])
+
+        results.append(measure("career_matcher._calculate_match_score", operation, calls, catalog_size=size))
+    return results
+
+def bench_find_matching(sizes: List[int], iterations: int) -> List[Dict[str, Any]]:
+    """CareerMatcher.find_matching_careers over the whole catalog, per scoring mode"""
+    results = []
+    profiles = synthetic_profiles(256)
+    loop = asyncio.new_event_loop()
+    try:
+        for size in sizes:
+            for mode in ("index", "vector", "semantic"):
+                matcher = matcher_for(size, mode)
+
+                def operation(i):
+                    profile = profiles[i % len(profiles)]
+                    loop.run_until_complete(matcher.find_matching_careers(
+                        profile["interests"], profile["skills"], profile["education_level"]
+                    ))
+
+                results.append(measure("career_matcher.find_matching_careers", operation, iterations,
+                                       catalog_size=size, scoring_mode=mode))
+    finally:
+        loop.close()
+    return results
+
+def bench_analyze_message(iterations: int) -> List[Dict[str, Any]]:
+    """ChatService.analyze_message over a fixed message mix"""
+    chat_service = ChatService()
+
+    def operation(i):
+        chat_service.analyze_message(MESSAGES[i % len(MESSAGES)])
+
+    return [measure("chat_service.analyze_message", operation, iterations, messages=len(MESSAGES))]
+
+def bench_recommendations(iterations: int) -> List[Dict[str, Any]]:
+    """RecommendationEngine.get_recommendations for common interest sets"""
+    engine = RecommendationEngine()
+    interest_sets = [["technology"], ["aviation", "mechanics"], ["medical", "leadership", "technology"], []]
+    loop = asyncio.new_event_loop()
+    try:
+        def operation(i):
+            loop.run_until_complete(engine.get_recommendations(interest_sets[i % len(interest_sets)]))
+
+        return [measure("recommendation_engine.get_recommendations", operation, iterations,
+                        interest_sets=len(interest_sets))]
+    finally:
+        loop.close()
+
+def run_micro(sizes: List[int], iterations: int) -> List[Dict[str, Any]]:
+    results = []
+    results += bench_match_score(sizes, iterations)
+    results += bench_find_matching(sizes, max(iterations // 10, 1))
+    results += bench_analyze_message(iterations)
+    results += bench_recommendations(iterations)
+    return results
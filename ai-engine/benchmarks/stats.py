@@ -0,0 +1,23 @@
+from typing import List, Dict, Any
+import math
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(math.ceil(pct / 100.0 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+def summarize(durations_ms: List[float], elapsed_seconds: float) -> Dict[str, Any]:
+    """Latency percentiles and throughput for a list of per-operation durations"""
+    values = sorted(durations_ms)
+    count = len(values)
+    return {
+        "count": count,
+        "mean_ms": round(sum(values) / count, 4) if count else 0.0,
+        "p50_ms": round(percentile(values, 50), 4),
+        "p95_ms": round(percentile(values, 95), 4),
+        "p99_ms": round(percentile(values, 99), 4),
+        "max_ms": round(values[-1], 4) if count else 0.0,
+        "ops_per_second": round(count / elapsed_seconds, 2) if elapsed_seconds > 0 else 0.0
+    }
@@ -0,0 +1,81 @@
+from typing import Optional
+import asyncio
+import json
+import random
+import time
+
+import httpx
+import openai
+
+COMPLETION_TEXT = (
+    "Great question! Military aviation and technology careers offer world-class training, "
+    "and those skills translate directly into civilian jobs. What interests you most?"
+)
+
+class StubOpenAITransport(httpx.AsyncBaseTransport):
+    """In-process stand-in for the OpenAI chat completions API.
+
+    Every request sleeps for the configured latency (plus jitter) and returns
+    a canned completion, streamed as SSE when the request asks for it. A
+    fraction of requests can fail with a 500 to exercise the fallback path.
+    """
+
+    def __init__(self, latency_ms: float = 300, jitter_ms: float = 50, error_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        delay = max(self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms), 0) / 1000
+        await asyncio.sleep(delay)
+
+        if self.rng.random() < self.error_rate:
+            return httpx.Response(500, json={"error": {"message": "stub failure", "type": "server_error"}})
+
+        body = json.loads(request.content or b"{}")
+        model = body.get("model", "gpt-3.5-turbo")
+        if body.get("stream"):
+            return httpx.Response(200, headers={"content-type": "text/event-stream"},
+                                  content=self._stream_body(model))
+
+        return httpx.Response(200, json={
+            "id": f"chatcmpl-stub-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": COMPLETION_TEXT},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 300, "completion_tokens": 40, "total_tokens": 340}
+        })
+
+    def _stream_body(self, model: str) -> bytes:
+        frames = []
+        for word in COMPLETION_TEXT.split(" "):
+            chunk = {
+                "id": f"chatcmpl-stub-{self.requests}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]
+            }
+            frames.append(f"data: {json.dumps(chunk)}\n\n")
+        frames.append("data: [DONE]\n\n")
+        return "".join(frames).encode()
+
+def install_stub(chat_service, transport: StubOpenAITransport):
+    """Point a ChatService at the stub transport through the real OpenAI client"""
+    chat_service.http_client = httpx.AsyncClient(transport=transport)
+    chat_service.client = openai.AsyncOpenAI(
+        api_key="sk-benchmark-stub",
+        base_url="http://stub-openai/v1",
+        http_client=chat_service.http_client,
+        max_retries=0
+    )
+    chat_service.openai_available = True
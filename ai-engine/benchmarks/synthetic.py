@@ -0,0 +1,69 @@
+from typing import List
+import random
+
+from services.career_matcher import CareerPath
+
+BRANCHES = ["Army", "Navy", "Air Force", "Marine Corps", "Coast Guard", "Space Force"]
+SERVICE_TYPES = ["Active Duty", "National Guard", "Reserve"]
+DIFFICULTY_LEVELS = ["easy", "moderate", "challenging"]
+
+KEYWORDS = [
+    "cyber", "technology", "computer", "security", "IT", "networks", "aviation", "aircraft",
+    "mechanical", "repair", "maintenance", "hands-on", "medical", "healthcare", "help people",
+    "emergency", "first aid", "analysis", "research", "investigation", "data", "intelligence",
+    "problem-solving", "logistics", "organization", "management", "coordination", "planning",
+    "electronics", "radio", "signals", "communication", "engineering", "construction", "diving",
+    "ocean", "driving", "vehicles", "law enforcement", "firefighting", "cooking", "finance",
+    "languages", "translation", "photography", "music", "weather", "space", "satellites", "drones"
+]
+
+MESSAGES = [
+    "hi",
+    "what jobs are there in aviation",
+    "I like fixing engines and working with my hands",
+    "I'm interested in cybersecurity and IT work",
+    "Do you have medical or healthcare careers?",
+    "I want to lead people and manage a team someday",
+    "I want to travel the world and see different places",
+    "I enjoy radio, signals and network communication",
+    "Tell me about the benefits and training for engineering roles",
+    "I'm not sure what I want to do yet, what are my options?"
+]
+
+def synthetic_catalog(size: int, seed: int = 42) -> List[CareerPath]:
+    """Generate a reproducible catalog of synthetic career paths"""
+    rng = random.Random(seed)
+    careers = []
+    for i in range(size):
+        keywords = rng.sample(KEYWORDS, rng.randint(3, 7))
+        low = rng.randrange(35, 90) * 1000
+        careers.append(CareerPath(
+            id=f"synthetic-{i}",
+            title=f"{keywords[0].title()} Specialist {i}",
+            branch=rng.choice(BRANCHES),
+            service_type=rng.choice(SERVICE_TYPES),
+            description=f"Synthetic career focused on {', '.join(keywords)}.",
+            requirements=["High school diploma"],
+            training_duration=f"{rng.randint(2, 12)} months",
+            civilian_translation={
+                "job_titles": [f"{keywords[0].title()} Technician"],
+                "average_salary": f"${low:,} - ${low + rng.randrange(20, 60) * 1000:,}",
+                "growth_outlook": "Good",
+                "certifications": []
+            },
+            match_keywords=keywords,
+            difficulty_level=rng.choice(DIFFICULTY_LEVELS)
+        ))
+    return careers
+
+def synthetic_profiles(count: int, seed: int = 7) -> List[dict]:
+    """Generate reproducible interest/skill profiles"""
+    rng = random.Random(seed)
+    return [
+        {
+            "interests": rng.sample(KEYWORDS, rng.randint(1, 4)),
+            "skills": rng.sample(KEYWORDS, rng.randint(0, 3)),
+            "education_level": "high_school"
+        }
+        for _ in range(count)
+    ]
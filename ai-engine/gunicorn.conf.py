@@ -0,0 +1,49 @@
+# Multi-worker launcher: gunicorn -c gunicorn.conf.py main:app
+#
+# The services and the catalog snapshots are built once in the
+# master process, then workers are forked and share those pages
+# copy-on-write. gc.freeze() moves everything built so far out of the
+# collector's reach, so garbage collection in a worker does not touch (and
+# copy) the shared objects. The semantic index matrix is memory-mapped and
+# shared through the page cache regardless.
+import asyncio
+import gc
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', str(multiprocessing.cpu_count())))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+accesslog = None
+
+# Prometheus metrics from every worker are aggregated through files in a
+# shared directory; it must be set before prometheus_client is imported
+if workers > 1 and not os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = os.path.join(tempfile.gettempdir(), 'ai-engine-metrics')
+if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+    shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+def when_ready(server):
+    """Build catalog snapshots in the master before any worker is forked"""
+    import main
+
+    main.build_services()
+    asyncio.run(main.load_catalogs())
+    gc.collect()
+    gc.freeze()
+    server.log.info(
+        f"Preloaded {len(main.career_matcher.career_database)} careers "
+        f"for {workers} workers"
+    )
+
+def child_exit(server, worker):
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
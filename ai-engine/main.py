@@ -1,15 +1,35 @@
-from fastapi import FastAPI, HTTPException
+import time
+
+# Cold-start time is measured from here, before the heavy imports below
+PROCESS_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from fastapi.responses import StreamingResponse, Response, JSONResponse
+from pydantic import BaseModel, ValidationError
+from typing import List, Optional, Dict, Any, AsyncIterator, Tuple
 import os
+import json
+import asyncio
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 import logging
 from datetime import datetime
 
 from services.chat_service import ChatService
+from services.message_matcher import MessageSignals
 from services.career_matcher import CareerMatcher
+from services.career_forecast import CareerForecaster
 from services.recommendation_engine import RecommendationEngine
+from services.catalog import CatalogSource, SnapshotRefresher
+from services.conversation_store import ConversationStore
+from services.database import close_databases
+from services.write_behind import WriteBehindQueue
+from services.result_recorder import ResultRecorder
+from services.catalog_artifact import read_artifact
+from services.responses import FastJSONResponse, ResponseCompressor, dumps_str, FAST_JSON_ENABLED
+from services.metrics import MetricsMiddleware, register_stats, multiprocess_registry, STARTUP_SECONDS
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 
 load_dotenv()
 
@@ -17,10 +37,161 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+catalog_source = CatalogSource.from_env()
+response_compressor = ResponseCompressor.from_env()
+catalog_refresh_seconds = float(os.getenv('CATALOG_REFRESH_SECONDS', '300'))
+
+# Service singletons, built during startup by build_services()
+services_built = False
+chat_service: Optional[ChatService] = None
+write_behind: Optional[WriteBehindQueue] = None
+conversation_store: Optional[ConversationStore] = None
+result_recorder: Optional[ResultRecorder] = None
+career_matcher: Optional[CareerMatcher] = None
+recommendation_engine: Optional[RecommendationEngine] = None
+career_forecaster: Optional[CareerForecaster] = None
+refreshers: List[SnapshotRefresher] = []
+
+catalog_artifact_path = os.getenv('CATALOG_ARTIFACT_PATH')
+catalog_artifact_loaded = False
+catalogs_loaded = False
+startup_wait_seconds = float(os.getenv('STARTUP_WAIT_SECONDS', '10'))
+services_ready = asyncio.Event()
+startup_error: Optional[str] = None
+startup_seconds: Optional[float] = None
+STARTUP_SECONDS.labels("import").set(time.perf_counter() - PROCESS_STARTED)
+
+def build_services():
+    """Construct the service singletons, building the builtin catalog and its indexes; a no-op once built.
+
+    start_services() runs this in a worker thread; under gunicorn the
+    master runs it before forking so every worker shares what it built.
+    """
+    global services_built, chat_service, write_behind, conversation_store, result_recorder
+    global career_matcher, recommendation_engine, career_forecaster, refreshers
+    if services_built:
+        return
+    
+    chat_service = ChatService()
+    write_behind = WriteBehindQueue.from_env()
+    conversation_store = ConversationStore.from_env(write_behind)
+    result_recorder = ResultRecorder.from_env(write_behind)
+    career_matcher = CareerMatcher(catalog_source=catalog_source)
+    recommendation_engine = RecommendationEngine(catalog_source=catalog_source)
+    career_forecaster = CareerForecaster.from_env()
+    
+    refreshers = [
+        SnapshotRefresher("Career catalog", career_matcher.refresh_catalog, catalog_refresh_seconds),
+        SnapshotRefresher("Recommendation templates", recommendation_engine.refresh_templates, catalog_refresh_seconds)
+    ] if catalog_source else []
+    
+    register_stats(
+        "ai_engine_completion_cache",
+        "Completion cache",
+        lambda: chat_service.completion_cache.stats() if chat_service.completion_cache else None
+    )
+    register_stats("ai_engine_conversation_store", "Conversation store", conversation_store.stats)
+    register_stats("ai_engine_career_forecast", "Career forecast cache", career_forecaster.stats)
+    register_stats("ai_engine_write_behind", "Database write-behind queue", lambda: write_behind.stats() if write_behind else None)
+    
+    services_built = True
+    STARTUP_SECONDS.labels("services").set(time.perf_counter() - PROCESS_STARTED)
+
+def load_catalog_artifact() -> bool:
+    """Install the prebuilt catalog snapshot from CATALOG_ARTIFACT_PATH, once per process tree"""
+    global catalog_artifact_loaded
+    if not catalog_artifact_path or catalog_artifact_loaded:
+        return False
+    catalog_artifact_loaded = True
+    snapshot = read_artifact(catalog_artifact_path, career_matcher.semantic_encoder)
+    if snapshot is None:
+        return False
+    career_matcher.snapshot = snapshot
+    return True
+
+async def load_catalogs():
+    """Load catalog snapshots; under gunicorn this runs once in the master before forking"""
+    global catalogs_loaded
+    await asyncio.to_thread(load_catalog_artifact)
+    # With an artifact loaded the source normally hashes to the same
+    # version and the snapshot is kept
+    for refresher in refreshers:
+        await refresher.refresh_once()
+    catalogs_loaded = True
+
+async def start_services():
+    """Warm up clients and load catalogs in the background, then mark the app ready"""
+    global startup_error, startup_seconds
+    try:
+        await asyncio.to_thread(build_services)
+        await chat_service.start()
+        STARTUP_SECONDS.labels("chat_service").set(time.perf_counter() - PROCESS_STARTED)
+        
+        if catalogs_loaded:
+            # The gunicorn master loaded and checked the catalogs before
+            # forking; keep sharing its snapshots until the next refresh
+            for refresher in refreshers:
+                refresher.start()
+        elif await asyncio.to_thread(load_catalog_artifact):
+            # Serve the artifact right away; checking it against the source
+            # runs in the background and swaps in a rebuild if it is stale
+            for refresher in refreshers:
+                refresher.start(refresh_now=True)
+        else:
+            await load_catalogs()
+            for refresher in refreshers:
+                refresher.start()
+        STARTUP_SECONDS.labels("catalog").set(time.perf_counter() - PROCESS_STARTED)
+        
+        if write_behind is not None:
+            write_behind.start()
+    except Exception as e:
+        # Serve what loaded (builtin catalog, fallback replies) rather than never becoming ready
+        startup_error = str(e)
+        logger.error(f"Startup error: {str(e)}")
+    
+    startup_seconds = time.perf_counter() - PROCESS_STARTED
+    STARTUP_SECONDS.labels("ready").set(startup_seconds)
+    services_ready.set()
+    logger.info(f"AI engine ready in {startup_seconds:.2f}s")
+
+async def wait_until_ready():
+    """Hold a request until startup has finished, or answer 503 after STARTUP_WAIT_SECONDS"""
+    if services_ready.is_set():
+        return
+    try:
+        await asyncio.wait_for(services_ready.wait(), startup_wait_seconds)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="Service is starting", headers={"Retry-After": "1"})
+    if not services_built:
+        raise HTTPException(status_code=503, detail="Service failed to start")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup runs in the background so the server accepts connections (and
+    # /health answers "starting") while catalogs load
+    startup_task = asyncio.create_task(start_services())
+    yield
+    if not startup_task.done():
+        startup_task.cancel()
+        try:
+            await startup_task
+        except asyncio.CancelledError:
+            pass
+    for refresher in refreshers:
+        await refresher.stop()
+    if chat_service is not None:
+        await chat_service.close()
+    # Flush what is still queued before the pools go away
+    if write_behind is not None:
+        await write_behind.stop()
+    await close_databases()
+
 app = FastAPI(
     title="OpportunityAI Engine",
     description="AI-powered military career guidance system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -30,12 +201,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
-
-# Initialize services
-chat_service = ChatService()
-career_matcher = CareerMatcher()
-recommendation_engine = RecommendationEngine()
+app.add_middleware(MetricsMiddleware)
 
 class ChatMessage(BaseModel):
     role: str
@@ -45,19 +213,38 @@ class ChatRequest(BaseModel):
     message: str
     conversation_history: Optional[List[ChatMessage]] = []
     user_profile: Optional[Dict[str, Any]] = None
+    # With a conversation_id the engine keeps the history; clients send only the new message
+    conversation_id: Optional[str] = None
+    # Ask the engine to start keeping history; the reply carries the new conversation_id
+    start_conversation: bool = False
 
 class ChatResponse(BaseModel):
     response: str
     recommendations: List[Dict[str, Any]] = []
     career_paths: List[Dict[str, Any]] = []
     confidence: float = 0.0
+    conversation_id: Optional[str] = None
 
 class CareerMatchRequest(BaseModel):
     interests: List[str]
     skills: List[str]
     education_level: str
+    # branch, service_type and difficulty: one value or a list of accepted values
     preferences: Optional[Dict[str, Any]] = None
 
+class BatchCareerMatchItem(CareerMatchRequest):
+    id: Optional[str] = None
+
+class CareerForecastRequest(BaseModel):
+    career_ids: List[str]
+    education_level: Optional[str] = None
+    service_years: int = 4
+    # Forecasts are persisted to career_forecasts only for a known user
+    user_id: Optional[str] = None
+
+FORECAST_MAX_CAREERS = int(os.getenv('CAREER_FORECAST_MAX_CAREERS', '20'))
+BATCH_CHUNK_SIZE = int(os.getenv('CAREER_MATCH_BATCH_CHUNK_SIZE', '256'))
+
 @app.get("/")
 async def root():
     return {
@@ -68,60 +255,259 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {
-        "status": "healthy",
+    startup = {
+        "seconds": round(startup_seconds if startup_seconds is not None else time.perf_counter() - PROCESS_STARTED, 3),
+        "error": startup_error
+    }
+    if not services_built:
+        return JSONResponse(content={
+            "status": "starting" if not services_ready.is_set() else "unavailable",
+            "ready": False,
+            "startup": startup,
+            "timestamp": datetime.utcnow().isoformat()
+        }, status_code=503)
+    
+    catalog = career_matcher.snapshot
+    templates = recommendation_engine.snapshot
+    llm = chat_service.llm_status()
+    
+    # Ready once startup has finished and there is a catalog to match
+    # against; the chat path can always fall back
+    starting = not services_ready.is_set()
+    ready = not starting and len(catalog.careers) > 0 and len(templates.rendered) > 0
+    degraded = llm["configured"] and (
+        llm["reachable"] is False or llm["circuit_breaker"]["state"] != "closed"
+    )
+    
+    if starting:
+        status = "starting"
+    else:
+        status = "degraded" if ready and degraded else ("healthy" if ready else "unavailable")
+    
+    content = {
+        "status": status,
+        "ready": ready,
+        "startup": startup,
         "services": {
-            "chat_service": "active",
-            "career_matcher": "active",
-            "recommendation_engine": "active"
+            "chat_service": llm,
+            "career_matcher": {
+                "catalog_loaded": len(catalog.careers) > 0,
+                "careers": len(catalog.careers),
+                "catalog_version": catalog.version,
+                "loaded_at": catalog.loaded_at,
+                "scoring_mode": career_matcher.scoring_mode
+            },
+            "recommendation_engine": {
+                "templates_loaded": len(templates.rendered) > 0,
+                "templates": len(templates.rendered),
+                "templates_version": templates.version
+            }
         },
+        "completion_cache": chat_service.completion_cache.stats() if chat_service.completion_cache else None,
         "timestamp": datetime.utcnow().isoformat()
     }
+    return JSONResponse(content=content, status_code=200 if ready else 503)
+
+@app.get("/metrics")
+async def metrics():
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        # Aggregate every gunicorn worker's samples
+        return Response(content=generate_latest(multiprocess_registry()), media_type=CONTENT_TYPE_LATEST)
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+async def timed(stage: str, timings: Dict[str, float], awaitable):
+    """Await a stage and record its duration in milliseconds"""
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[stage] = (time.perf_counter() - start) * 1000
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    """Format stage timings as a Server-Timing header value"""
+    return ", ".join(f"{stage};dur={duration:.1f}" for stage, duration in timings.items())
+
+async def build_career_guidance(request: ChatRequest, signals: MessageSignals,
+                                timings: Optional[Dict[str, float]] = None):
+    """Build recommendations and matching career paths for a chat message"""
+    timings = {} if timings is None else timings
+    recommendations = []
+    career_paths = []
+    user_interests = signals.interests
+    
+    profile = request.user_profile or {}
+    
+    if user_interests:
+        recommendations, career_paths = await asyncio.gather(
+            timed("recommendations", timings, recommendation_engine.get_recommendations(
+                interests=user_interests,
+                conversation_context=request.conversation_history
+            )),
+            timed("career_match", timings, career_matcher.find_matching_careers(
+                interests=user_interests,
+                skills=[],  # Extract from conversation if available
+                education_level=profile.get("education_level"),
+                preferences=profile.get("preferences")
+            ))
+        )
+    
+    return recommendations, career_paths
+
+async def resolve_conversation(request: ChatRequest) -> Tuple[Optional[str], List[Any], int]:
+    """Return (conversation_id, history, offset of history[0]) for a chat request.
+
+    Requests with a conversation_id use the server-side history, and
+    start_conversation opens a new server-side conversation seeded with any
+    client history. Every other request stays stateless.
+    """
+    conversation_id = request.conversation_id
+    if conversation_id is None:
+        if not request.start_conversation:
+            return None, request.conversation_history or [], 0
+        conversation_id = conversation_store.new_conversation_id()
+    
+    seed = chat_service._history_dicts(request.conversation_history)
+    history, offset = await conversation_store.history(conversation_id, seed=seed)
+    return conversation_id, history, offset
+
+async def record_turn(conversation_id: Optional[str], message: str, reply: str):
+    if conversation_id is not None and reply:
+        await conversation_store.append(conversation_id, "user", message)
+        await conversation_store.append(conversation_id, "assistant", reply)
+
+def record_guidance(request: ChatRequest, recommendations: List[Dict[str, Any]],
+                    career_paths: List[Dict[str, Any]]):
+    """Queue the recommendations and matches shown with a chat reply for persistence"""
+    if result_recorder is None:
+        return
+    user_id = (request.user_profile or {}).get("user_id")
+    result_recorder.recommendations(user_id, recommendations)
+    result_recorder.career_matches(user_id, {"source": "chat"}, career_paths)
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format a single Server-Sent Event frame"""
+    return f"event: {event}\ndata: {dumps_str(data)}\n\n"
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest):
+async def chat_endpoint(request: ChatRequest, response: Response):
+    await wait_until_ready()
+    guidance_task = None
     try:
         logger.info(f"Processing chat request: {request.message[:50]}...")
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        
+        # One scan of the message serves guidance, the recommendation trigger and the fallback reply
+        signals = chat_service.analyze_message(request.message)
+        timings["interests"] = (time.perf_counter() - start) * 1000
+        
+        # Interests depend only on the message, so scoring runs while the model generates
+        guidance_task = asyncio.create_task(timed("guidance", timings, build_career_guidance(request, signals, timings)))
+        
+        conversation_id, history, history_offset = await resolve_conversation(request)
         
         # Generate AI response
-        response_data = await chat_service.process_message(
+        response_data = await timed("llm", timings, chat_service.process_message(
             message=request.message,
-            conversation_history=request.conversation_history,
-            user_profile=request.user_profile
-        )
+            conversation_history=history,
+            user_profile=request.user_profile,
+            conversation_id=conversation_id,
+            history_offset=history_offset,
+            signals=signals
+        ))
+        await record_turn(conversation_id, request.message, response_data['response'])
         
         # Get career recommendations if relevant
         recommendations = []
         career_paths = []
         
         if response_data.get('trigger_recommendations', False):
-            # Extract interests and skills from conversation
-            user_interests = chat_service.extract_interests(request.message)
-            if user_interests:
-                recommendations = await recommendation_engine.get_recommendations(
-                    interests=user_interests,
-                    conversation_context=request.conversation_history
-                )
-                
-                career_paths = await career_matcher.find_matching_careers(
-                    interests=user_interests,
-                    skills=[],  # Extract from conversation if available
-                    education_level="high_school"  # Default, can be enhanced
-                )
+            recommendations, career_paths = await guidance_task
+            record_guidance(request, recommendations, career_paths)
         
-        return ChatResponse(
+        timings["total"] = (time.perf_counter() - start) * 1000
+        
+        fields = dict(
             response=response_data['response'],
             recommendations=recommendations,
             career_paths=career_paths,
-            confidence=response_data.get('confidence', 0.8)
+            confidence=response_data.get('confidence', 0.8),
+            conversation_id=conversation_id
         )
+        if FAST_JSON_ENABLED:
+            # Every field is built by the engine, so the response is constructed
+            # without validation and encoded directly instead of through response_model
+            return FastJSONResponse(
+                content=dict(ChatResponse.model_construct(**fields)),
+                headers={"Server-Timing": server_timing_header(timings)}
+            )
+        response.headers["Server-Timing"] = server_timing_header(timings)
+        return ChatResponse(**fields)
         
     except Exception as e:
         logger.error(f"Chat processing error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to process chat message")
+    finally:
+        if guidance_task is not None and not guidance_task.done():
+            guidance_task.cancel()
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    await wait_until_ready()
+    logger.info(f"Streaming chat request: {request.message[:50]}...")
+    
+    async def event_stream():
+        signals = chat_service.analyze_message(request.message)
+        guidance_task = asyncio.create_task(build_career_guidance(request, signals))
+        try:
+            conversation_id, history, history_offset = await resolve_conversation(request)
+            response_data = {}
+            async for event in chat_service.stream_message(
+                message=request.message,
+                conversation_history=history,
+                user_profile=request.user_profile,
+                conversation_id=conversation_id,
+                history_offset=history_offset,
+                signals=signals
+            ):
+                if event["type"] == "token":
+                    yield sse_event("token", {"content": event["content"]})
+                else:
+                    response_data = event
+            await record_turn(conversation_id, request.message, response_data.get('response', ''))
+            
+            recommendations = []
+            career_paths = []
+            
+            if response_data.get('trigger_recommendations', False):
+                recommendations, career_paths = await guidance_task
+                record_guidance(request, recommendations, career_paths)
+            
+            yield sse_event("complete", {
+                "response": response_data.get('response', ''),
+                "recommendations": recommendations,
+                "career_paths": career_paths,
+                "confidence": response_data.get('confidence', 0.8),
+                "conversation_id": conversation_id
+            })
+            
+        except Exception as e:
+            logger.error(f"Chat streaming error: {str(e)}")
+            yield sse_event("error", {"detail": "Failed to process chat message"})
+        finally:
+            # Also reached when the client disconnects mid-stream
+            if not guidance_task.done():
+                guidance_task.cancel()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.post("/career-match")
-async def career_match_endpoint(request: CareerMatchRequest):
+async def career_match_endpoint(request: CareerMatchRequest, http_request: Request):
+    await wait_until_ready()
     try:
         logger.info(f"Processing career match request for interests: {request.interests}")
         
@@ -131,32 +517,153 @@ async def career_match_endpoint(request: CareerMatchRequest):
             education_level=request.education_level,
             preferences=request.preferences
         )
+        if result_recorder is not None:
+            result_recorder.career_matches(None, request.model_dump(), matches)
         
-        return {
+        return response_compressor.json_response(http_request, {
             "matches": matches,
             "total_matches": len(matches),
             "timestamp": datetime.utcnow().isoformat()
-        }
+        })
         
     except Exception as e:
         logger.error(f"Career matching error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to match careers")
 
+@app.post("/career-forecast")
+async def career_forecast_endpoint(request: CareerForecastRequest, http_request: Request):
+    await wait_until_ready()
+    if not request.career_ids or len(request.career_ids) > FORECAST_MAX_CAREERS:
+        raise HTTPException(status_code=400, detail=f"Request between 1 and {FORECAST_MAX_CAREERS} career_ids")
+    try:
+        logger.info(f"Processing career forecast request for: {request.career_ids}")
+        
+        forecasts = await career_forecaster.forecast(
+            career_matcher.snapshot,
+            request.career_ids,
+            education_level=request.education_level,
+            service_years=request.service_years
+        )
+        
+    except Exception as e:
+        logger.error(f"Career forecast error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to forecast careers")
+    
+    if not forecasts:
+        raise HTTPException(status_code=404, detail="Unknown career path")
+    if result_recorder is not None:
+        result_recorder.career_forecasts(request.user_id, forecasts)
+    
+    return response_compressor.json_response(http_request, {
+        "forecasts": forecasts,
+        "total": len(forecasts),
+        "timestamp": datetime.utcnow().isoformat()
+    })
+
+class BodyStreamingResponse(StreamingResponse):
+    """Streaming response whose generator keeps reading the request body.
+    
+    StreamingResponse normally listens for client disconnects on the receive
+    channel, which would compete with the generator for request body chunks.
+    """
+    
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+async def read_batch_items(request: Request) -> AsyncIterator[Any]:
+    """Yield raw batch items from an NDJSON stream or a JSON array body"""
+    if "ndjson" in request.headers.get("content-type", ""):
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield line
+        if buffer.strip():
+            yield buffer
+    else:
+        body = await request.json()
+        for item in body.get("requests", []) if isinstance(body, dict) else body:
+            yield item
+
+@app.post("/career-match/batch")
+async def career_match_batch_endpoint(request: Request):
+    """Match many profiles in one call, streaming one NDJSON result line per profile"""
+    await wait_until_ready()
+    
+    async def score_chunk(chunk):
+        items = [item for _, item in chunk if isinstance(item, BatchCareerMatchItem)]
+        results = iter(await asyncio.to_thread(
+            career_matcher.match_batch,
+            [item.model_dump() for item in items],
+            True
+        ))
+        lines = []
+        for index, item in chunk:
+            if isinstance(item, BatchCareerMatchItem):
+                # Matches arrive pre-serialized; only the envelope is encoded here
+                matches = next(results)
+                lines.append(
+                    f'{{"index": {index}, "id": {dumps_str(item.id)}, '
+                    f'"matches": [{", ".join(matches)}], "total_matches": {len(matches)}}}'
+                )
+            else:
+                lines.append(dumps_str({"index": index, "error": item}))
+        return "\n".join(lines) + "\n"
+    
+    async def result_stream():
+        chunk = []
+        index = 0
+        try:
+            async for raw in read_batch_items(request):
+                try:
+                    if isinstance(raw, (bytes, str)):
+                        item = BatchCareerMatchItem.model_validate_json(raw)
+                    else:
+                        item = BatchCareerMatchItem.model_validate(raw)
+                except ValidationError as e:
+                    item = f"Invalid career match request: {e.error_count()} validation error(s)"
+                chunk.append((index, item))
+                index += 1
+                
+                if len(chunk) >= BATCH_CHUNK_SIZE:
+                    yield await score_chunk(chunk)
+                    chunk = []
+            
+            if chunk:
+                yield await score_chunk(chunk)
+            
+            logger.info(f"Processed career match batch of {index} profiles")
+            
+        except Exception as e:
+            logger.error(f"Batch career matching error: {str(e)}")
+            yield dumps_str({"index": index, "error": "Failed to match careers"}) + "\n"
+    
+    # Batch results are large and compress well; each chunk is flushed as it is scored
+    headers: Dict[str, str] = {}
+    body = response_compressor.stream(request, result_stream(), headers)
+    return BodyStreamingResponse(body, media_type="application/x-ndjson", headers=headers)
+
 @app.post("/recommendations")
-async def recommendations_endpoint(interests: List[str], context: Optional[Dict] = None):
+async def recommendations_endpoint(http_request: Request, interests: List[str], context: Optional[Dict] = None):
+    await wait_until_ready()
     try:
         logger.info(f"Generating recommendations for: {interests}")
         
-        recommendations = await recommendation_engine.get_recommendations(
-            interests=interests,
-            conversation_context=context
-        )
+        # Recommendations are pre-serialized; only the timestamp is added per response
+        timestamp = datetime.utcnow().isoformat()
+        recommendations, selected = recommendation_engine.get_recommendations_json(interests, timestamp)
+        if result_recorder is not None:
+            result_recorder.recommendations(None, [rendered.payload for rendered in selected])
         
-        return {
-            "recommendations": recommendations,
-            "total": len(recommendations),
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        content = (
+            '{"recommendations": [' + ', '.join(recommendations) + '], '
+            f'"total": {len(recommendations)}, "timestamp": {json.dumps(timestamp)}}}'
+        )
+        return response_compressor.response(http_request, content)
         
     except Exception as e:
         logger.error(f"Recommendations error: {str(e)}")
@@ -0,0 +1,112 @@
+from typing import Dict, Any, Optional
+from collections import deque
+import os
+import time
+import logging
+
+from services.metrics import LLM_BREAKER_STATE, LLM_BREAKER_TRANSITIONS
+
+logger = logging.getLogger(__name__)
+
+class AdmissionRejected(Exception):
+    """An LLM call was refused before reaching the provider; reason labels the fallback"""
+
+    def __init__(self, reason: str, detail: str = ""):
+        super().__init__(detail or reason)
+        self.reason = reason
+
+class CircuitBreaker:
+    """Failure- and latency-based circuit breaker for the completion provider.
+
+    Outcomes of the last window_size calls are kept; calls slower than
+    slow_call_seconds count as bad alongside errors. Once at least
+    min_calls are recorded and the bad ratio reaches failure_ratio the
+    breaker opens and calls are refused immediately. After open_seconds it
+    lets up to half_open_max_calls probes through: a good probe closes it,
+    a bad one opens it again.
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, failure_ratio: float = 0.5, window_size: int = 20, min_calls: int = 5,
+                 slow_call_seconds: float = 10.0, open_seconds: float = 15.0, half_open_max_calls: int = 1):
+        self.failure_ratio = failure_ratio
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.state = self.CLOSED
+        self.opened_at: Optional[float] = None
+        self._opened_monotonic = 0.0
+        self.rejected = 0
+        self._outcomes: "deque[bool]" = deque(maxlen=window_size)
+        self._probes = 0
+        LLM_BREAKER_STATE.set(0)
+
+    @classmethod
+    def from_env(cls, request_timeout: float) -> "CircuitBreaker":
+        return cls(
+            failure_ratio=float(os.getenv('LLM_BREAKER_FAILURE_RATIO', '0.5')),
+            window_size=int(os.getenv('LLM_BREAKER_WINDOW', '20')),
+            min_calls=int(os.getenv('LLM_BREAKER_MIN_CALLS', '5')),
+            slow_call_seconds=float(os.getenv('LLM_BREAKER_SLOW_CALL_SECONDS', str(request_timeout / 2))),
+            open_seconds=float(os.getenv('LLM_BREAKER_OPEN_SECONDS', '15')),
+            half_open_max_calls=int(os.getenv('LLM_BREAKER_HALF_OPEN_CALLS', '1'))
+        )
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        logger.warning(f"LLM circuit breaker {self.state} -> {state}")
+        LLM_BREAKER_TRANSITIONS.labels(state).inc()
+        LLM_BREAKER_STATE.set(self.STATE_VALUES[state])
+        self.state = state
+        self._probes = 0
+        if state == self.OPEN:
+            self.opened_at = time.time()
+            self._opened_monotonic = time.monotonic()
+        else:
+            self._outcomes.clear()
+
+    def before_call(self) -> bool:
+        """Admit a call or raise AdmissionRejected("circuit_open"); True if the call took a half-open probe"""
+        if self.state == self.OPEN and time.monotonic() - self._opened_monotonic >= self.open_seconds:
+            self._transition(self.HALF_OPEN)
+
+        if self.state == self.OPEN or (self.state == self.HALF_OPEN and self._probes >= self.half_open_max_calls):
+            self.rejected += 1
+            raise AdmissionRejected("circuit_open", "LLM circuit breaker is open")
+
+        if self.state == self.HALF_OPEN:
+            self._probes += 1
+            return True
+        return False
+
+    def record(self, ok: bool, duration: float):
+        bad = not ok or duration >= self.slow_call_seconds
+        if self.state == self.HALF_OPEN:
+            self._transition(self.OPEN if bad else self.CLOSED)
+            return
+
+        self._outcomes.append(bad)
+        if len(self._outcomes) >= self.min_calls and sum(self._outcomes) / len(self._outcomes) >= self.failure_ratio:
+            self._transition(self.OPEN)
+
+    def release_probe(self):
+        """A half-open probe ended without an outcome; only the call that took the probe may release it"""
+        if self.state == self.HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def status(self) -> Dict[str, Any]:
+        recent = len(self._outcomes)
+        return {
+            "state": self.state,
+            "recent_calls": recent,
+            "recent_bad_ratio": round(sum(self._outcomes) / recent, 3) if recent else 0.0,
+            "opened_at": self.opened_at,
+            "rejected": self.rejected
+        }
@@ -0,0 +1,304 @@
+from typing import List, Dict, Any, Optional, Tuple, Sequence, Hashable
+from collections import OrderedDict
+from dataclasses import dataclass
+import asyncio
+import os
+import re
+import time
+import zlib
+import logging
+
+import numpy as np
+
+from services.facet_index import EDUCATION_LEVELS, education_rank
+from services.metrics import SCORING_LATENCY
+from services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Approximate annual basic pay at entry to each grade (2024 pay table, monthly x 12)
+ANNUAL_BASE_PAY = {
+    "E1": 24204, "E2": 27132, "E3": 28536, "E4": 31608, "E5": 34476,
+    "E6": 37632, "E7": 43512, "E8": 62604, "E9": 76476,
+    "W1": 45072, "W2": 51348, "W3": 58368, "W4": 63888, "W5": 102792,
+    "O1": 45924, "O2": 52908, "O3": 61236, "O4": 69648, "O5": 80724, "O6": 96828,
+}
+
+# Months of service credited at entry by education level: college credit
+# earns an advanced enlistment grade, so every promotion comes earlier
+EDUCATION_HEAD_START_MONTHS = (0, 0, 6, 12, 12, 12)
+
+# Share of the civilian salary range reached with 10+ years of service, and per degree above high school
+EXPERIENCE_SALARY_WEIGHT = 0.5
+EDUCATION_SALARY_WEIGHT = 0.1
+SALARY_NOISE = 0.15
+
+_AMOUNT = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*(k\b)?", re.IGNORECASE)
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(?:\s*(?:-|to)\s*(\d+(?:\.\d+)?))?\+?\s*(year|yr|month|mo|week|wk)", re.IGNORECASE)
+_GROWTH = re.compile(r"(-?\d+(?:\.\d+)?)\s*%")
+
+def parse_salary_range(text: Any) -> Optional[Tuple[float, float]]:
+    """Low and high of a salary string such as "$85,000 - $140,000" ("$90k" reads as 90000)"""
+    amounts = [
+        float(number.replace(",", "")) * (1000 if thousands else 1)
+        for number, thousands in _AMOUNT.findall(str(text or ""))
+    ]
+    if not amounts:
+        return None
+    return min(amounts[:2]), max(amounts[:2])
+
+def parse_timeframe(text: Any) -> Optional[Tuple[float, float]]:
+    """Earliest and latest month of a timeframe such as "2-3 years" or "0-6 months" """
+    match = _DURATION.search(str(text or ""))
+    if not match:
+        return None
+    low, high, unit = match.groups()
+    months = {"y": 12.0, "m": 1.0, "w": 12 / 52}[unit[0].lower()]
+    low = float(low) * months
+    return low, float(high) * months if high else low
+
+def parse_growth(text: Any) -> float:
+    """Ten-year job growth from an outlook such as "Excellent (22% growth)", as a fraction"""
+    match = _GROWTH.search(str(text or ""))
+    return float(match.group(1)) / 100 if match else 0.0
+
+def annual_base_pay(pay_grade: Any) -> Optional[float]:
+    return ANNUAL_BASE_PAY.get(re.sub(r"[^A-Z0-9]", "", str(pay_grade or "").upper()))
+
+@dataclass(frozen=True)
+class CareerModel:
+    """Promotion steps and salary range of one career, parsed for simulation.
+
+    Step 0 is the entry rank, held from the first month; each later step is
+    reached at a month drawn from its timeframe. Steps whose pay grade is
+    unknown keep the pay of the step before.
+    """
+    ranks: Tuple[str, ...]
+    pay_grades: Tuple[str, ...]
+    earliest: Tuple[float, ...]
+    latest: Tuple[float, ...]
+    pay: Tuple[float, ...]
+    salary: Optional[Tuple[float, float]]
+    growth: float
+
+    @classmethod
+    def from_career(cls, career) -> "CareerModel":
+        ranks, pay_grades, earliest, latest, pay = [], [], [], [], []
+        for step in career.promotion_timeline:
+            window = parse_timeframe(step.get("timeframe")) or (latest[-1] if latest else 0.0,) * 2
+            step_pay = annual_base_pay(step.get("pay_grade")) or (pay[-1] if pay else None)
+            if step_pay is None:
+                continue
+            ranks.append(step.get("rank") or step.get("pay_grade") or "")
+            pay_grades.append(step.get("pay_grade") or "")
+            earliest.append(0.0 if not earliest else window[0])
+            latest.append(0.0 if not latest else window[1])
+            pay.append(step_pay)
+
+        translation = career.civilian_translation
+        return cls(
+            ranks=tuple(ranks),
+            pay_grades=tuple(pay_grades),
+            earliest=tuple(earliest),
+            latest=tuple(latest),
+            pay=tuple(pay),
+            salary=parse_salary_range(translation.get("average_salary")),
+            growth=parse_growth(translation.get("growth_outlook"))
+        )
+
+def _percentiles(values: np.ndarray) -> np.ndarray:
+    """p10, p50 and p90 over simulations (the last axis), rounded to whole dollars"""
+    return np.rint(np.percentile(values, [10, 50, 90], axis=-1))
+
+def _spread(values) -> Optional[Dict[str, int]]:
+    if np.isnan(values).any():
+        return None
+    return {"p10": int(values[0]), "p50": int(values[1]), "p90": int(values[2])}
+
+class CareerForecaster:
+    """Monte-Carlo forecasts of rank, military pay and civilian salary.
+
+    All requested careers are simulated together: promotion months for every
+    (simulation, career, step) are one NumPy array, so pay per service year
+    is a handful of clipped array operations regardless of how many careers
+    are forecast. Each career draws from its own seeded generator, so a
+    forecast depends only on the career and the profile bucket (education
+    level, service years) and is the same in every worker. Results are
+    memoized per (catalog version, career, profile bucket).
+    """
+
+    MAX_SERVICE_YEARS = 30
+
+    def __init__(self, simulations: int = 2000, max_entries: int = 10000):
+        self.simulations = simulations
+        self.max_entries = max_entries
+        self.flights = SingleFlight("career_forecast")
+        self.hits = 0
+        self.misses = 0
+        self._forecasts: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+
+    @classmethod
+    def from_env(cls) -> "CareerForecaster":
+        return cls(
+            simulations=int(os.getenv('CAREER_FORECAST_SIMULATIONS', '2000')),
+            max_entries=int(os.getenv('CAREER_FORECAST_CACHE_SIZE', '10000'))
+        )
+
+    def profile_bucket(self, education_level: Optional[str], service_years: int) -> Tuple[int, int]:
+        """Profile fields a forecast depends on; unrecognized education counts as high school"""
+        rank = education_rank(education_level)
+        rank = EDUCATION_LEVELS.index("high_school") if rank is None else rank
+        return rank, max(1, min(int(service_years), self.MAX_SERVICE_YEARS))
+
+    def _cached(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        forecast = self._forecasts.get(key)
+        if forecast is not None:
+            self._forecasts.move_to_end(key)
+        return forecast
+
+    def _store(self, key: Hashable, forecast: Dict[str, Any]):
+        self._forecasts[key] = forecast
+        self._forecasts.move_to_end(key)
+        while len(self._forecasts) > self.max_entries:
+            self._forecasts.popitem(last=False)
+
+    async def forecast(self, snapshot, career_ids: Sequence[str], education_level: Optional[str] = None,
+                       service_years: int = 4) -> List[Dict[str, Any]]:
+        """Forecasts for the given careers of a catalog snapshot, in request order.
+
+        Unknown career IDs are skipped. Memoized forecasts are returned
+        inline; the rest are simulated in a worker thread, and identical
+        concurrent requests share one simulation.
+        """
+        bucket = self.profile_bucket(education_level, service_years)
+        career_ids = [career_id for career_id in dict.fromkeys(career_ids) if career_id in snapshot.positions]
+
+        forecasts = {career_id: self._cached((snapshot.version, career_id) + bucket) for career_id in career_ids}
+        missing = [career_id for career_id, forecast in forecasts.items() if forecast is None]
+        self.hits += len(career_ids) - len(missing)
+        if missing:
+            careers = [snapshot.careers[snapshot.positions[career_id]] for career_id in missing]
+            simulated = await self.flights.do(
+                (snapshot.version, tuple(missing)) + bucket,
+                lambda: asyncio.to_thread(self.simulate, careers, *bucket)
+            )
+            self.misses += len(missing)
+            for career_id, forecast in zip(missing, simulated):
+                forecasts[career_id] = forecast
+                self._store((snapshot.version, career_id) + bucket, forecast)
+        return list(forecasts.values())
+
+    def simulate(self, careers: Sequence, education: int, service_years: int) -> List[Dict[str, Any]]:
+        """Simulate careers together for one profile bucket"""
+        start = time.perf_counter()
+        try:
+            return self._simulate(careers, education, service_years)
+        finally:
+            SCORING_LATENCY.labels("career_forecast").observe(time.perf_counter() - start)
+
+    def _simulate(self, careers: Sequence, education: int, service_years: int) -> List[Dict[str, Any]]:
+        models = [CareerModel.from_career(career) for career in careers]
+        sims, count = self.simulations, len(models)
+        steps = max([len(model.ranks) for model in models] + [1])
+
+        # Padding steps are never reached
+        earliest = np.full((count, steps), np.inf)
+        latest = np.full((count, steps), np.inf)
+        pay = np.zeros((count, steps))
+        salary = np.full((count, 2), np.nan)
+        growth = np.zeros(count)
+        for c, model in enumerate(models):
+            n = len(model.ranks)
+            earliest[c, :n], latest[c, :n], pay[c, :n] = model.earliest, model.latest, model.pay
+            if model.salary:
+                salary[c] = model.salary
+            growth[c] = model.growth
+
+        # Arrays are (career, step, simulation): each career's draws are
+        # contiguous and sums over steps add whole simulation rows
+        draws = np.empty((count, steps, sims))
+        noise = np.empty((count, sims))
+        for c, career in enumerate(careers):
+            rng = np.random.default_rng([zlib.crc32(career.id.encode()), education, service_years])
+            rng.random(out=draws[c])
+            noise[c] = rng.standard_normal(sims)
+
+        # Month each step is reached, never before the step below it
+        span = np.where(np.isfinite(earliest), latest - earliest, 0.0)
+        promoted = earliest[:, :, None] + draws * span[:, :, None]
+        promoted[:, 1:] -= EDUCATION_HEAD_START_MONTHS[education]
+        promoted = np.maximum.accumulate(np.maximum(promoted, 0.0), axis=1)
+        promoted[:, 0] = 0.0
+        left = np.concatenate([promoted[:, 1:], np.full((count, 1, sims), np.inf)], axis=1)
+        pay = pay[:, :, None]
+
+        yearly_pay = []
+        yearly_rank = []
+        for year in range(1, service_years + 1):
+            window_start, window_end = (year - 1) * 12.0, year * 12.0
+            # Months of this year spent at each step
+            months = (
+                np.minimum(np.maximum(left, window_start), window_end)
+                - np.minimum(np.maximum(promoted, window_start), window_end)
+            )
+            yearly_pay.append((months * pay).sum(axis=1) / 12)
+            yearly_rank.append((promoted <= window_end).sum(axis=1) - 1)
+        yearly_pay = np.stack(yearly_pay)  # (year, career, simulation)
+        yearly_rank = np.stack(yearly_rank)
+
+        pay_spread = _percentiles(yearly_pay)  # (3, year, career)
+        total_spread = _percentiles(yearly_pay.sum(axis=0))  # (3, career)
+        rank_share = np.stack([(yearly_rank == step).mean(axis=2) for step in range(steps)], axis=-1)  # (year, career, step)
+
+        # Civilian salary on leaving service: experience and education move
+        # the draw up the range, which itself grows with the job outlook
+        position = np.clip(
+            EXPERIENCE_SALARY_WEIGHT * min(service_years / 10, 1.0)
+            + EDUCATION_SALARY_WEIGHT * max(education - EDUCATION_LEVELS.index("high_school"), 0)
+            + SALARY_NOISE * noise,
+            0.0, 1.0
+        )
+        market = (1 + growth) ** (service_years / 10)
+        civilian = (salary[:, :1] + (salary[:, 1:] - salary[:, :1]) * position) * market[:, None]
+        civilian_spread = _percentiles(civilian)
+
+        forecasts = []
+        for c, (career, model) in enumerate(zip(careers, models)):
+            n = len(model.ranks)
+            timeline = []
+            for year in range(service_years if n else 0):
+                shares = rank_share[year, c, :n]
+                likely = int(shares.argmax())
+                timeline.append({
+                    "year": year + 1,
+                    "rank": model.ranks[likely],
+                    "pay_grade": model.pay_grades[likely],
+                    "rank_probabilities": [
+                        {"rank": model.ranks[step], "pay_grade": model.pay_grades[step], "probability": round(float(share), 3)}
+                        for step, share in enumerate(shares) if share > 0
+                    ],
+                    "military_pay": _spread(pay_spread[:, year, c])
+                })
+            civilian_salary = _spread(civilian_spread[:, c])
+            if civilian_salary is not None:
+                civilian_salary["job_titles"] = list(career.civilian_translation.get("job_titles", []))
+            forecasts.append({
+                "career_path_id": career.id,
+                "title": career.title,
+                "branch": career.branch,
+                "service_type": career.service_type,
+                "education_level": EDUCATION_LEVELS[education],
+                "service_years": service_years,
+                "simulations": sims,
+                "timeline": timeline,
+                "military_pay_total": _spread(total_spread[:, c]) if n else None,
+                "civilian_salary": civilian_salary
+            })
+        return forecasts
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._forecasts),
+            "hits": self.hits,
+            "misses": self.misses
+        }
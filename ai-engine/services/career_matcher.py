@@ -1,25 +1,211 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Mapping
+import asyncio
+import hashlib
+import json
 import logging
+import os
+import sys
+import time
 from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+
+import numpy as np
+
+from services.catalog import CatalogSource
+from services.keyword_index import KeywordIndex
+from services.vector_scorer import VectorScorer
+from services.facet_index import FacetIndex, Filters, build_filters
+from services.semantic_index import SemanticIndex, encoder_from_env
+from services.metrics import SCORING_LATENCY
+from services.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+@dataclass(frozen=True, slots=True)
 class CareerPath:
+    """One catalog entry. Immutable: list fields are stored as tuples and the
+    short categorical strings are interned so large catalogs share them."""
     id: str
     title: str
     branch: str
     service_type: str
     description: str
-    requirements: List[str]
+    requirements: Tuple[str, ...]
     training_duration: str
     civilian_translation: Dict[str, Any]
-    match_keywords: List[str]
+    match_keywords: Tuple[str, ...]
     difficulty_level: str
+    promotion_timeline: Tuple[Dict[str, str], ...] = ()
+    
+    def __post_init__(self):
+        for name in ("id", "branch", "service_type", "training_duration", "difficulty_level"):
+            object.__setattr__(self, name, _intern(getattr(self, name)))
+        object.__setattr__(self, "requirements", tuple(_intern(r) for r in self.requirements))
+        object.__setattr__(self, "match_keywords", tuple(_intern(k) for k in self.match_keywords))
+        object.__setattr__(self, "civilian_translation", {
+            _intern(key): value for key, value in self.civilian_translation.items()
+        })
+        object.__setattr__(self, "promotion_timeline", tuple(
+            {_intern(key): _intern(value) for key, value in step.items()} for step in self.promotion_timeline
+        ))
+
+@dataclass(frozen=True, slots=True)
+class RenderedCareer:
+    """Response-ready payload for one career, built once per snapshot.
+    
+    A match result only attaches a score and reasons; the career_path and
+    civilian_outcome dicts are shared between responses and must not be
+    mutated.
+    """
+    career_path: Dict[str, Any]
+    civilian_outcome: Dict[str, Any]
+    json_prefix: str
+    
+    @classmethod
+    def render(cls, career: CareerPath) -> "RenderedCareer":
+        career_path = {
+            "id": career.id,
+            "title": career.title,
+            "branch": career.branch,
+            "service_type": career.service_type,
+            "description": career.description,
+            "requirements": list(career.requirements),
+            "training_duration": career.training_duration,
+            "difficulty_level": career.difficulty_level
+        }
+        civilian_outcome = career.civilian_translation
+        json_prefix = (
+            '{"career_path": ' + json.dumps(career_path) +
+            ', "civilian_outcome": ' + json.dumps(civilian_outcome) +
+            ', "match_score": '
+        )
+        return cls(career_path=career_path, civilian_outcome=civilian_outcome, json_prefix=json_prefix)
+    
+    def match(self, score: float, reasons: List[str]) -> Dict[str, Any]:
+        return {
+            "career_path": self.career_path,
+            "civilian_outcome": self.civilian_outcome,
+            "match_score": score,
+            "match_reasons": reasons
+        }
+    
+    def match_json(self, score: float, reasons: List[str]) -> str:
+        return self.json_prefix + json.dumps(score) + ', "match_reasons": ' + json.dumps(reasons) + "}"
+
+@dataclass(frozen=True)
+class CareerCatalogSnapshot:
+    """Immutable view of the career catalog and the indexes built from it"""
+    careers: Tuple[CareerPath, ...]
+    rendered: Tuple[RenderedCareer, ...]
+    positions: Mapping[str, int]
+    keyword_index: KeywordIndex
+    vector_scorer: VectorScorer
+    facet_index: FacetIndex
+    version: str
+    loaded_at: str
+    semantic_index: Optional[SemanticIndex] = None
+
+    @classmethod
+    def build(cls, careers: List[CareerPath], version: str, semantic_encoder=None,
+              interest_synonyms: bool = False) -> "CareerCatalogSnapshot":
+        keyword_index = KeywordIndex(careers, interest_synonyms=interest_synonyms)
+        return cls(
+            careers=tuple(careers),
+            rendered=tuple(RenderedCareer.render(career) for career in careers),
+            positions=MappingProxyType({career.id: position for position, career in enumerate(careers)}),
+            keyword_index=keyword_index,
+            vector_scorer=VectorScorer(keyword_index, len(careers)),
+            facet_index=FacetIndex(careers),
+            version=version,
+            loaded_at=datetime.utcnow().isoformat(),
+            semantic_index=SemanticIndex.build(careers, semantic_encoder) if semantic_encoder else None
+        )
+
+def career_from_row(row: Dict[str, Any]) -> CareerPath:
+    """Build a CareerPath from a career_paths table row"""
+    return CareerPath(
+        id=row["id"],
+        title=row["title"],
+        branch=row["branch"],
+        service_type=row["service_type"],
+        description=row["description"],
+        requirements=list(row.get("requirements") or []),
+        training_duration=row.get("training_duration") or "",
+        civilian_translation=dict(row.get("civilian_translation") or {}),
+        match_keywords=list(row.get("match_keywords") or []),
+        difficulty_level=row.get("difficulty_level") or "",
+        promotion_timeline=list(row.get("promotion_timeline") or [])
+    )
 
 class CareerMatcher:
-    def __init__(self):
-        self.career_database = self._load_career_database()
+    def __init__(self, catalog_source: Optional[CatalogSource] = None):
+        self.catalog_source = catalog_source
+        
+        # "index" scores candidate careers in Python; "vector" scores the whole
+        # catalog with NumPy and is faster for large catalogs and batches;
+        # "semantic" retrieves by embedding similarity and re-ranks with the keyword score
+        self.scoring_mode = os.getenv('CAREER_SCORING_MODE', 'index')
+        self.min_match_score = float(os.getenv('CAREER_MATCH_THRESHOLD', '0.3'))
+        self.interest_weight = float(os.getenv('CAREER_INTEREST_WEIGHT', '0.7'))
+        self.skill_weight = float(os.getenv('CAREER_SKILL_WEIGHT', '0.3'))
+        self.max_matches = 5
+        # Let chat interest words match their interest ("programming" -> technology careers)
+        self.interest_synonyms = os.getenv('CAREER_MATCH_INTEREST_SYNONYMS', 'false').lower() == 'true'
+        
+        # Catalogs at least this large are scored in a worker thread, where
+        # identical concurrent requests can share one scan
+        self.thread_min_careers = int(os.getenv('CAREER_MATCH_THREAD_MIN_CAREERS', '500'))
+        self.match_flights = SingleFlight("career_match")
+        
+        self.semantic_encoder = encoder_from_env() if self.scoring_mode == "semantic" else None
+        self.semantic_weight = float(os.getenv('CAREER_SEMANTIC_WEIGHT', '0.4'))
+        self.semantic_min_similarity = float(os.getenv('CAREER_SEMANTIC_MIN_SIMILARITY', '0.1'))
+        self.semantic_candidates = int(os.getenv('CAREER_SEMANTIC_CANDIDATES', '50'))
+        
+        self.snapshot = CareerCatalogSnapshot.build(
+            self._load_career_database(), version="builtin", semantic_encoder=self.semantic_encoder,
+            interest_synonyms=self.interest_synonyms
+        )
+    
+    @property
+    def career_database(self) -> Tuple[CareerPath, ...]:
+        return self.snapshot.careers
+    
+    @property
+    def keyword_index(self) -> KeywordIndex:
+        return self.snapshot.keyword_index
+    
+    async def refresh_catalog(self) -> bool:
+        """Reload the catalog from the configured source and swap in a new snapshot.
+        
+        Returns True if the content changed. The snapshot is built in a worker
+        thread; requests keep using the previous snapshot until the swap.
+        """
+        if self.catalog_source is None:
+            return False
+        
+        rows = await self.catalog_source.load_career_paths()
+        if not rows:
+            logger.warning("Catalog source returned no career paths - keeping current snapshot")
+            return False
+        
+        # Hashing a large catalog takes a while; keep it off the event loop
+        version = await asyncio.to_thread(
+            lambda: hashlib.sha1(json.dumps(rows, sort_keys=True, default=str).encode()).hexdigest()
+        )
+        if version == self.snapshot.version:
+            return False
+        
+        careers = [career_from_row(row) for row in rows]
+        self.snapshot = await asyncio.to_thread(
+            CareerCatalogSnapshot.build, careers, version, self.semantic_encoder, self.interest_synonyms
+        )
+        logger.info(f"Loaded {len(careers)} career paths (version {version[:8]})")
+        return True
     
     def _load_career_database(self) -> List[CareerPath]:
         """Load military career paths database"""
@@ -39,7 +225,12 @@ class CareerMatcher:
                     "certifications": ["Security+", "CISSP", "CEH"]
                 },
                 match_keywords=["cyber", "technology", "computer", "security", "IT", "networks"],
-                difficulty_level="moderate"
+                difficulty_level="moderate",
+                promotion_timeline=[
+                    {"rank": "Airman Basic", "timeframe": "0-6 months", "pay_grade": "E-1"},
+                    {"rank": "Senior Airman", "timeframe": "2-3 years", "pay_grade": "E-4"},
+                    {"rank": "Staff Sergeant", "timeframe": "4-6 years", "pay_grade": "E-5"}
+                ]
             ),
             CareerPath(
                 id="aviation-mechanic",
@@ -56,7 +247,12 @@ class CareerMatcher:
                     "certifications": ["A&P License", "FAA Certifications"]
                 },
                 match_keywords=["aviation", "aircraft", "mechanical", "repair", "maintenance", "hands-on"],
-                difficulty_level="moderate"
+                difficulty_level="moderate",
+                promotion_timeline=[
+                    {"rank": "Seaman Recruit", "timeframe": "0-9 months", "pay_grade": "E-1"},
+                    {"rank": "Petty Officer 3rd Class", "timeframe": "2-3 years", "pay_grade": "E-4"},
+                    {"rank": "Petty Officer 2nd Class", "timeframe": "4-6 years", "pay_grade": "E-5"}
+                ]
             ),
             CareerPath(
                 id="combat-medic",
@@ -73,7 +269,12 @@ class CareerMatcher:
                     "certifications": ["EMT", "Paramedic License", "NREMT"]
                 },
                 match_keywords=["medical", "healthcare", "help people", "emergency", "first aid"],
-                difficulty_level="challenging"
+                difficulty_level="challenging",
+                promotion_timeline=[
+                    {"rank": "Private", "timeframe": "0-6 months", "pay_grade": "E-1"},
+                    {"rank": "Specialist", "timeframe": "2-3 years", "pay_grade": "E-4"},
+                    {"rank": "Sergeant", "timeframe": "4-6 years", "pay_grade": "E-5"}
+                ]
             ),
             CareerPath(
                 id="intelligence-analyst",
@@ -90,7 +291,12 @@ class CareerMatcher:
                     "certifications": ["Security+", "Certified Intelligence Professional"]
                 },
                 match_keywords=["analysis", "research", "investigation", "data", "intelligence", "problem-solving"],
-                difficulty_level="challenging"
+                difficulty_level="challenging",
+                promotion_timeline=[
+                    {"rank": "Airman Basic", "timeframe": "0-6 months", "pay_grade": "E-1"},
+                    {"rank": "Senior Airman", "timeframe": "2-3 years", "pay_grade": "E-4"},
+                    {"rank": "Staff Sergeant", "timeframe": "4-6 years", "pay_grade": "E-5"}
+                ]
             ),
             CareerPath(
                 id="logistics-specialist",
@@ -107,91 +313,242 @@ class CareerMatcher:
                     "certifications": ["APICS", "Supply Chain Certification"]
                 },
                 match_keywords=["logistics", "organization", "management", "coordination", "planning"],
-                difficulty_level="easy"
+                difficulty_level="easy",
+                promotion_timeline=[
+                    {"rank": "Private", "timeframe": "0-6 months", "pay_grade": "E-1"},
+                    {"rank": "Specialist", "timeframe": "2-3 years", "pay_grade": "E-4"},
+                    {"rank": "Sergeant", "timeframe": "4-6 years", "pay_grade": "E-5"}
+                ]
             )
         ]
     
     async def find_matching_careers(self, interests: List[str], skills: List[str], 
-                                  education_level: str, preferences: Optional[Dict] = None) -> List[Dict[str, Any]]:
-        """Find career paths that match user interests and profile"""
+                                  education_level: Optional[str], preferences: Optional[Dict] = None) -> List[Dict[str, Any]]:
+        """Find career paths that match user interests and profile.
+        
+        Only careers open at the given education level and matching the
+        branch, service_type and difficulty preferences are considered.
+        """
+        snapshot = self.snapshot
+        filters = build_filters(education_level, preferences)
+        if len(snapshot.careers) < self.thread_min_careers:
+            # Small catalogs score inline, faster than any hand-off
+            return self._find_matching_careers(snapshot, interests, skills, filters)
+        
+        key = (snapshot.version, tuple(interests), tuple(skills), filters)
+        return await self.match_flights.do(
+            key,
+            lambda: asyncio.to_thread(self._find_matching_careers, snapshot, interests, skills, filters)
+        )
+    
+    def _find_matching_careers(self, snapshot: CareerCatalogSnapshot, interests: List[str],
+                               skills: List[str], filters: Filters = ()) -> List[Dict[str, Any]]:
+        start = time.perf_counter()
         try:
-            matches = []
-            
-            for career in self.career_database:
-                match_score = self._calculate_match_score(career, interests, skills)
-                
-                if match_score > 0.3:  # Minimum threshold for relevance
-                    matches.append({
-                        "career_path": {
-                            "id": career.id,
-                            "title": career.title,
-                            "branch": career.branch,
-                            "service_type": career.service_type,
-                            "description": career.description,
-                            "requirements": career.requirements,
-                            "training_duration": career.training_duration,
-                            "difficulty_level": career.difficulty_level
-                        },
-                        "civilian_outcome": career.civilian_translation,
-                        "match_score": round(match_score, 2),
-                        "match_reasons": self._get_match_reasons(career, interests, skills)
-                    })
-            
-            # Sort by match score
-            matches.sort(key=lambda x: x['match_score'], reverse=True)
-            
-            return matches[:5]  # Return top 5 matches
+            return self._match(snapshot, interests, skills, filters)
             
         except Exception as e:
             logger.error(f"Career matching error: {str(e)}")
             return []
+        finally:
+            SCORING_LATENCY.labels("career_match").observe(time.perf_counter() - start)
+    
+    def match_batch(self, profiles: List[Dict[str, Any]], as_json: bool = False) -> List[List[Any]]:
+        """Match a batch of profiles against one catalog snapshot.
+        
+        Each profile is a dict with interests, skills, education_level and
+        preferences. Term lookups are shared through the snapshot's indexes,
+        and identical profiles in the batch are scored once. With as_json,
+        each match is returned as a pre-serialized JSON object.
+        """
+        snapshot = self.snapshot
+        match = self._match_json if as_json else self._match
+        start = time.perf_counter()
+        results = []
+        seen: Dict[Tuple, List[Any]] = {}
+        
+        for profile in profiles:
+            interests = list(profile.get("interests") or [])
+            skills = list(profile.get("skills") or [])
+            filters = build_filters(profile.get("education_level"), profile.get("preferences"))
+            key = (tuple(interests), tuple(skills), filters)
+            
+            if key not in seen:
+                try:
+                    seen[key] = match(snapshot, interests, skills, filters)
+                except Exception as e:
+                    logger.error(f"Career matching error: {str(e)}")
+                    seen[key] = []
+            results.append(seen[key])
+        
+        SCORING_LATENCY.labels("career_match_batch").observe(time.perf_counter() - start)
+        return results
+    
+    def _match(self, snapshot: CareerCatalogSnapshot, interests: List[str], skills: List[str],
+               filters: Filters = ()) -> List[Dict[str, Any]]:
+        """Build match results for one profile against a snapshot"""
+        return [
+            snapshot.rendered[position].match(
+                round(match_score, 2), self._format_match_reasons(snapshot.careers[position], term_reasons)
+            )
+            for position, match_score, term_reasons in self._rank_careers(snapshot, interests, skills, filters)
+        ]
+    
+    def _match_json(self, snapshot: CareerCatalogSnapshot, interests: List[str], skills: List[str],
+                    filters: Filters = ()) -> List[str]:
+        """Match results for one profile as pre-serialized JSON objects"""
+        return [
+            snapshot.rendered[position].match_json(
+                round(match_score, 2), self._format_match_reasons(snapshot.careers[position], term_reasons)
+            )
+            for position, match_score, term_reasons in self._rank_careers(snapshot, interests, skills, filters)
+        ]
+    
+    def _rank_careers(self, snapshot: CareerCatalogSnapshot, interests: List[str],
+                      skills: List[str], filters: Filters = ()) -> List[Tuple[int, float, List[str]]]:
+        """Return (position, score, term reasons) for the top eligible matches, best first"""
+        if self.scoring_mode == "semantic" and snapshot.semantic_index is not None:
+            return self._rank_semantic(snapshot, interests, skills, snapshot.facet_index.mask(filters))
+        
+        if self.scoring_mode == "vector":
+            ranked = snapshot.vector_scorer.top_k(
+                interests, skills,
+                k=self.max_matches,
+                threshold=self.min_match_score,
+                interest_weight=self.interest_weight,
+                skill_weight=self.skill_weight,
+                eligible=snapshot.facet_index.mask(filters)
+            )
+            return [
+                (position, score, self._term_reasons(snapshot, position, interests, skills))
+                for position, score in ranked
+            ]
+        
+        # Only careers touched by at least one term can clear the threshold
+        candidates = snapshot.keyword_index.score_candidates(
+            interests, skills, self.interest_weight, self.skill_weight,
+            eligible=snapshot.facet_index.positions(filters)
+        )
+        ranked = [
+            (position, score, reasons)
+            for position, (score, reasons) in sorted(candidates.items())
+            if score > self.min_match_score  # Minimum threshold for relevance
+        ]
+        
+        # Sort by match score
+        ranked.sort(key=lambda item: round(item[1], 2), reverse=True)
+        
+        return ranked[:self.max_matches]
+    
+    def _rank_semantic(self, snapshot: CareerCatalogSnapshot, interests: List[str], skills: List[str],
+                       eligible: Optional[np.ndarray] = None) -> List[Tuple[int, float, List[str]]]:
+        """Retrieve by embedding similarity, then re-rank with the keyword score.
+        
+        Candidates are the nearest careers above the similarity floor plus
+        every career that clears the keyword threshold, so semantic mode
+        never loses a keyword match. The final score blends the keyword score
+        with similarity relative to the best hit for this query; careers found
+        by similarity alone must clear the same threshold with that score.
+        """
+        terms = list(interests) + list(skills)
+        if not terms or not snapshot.careers:
+            return []
+        
+        index = snapshot.semantic_index
+        similarities = index.similarities(" ".join(terms))
+        keyword_scores = snapshot.vector_scorer.scores(
+            interests, skills, self.interest_weight, self.skill_weight, eligible
+        )
+        if eligible is not None:
+            # Ineligible careers drop below any similarity floor
+            similarities = np.where(eligible, similarities, -1.0)
+        
+        candidates = keyword_scores > self.min_match_score
+        nearest = [position for position, _ in
+                   index.top_k(similarities, self.semantic_candidates, self.semantic_min_similarity)]
+        candidates[nearest] = True
+        positions = np.flatnonzero(candidates)
+        if positions.size == 0:
+            return []
+        
+        best = max(float(similarities.max()), 1e-6)
+        relative = np.maximum(similarities[positions], 0.0) / best
+        scores = (1 - self.semantic_weight) * keyword_scores[positions] + self.semantic_weight * relative
+        keep = (scores > self.min_match_score) | (keyword_scores[positions] > self.min_match_score)
+        positions, scores = positions[keep], scores[keep]
+        
+        ranked = sorted(
+            zip(positions.tolist(), scores.tolist()),
+            key=lambda item: (-round(item[1], 2), item[0])
+        )[:self.max_matches]
+        
+        results = []
+        for position, score in ranked:
+            reasons = self._term_reasons(snapshot, position, interests, skills)
+            results.append((position, score, reasons or self._semantic_reasons(index, position, interests, skills)))
+        return results
+    
+    def _semantic_reasons(self, index: SemanticIndex, position: int,
+                          interests: List[str], skills: List[str]) -> List[str]:
+        """Reasons for a career found by similarity alone"""
+        reasons = []
+        
+        for interest in interests:
+            if index.similarities(interest)[position] >= self.semantic_min_similarity:
+                reasons.append(f"Related to your interest in {interest}")
+        
+        for skill in skills:
+            if index.similarities(skill)[position] >= self.semantic_min_similarity:
+                reasons.append(f"Draws on your {skill} skills")
+        
+        return reasons or ["Similar to what you described"]
+    
+    def _term_reasons(self, snapshot: CareerCatalogSnapshot, position: int,
+                      interests: List[str], skills: List[str]) -> List[str]:
+        """Interest and skill reasons for one career, in request order"""
+        reasons = []
+        
+        for interest in interests:
+            if position in snapshot.keyword_index.match_term(interest):
+                reasons.append(f"Matches your interest in {interest}")
+        
+        for skill in skills:
+            if position in snapshot.keyword_index.match_term(skill):
+                reasons.append(f"Utilizes your {skill} skills")
+        
+        return reasons
     
     def _calculate_match_score(self, career: CareerPath, interests: List[str], skills: List[str]) -> float:
         """Calculate how well a career path matches user interests and skills"""
         score = 0.0
         max_score = 1.0
+        position = self._position(career)
         
-        # Interest matching (70% weight)
-        interest_matches = 0
-        for interest in interests:
-            if any(keyword.lower() in interest.lower() or interest.lower() in keyword.lower() 
-                  for keyword in career.match_keywords):
-                interest_matches += 1
+        # Interest matching (70% weight by default)
+        interest_matches = sum(1 for interest in interests if position in self.keyword_index.match_term(interest))
         
         if interests:
             interest_score = min(interest_matches / len(interests), 1.0)
-            score += interest_score * 0.7
+            score += interest_score * self.interest_weight
         
-        # Skill matching (30% weight)
-        skill_matches = 0
-        for skill in skills:
-            if any(keyword.lower() in skill.lower() or skill.lower() in keyword.lower() 
-                  for keyword in career.match_keywords):
-                skill_matches += 1
+        # Skill matching (30% weight by default)
+        skill_matches = sum(1 for skill in skills if position in self.keyword_index.match_term(skill))
         
         if skills:
             skill_score = min(skill_matches / len(skills), 1.0)
-            score += skill_score * 0.3
+            score += skill_score * self.skill_weight
         
         return min(score, max_score)
     
     def _get_match_reasons(self, career: CareerPath, interests: List[str], skills: List[str]) -> List[str]:
         """Get human-readable reasons why this career matches"""
-        reasons = []
-        
-        # Check interest matches
-        for interest in interests:
-            matching_keywords = [kw for kw in career.match_keywords 
-                               if kw.lower() in interest.lower() or interest.lower() in kw.lower()]
-            if matching_keywords:
-                reasons.append(f"Matches your interest in {interest}")
-        
-        # Check skill matches
-        for skill in skills:
-            matching_keywords = [kw for kw in career.match_keywords 
-                               if kw.lower() in skill.lower() or skill.lower() in kw.lower()]
-            if matching_keywords:
-                reasons.append(f"Utilizes your {skill} skills")
+        snapshot = self.snapshot
+        reasons = self._term_reasons(snapshot, snapshot.positions[career.id], interests, skills)
+        return self._format_match_reasons(career, reasons)
+    
+    def _format_match_reasons(self, career: CareerPath, term_reasons: List[str]) -> List[str]:
+        """Append general appeal reasons to term reasons and keep the top 3"""
+        reasons = list(term_reasons[:3])
         
         # Add general appeal reasons
         if career.difficulty_level == "easy":
@@ -200,3 +557,7 @@ class CareerMatcher:
             reasons.append("Offers growth and development challenges")
         
         return reasons[:3]  # Limit to top 3 reasons
+    
+    def _position(self, career: CareerPath) -> int:
+        """Locate a career's position in the indexed catalog"""
+        return self.snapshot.positions[career.id]
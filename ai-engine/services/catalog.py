@@ -0,0 +1,141 @@
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+import asyncio
+import json
+import os
+import sqlite3
+import logging
+
+logger = logging.getLogger(__name__)
+
+CAREER_PATH_COLUMNS = [
+    "id", "title", "branch", "service_type", "description", "requirements",
+    "training_duration", "difficulty_level", "match_keywords",
+    "civilian_translation", "promotion_timeline"
+]
+
+JSON_COLUMNS = ["requirements", "match_keywords", "civilian_translation", "promotion_timeline"]
+
+class CatalogSource:
+    """Reads career catalog content from Postgres, SQLite or a JSON file.
+
+    The source is chosen from the URL scheme:
+
+    - ``postgresql://...`` reads the ``career_paths`` table (requires asyncpg)
+    - ``sqlite:///catalog.db`` reads a ``career_paths`` table whose
+      array/JSONB columns are stored as JSON text
+    - anything else is treated as a path to a JSON document with
+      ``career_paths`` and optional ``recommendation_templates`` keys
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+
+    @classmethod
+    def from_env(cls) -> Optional["CatalogSource"]:
+        url = os.getenv('CATALOG_SOURCE_URL')
+        return cls(url) if url else None
+
+    @property
+    def kind(self) -> str:
+        if self.url.startswith(("postgres://", "postgresql://")):
+            return "postgres"
+        if self.url.startswith("sqlite://"):
+            return "sqlite"
+        return "json"
+
+    async def load_career_paths(self) -> List[Dict[str, Any]]:
+        """Load career path rows as plain dicts"""
+        if self.kind == "postgres":
+            rows = await self._load_postgres()
+        elif self.kind == "sqlite":
+            rows = await asyncio.to_thread(self._load_sqlite)
+        else:
+            rows = (await asyncio.to_thread(self._load_json)).get("career_paths", [])
+        return [self._decode_row(row) for row in rows]
+
+    async def load_recommendation_templates(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Load recommendation templates, or None if the source has none"""
+        if self.kind != "json":
+            return None
+        return (await asyncio.to_thread(self._load_json)).get("recommendation_templates")
+
+    async def _load_postgres(self) -> List[Dict[str, Any]]:
+        import asyncpg
+
+        connection = await asyncpg.connect(self.url)
+        try:
+            records = await connection.fetch(
+                f"SELECT {', '.join(CAREER_PATH_COLUMNS)} FROM career_paths ORDER BY id"
+            )
+        finally:
+            await connection.close()
+        return [dict(record) for record in records]
+
+    def _load_sqlite(self) -> List[Dict[str, Any]]:
+        # sqlite:///relative.db or sqlite:////absolute/path.db
+        path = self.url[len("sqlite:///"):]
+        connection = sqlite3.connect(path)
+        connection.row_factory = sqlite3.Row
+        try:
+            records = connection.execute(
+                f"SELECT {', '.join(CAREER_PATH_COLUMNS)} FROM career_paths ORDER BY id"
+            ).fetchall()
+        finally:
+            connection.close()
+        return [dict(record) for record in records]
+
+    def _load_json(self) -> Dict[str, Any]:
+        with open(self.url, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _decode_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        row = dict(row)
+        for column in JSON_COLUMNS:
+            if isinstance(row.get(column), str):
+                row[column] = json.loads(row[column])
+        return row
+
+class SnapshotRefresher:
+    """Periodically rebuilds an immutable snapshot and swaps it in.
+
+    ``refresh`` is an async callable that loads new content, builds the
+    replacement snapshot off the request path and assigns it in a single
+    reference swap. Failures are logged and the previous snapshot is kept.
+    """
+
+    def __init__(self, name: str, refresh: Callable[[], Awaitable[bool]], interval_seconds: float):
+        self.name = name
+        self.refresh = refresh
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh_once(self) -> bool:
+        try:
+            changed = await self.refresh()
+            if changed:
+                logger.info(f"{self.name} snapshot refreshed")
+            return changed
+        except Exception as e:
+            logger.error(f"{self.name} refresh error: {str(e)}")
+            return False
+
+    def start(self, refresh_now: bool = False):
+        """Refresh every interval_seconds; refresh_now also runs one refresh right away"""
+        if self._task is None and (self.interval_seconds > 0 or refresh_now):
+            self._task = asyncio.create_task(self._run(refresh_now))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, refresh_now: bool = False):
+        if refresh_now:
+            await self.refresh_once()
+        while self.interval_seconds > 0:
+            await asyncio.sleep(self.interval_seconds)
+            await self.refresh_once()
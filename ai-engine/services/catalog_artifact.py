@@ -0,0 +1,102 @@
+from typing import Optional
+from dataclasses import replace
+from types import MappingProxyType
+import argparse
+import asyncio
+import gc
+import os
+import pickle
+import tempfile
+import time
+import logging
+
+from services.catalog import CatalogSource
+from services.career_matcher import CareerMatcher, CareerCatalogSnapshot
+from services.semantic_index import SemanticIndex
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the pickled snapshot classes change shape
+ARTIFACT_FORMAT = 5
+
+def write_artifact(snapshot: CareerCatalogSnapshot, path: str):
+    """Pickle a catalog snapshot with its prebuilt indexes.
+
+    The semantic index is left out: its matrix already lives in its own
+    memory-mapped cache file and is reattached on load.
+    """
+    payload = {
+        "format": ARTIFACT_FORMAT,
+        "version": snapshot.version,
+        "snapshot": replace(snapshot, positions=dict(snapshot.positions), semantic_index=None)
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # Write then rename so a starting process never reads a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def read_artifact(path: str, semantic_encoder=None) -> Optional[CareerCatalogSnapshot]:
+    """Load a snapshot written by write_artifact; None if it is missing or unusable"""
+    if not os.path.exists(path):
+        logger.warning(f"Catalog artifact {path} not found - building the catalog at startup")
+        return None
+
+    start = time.perf_counter()
+    # Unpickling allocates millions of containers; pausing the collector
+    # avoids repeated passes over objects that all stay alive
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+    except Exception as e:
+        logger.warning(f"Could not read catalog artifact {path}: {str(e)}")
+        return None
+    finally:
+        if gc_enabled:
+            gc.enable()
+    if payload.get("format") != ARTIFACT_FORMAT:
+        logger.warning(f"Catalog artifact {path} has format {payload.get('format')}, expected {ARTIFACT_FORMAT}")
+        return None
+    # The snapshot lives until the next catalog swap and is freed by
+    # reference counting; freezing keeps full collections from walking it
+    gc.freeze()
+
+    snapshot = payload["snapshot"]
+    snapshot = replace(
+        snapshot,
+        positions=MappingProxyType(snapshot.positions),
+        semantic_index=SemanticIndex.build(snapshot.careers, semantic_encoder) if semantic_encoder else None
+    )
+    logger.info(
+        f"Loaded catalog artifact {path} with {len(snapshot.careers)} careers "
+        f"(version {snapshot.version[:8]}) in {(time.perf_counter() - start) * 1000:.1f}ms"
+    )
+    return snapshot
+
+async def build_artifact(path: str) -> CareerCatalogSnapshot:
+    """Build the catalog snapshot the service would load and write it to path"""
+    matcher = CareerMatcher(catalog_source=CatalogSource.from_env())
+    await matcher.refresh_catalog()
+    write_artifact(matcher.snapshot, path)
+    return matcher.snapshot
+
+def main():
+    parser = argparse.ArgumentParser(description="Prebuild the career catalog artifact loaded at startup")
+    parser.add_argument("--output", default=os.getenv('CATALOG_ARTIFACT_PATH', 'catalog.artifact'))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    snapshot = asyncio.run(build_artifact(args.output))
+    print(f"Wrote {len(snapshot.careers)} careers (version {snapshot.version[:8]}) to {args.output}")
+
+if __name__ == "__main__":
+    main()
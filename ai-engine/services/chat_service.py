@@ -1,23 +1,72 @@
-import openai
+import httpx
+import asyncio
 import os
-from typing import List, Dict, Any, Optional
+import time
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, AsyncIterator
 import re
 from datetime import datetime
+from types import SimpleNamespace
 import logging
 
+from services.response_cache import CompletionCache, completion_cache_key
+from services.context_builder import ContextBuilder, extractive_summary
+from services.message_matcher import MessageMatcher, MessageSignals
+from services.single_flight import SingleFlight
+from services.backpressure import CircuitBreaker, AdmissionRejected
+from services.metrics import LLM_LATENCY, LLM_IN_FLIGHT, LLM_QUEUED, OPENAI_ERRORS, LLM_HEDGES, FALLBACK_RESPONSES as FALLBACK_COUNTER
+
 logger = logging.getLogger(__name__)
 
+FALLBACK_RESPONSES = {
+    'greeting': "Hello! I'm here to help you explore military career opportunities. What interests you most about potential military service?",
+    'aviation': "Aviation careers in the military are incredible! There are opportunities as pilots, air traffic controllers, aircraft mechanics, and avionics technicians. The training is world-class and leads to excellent civilian aviation careers. What specifically interests you about aviation?",
+    'technology': "Technology and cybersecurity are huge growth areas in the military! You'd get cutting-edge training in network security, digital forensics, and IT systems. These skills are in high demand in the civilian world with great salaries. Are you interested in defensive cybersecurity or more general IT work?",
+    'medical': "Military medical careers offer amazing training opportunities! From combat medics to nurses, doctors, and medical technicians, you'd get hands-on experience that translates directly to civilian healthcare careers. What aspect of healthcare interests you most?",
+    'default': "That's a great question! Military service offers many paths with excellent training and career prospects. Would you like to explore areas like technology, aviation, medical, mechanics, or leadership roles? I'm here to help you understand what might be the best fit for your interests and goals."
+}
+
 class ChatService:
     def __init__(self):
         api_key = os.getenv('OPENAI_API_KEY')
         self.openai_available = api_key and api_key != 'sk-dummy-key-for-testing' and not api_key.startswith('sk-your-')
         
-        if self.openai_available:
-            self.client = openai.OpenAI(api_key=api_key)
-        else:
-            self.client = None
+        # Concurrency and timeout settings for the completion client
+        self.max_concurrency = int(os.getenv('OPENAI_MAX_CONCURRENCY', '256'))
+        self.request_timeout = float(os.getenv('OPENAI_TIMEOUT_SECONDS', '20'))
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        # Backpressure: calls beyond the queue bound, or waiting too long for
+        # a slot, are shed to the fallback instead of piling up
+        self.max_queue_depth = int(os.getenv('OPENAI_MAX_QUEUE', '512'))
+        self.max_queue_wait = float(os.getenv('OPENAI_MAX_QUEUE_WAIT_SECONDS', '2'))
+        self.deadline_seconds = float(os.getenv('OPENAI_DEADLINE_SECONDS', str(self.request_timeout)))
+        self.min_call_seconds = 0.25
+        # Send a second identical request when the first is slower than this (0 disables)
+        self.hedge_after = float(os.getenv('OPENAI_HEDGE_AFTER_SECONDS', '0'))
+        self.breaker = CircuitBreaker.from_env(self.request_timeout)
+        
+        self.llm_in_flight = 0
+        self.llm_queued = 0
+        self.last_success_at: Optional[float] = None
+        self.last_error_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        
+        # The OpenAI SDK is slow to import; the client is built by connect(),
+        # which startup runs off the event loop before the app reports ready
+        self.api_key = api_key
+        self.http_client = None
+        self.client = None
+        if not self.openai_available:
             logger.warning("OpenAI API key not configured - using fallback responses only")
         
+        self.model = "gpt-3.5-turbo"
+        self.completion_cache = CompletionCache.from_env()
+        self.completion_flights = SingleFlight("completion")
+        self.message_matcher = MessageMatcher()
+        self.max_reply_tokens = 500
+        self.context_builder = ContextBuilder.from_env(self._summarize, self.model, self.max_reply_tokens)
+        
         self.system_prompt = """
 You are OpportunityAI, a friendly and knowledgeable military career counselor. Your goal is to help people explore military service opportunities in a non-pressured, informative way.
 
@@ -39,10 +88,42 @@ When discussing careers:
 If someone asks about sensitive topics like combat, deployment, or military life challenges, be honest but balanced in your response.
 """
     
-    async def process_message(self, message: str, conversation_history: List[Dict] = None, user_profile: Dict = None) -> Dict[str, Any]:
+    def connect(self):
+        """Import the OpenAI SDK and build the pooled client (no-op once built or when unconfigured)"""
+        if self.client is not None or not self.openai_available:
+            return
+        import openai
+        
+        # One pooled HTTP client shared by every in-flight completion
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=min(self.max_concurrency, 64)
+            ),
+            timeout=httpx.Timeout(self.request_timeout, connect=5.0)
+        )
+        self.client = openai.AsyncOpenAI(
+            api_key=self.api_key,
+            http_client=self.http_client,
+            timeout=self.request_timeout,
+            max_retries=int(os.getenv('OPENAI_MAX_RETRIES', '1'))
+        )
+    
+    async def start(self):
+        """Warm up the completion client and tokenizer in a worker thread"""
+        await asyncio.to_thread(self.connect)
+        await asyncio.to_thread(self.context_builder.token_counter.load)
+    
+    async def process_message(self, message: str, conversation_history: List[Dict] = None, user_profile: Dict = None,
+                              conversation_id: Optional[str] = None, history_offset: int = 0,
+                              signals: Optional[MessageSignals] = None) -> Dict[str, Any]:
+        # Callers that already scanned the message pass its signals along
+        signals = signals or self.analyze_message(message)
+        
         # Use fallback if OpenAI is not available
         if not self.openai_available:
-            fallback_response = self._generate_fallback_response(message)
+            FALLBACK_COUNTER.labels("unconfigured").inc()
+            fallback_response = self._generate_fallback_response(signals)
             return {
                 "response": fallback_response,
                 "trigger_recommendations": True,
@@ -51,38 +132,17 @@ If someone asks about sensitive topics like combat, deployment, or military life
             }
         
         try:
-            # Prepare conversation context
-            messages = [{
-                "role": "system",
-                "content": self.system_prompt
-            }]
+            conversation_history = self._history_dicts(conversation_history)
             
-            # Add conversation history
-            if conversation_history:
-                for msg in conversation_history[-10:]:  # Keep last 10 messages for context
-                    messages.append({
-                        "role": msg.get('role', 'user'),
-                        "content": msg.get('content', '')
-                    })
-            
-            # Add current message
-            messages.append({
-                "role": "user",
-                "content": message
-            })
-            
-            # Call OpenAI API
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=messages,
-                max_tokens=500,
-                temperature=0.7
+            # Identical prompts already in flight share one completion
+            flight_key = self._flight_key(message, conversation_history, conversation_id, history_offset)
+            ai_response = await self.completion_flights.do(
+                flight_key,
+                lambda: self._complete(message, conversation_history, conversation_id, history_offset)
             )
             
-            ai_response = response.choices[0].message.content
-            
             # Determine if we should trigger career recommendations
-            trigger_recommendations = self._should_trigger_recommendations(message, ai_response)
+            trigger_recommendations = self._should_trigger_recommendations(signals, ai_response)
             
             return {
                 "response": ai_response,
@@ -92,10 +152,10 @@ If someone asks about sensitive topics like combat, deployment, or military life
             }
             
         except Exception as e:
-            logger.error(f"OpenAI API error: {str(e)}")
+            FALLBACK_COUNTER.labels(self._fallback_reason(e)).inc()
             
             # Fallback response if OpenAI is unavailable
-            fallback_response = self._generate_fallback_response(message)
+            fallback_response = self._generate_fallback_response(signals)
             
             return {
                 "response": fallback_response,
@@ -104,55 +164,324 @@ If someone asks about sensitive topics like combat, deployment, or military life
                 "timestamp": datetime.utcnow().isoformat()
             }
     
-    def _should_trigger_recommendations(self, user_message: str, ai_response: str) -> bool:
-        """Determine if we should show career recommendations based on the conversation"""
-        trigger_keywords = [
-            'interested in', 'like to', 'career', 'job', 'work', 'field',
-            'aviation', 'cyber', 'technology', 'medical', 'engineering',
-            'leadership', 'travel', 'benefits', 'training'
-        ]
-        
-        message_lower = user_message.lower()
-        return any(keyword in message_lower for keyword in trigger_keywords)
-    
-    def extract_interests(self, message: str) -> List[str]:
-        """Extract potential interests from user message"""
-        interests = []
-        
-        # Define interest categories and keywords
-        interest_mapping = {
-            'technology': ['computer', 'tech', 'cyber', 'IT', 'programming', 'software'],
-            'aviation': ['flying', 'pilot', 'aircraft', 'aviation', 'air force'],
-            'medical': ['medical', 'healthcare', 'doctor', 'nurse', 'health'],
-            'engineering': ['engineering', 'mechanical', 'electrical', 'build'],
-            'leadership': ['leadership', 'manage', 'lead', 'supervisor'],
-            'travel': ['travel', 'different places', 'world', 'deploy'],
-            'mechanics': ['mechanical', 'fix', 'repair', 'maintenance'],
-            'communications': ['communication', 'radio', 'signals', 'network']
-        }
+    async def _complete(self, message: str, conversation_history: List[Dict[str, Any]],
+                        conversation_id: Optional[str], history_offset: int) -> str:
+        """Return the model reply, from the completion cache when possible"""
+        cache_key = None
+        if self.completion_cache is not None:
+            cache_key = self.completion_cache.key(self.model, self.system_prompt, conversation_history, message)
+            cached = await self.completion_cache.get(cache_key)
+            if cached is not None:
+                return cached
         
-        message_lower = message.lower()
+        deadline = time.monotonic() + self.deadline_seconds
+        messages = await self._build_messages(message, conversation_history, conversation_id, history_offset)
+        response = await self._hedged_completion(messages, deadline)
         
-        for interest, keywords in interest_mapping.items():
-            if any(keyword in message_lower for keyword in keywords):
-                interests.append(interest)
+        ai_response = response.choices[0].message.content
         
-        return interests
+        if cache_key is not None and ai_response:
+            await self.completion_cache.set(cache_key, ai_response)
+        return ai_response
     
-    def _generate_fallback_response(self, message: str) -> str:
-        """Generate a fallback response when OpenAI is unavailable"""
-        message_lower = message.lower()
+    async def _create_completion(self, messages: List[Dict[str, str]], deadline: float):
+        """One completion request, bounded by the caller's deadline"""
+        async with self._llm_call("completion", deadline):
+            remaining = deadline - time.monotonic()
+            return await asyncio.wait_for(
+                self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=self.max_reply_tokens,
+                    temperature=0.7,
+                    timeout=min(self.request_timeout, remaining)
+                ),
+                remaining
+            )
+    
+    async def _hedged_completion(self, messages: List[Dict[str, str]], deadline: float):
+        """Complete, hedging with a second request if the first is slow.
+        
+        The hedge is only sent while the breaker is closed and less than
+        half the concurrency limit is in use; the first good answer wins and
+        the other request is cancelled.
+        """
+        if self.hedge_after <= 0:
+            return await self._create_completion(messages, deadline)
+        
+        first = asyncio.ensure_future(self._create_completion(messages, deadline))
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+            if (done or self.breaker.state != CircuitBreaker.CLOSED
+                    or self.llm_in_flight >= self.max_concurrency // 2
+                    or deadline - time.monotonic() < self.min_call_seconds):
+                return await first
+            
+            LLM_HEDGES.labels("launched").inc()
+            tasks.append(asyncio.ensure_future(self._create_completion(messages, deadline)))
+            pending = set(tasks)
+            errors = []
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            LLM_HEDGES.labels("won").inc()
+                        return task.result()
+                    errors.append(task.exception())
+            raise errors[0]
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    def _fallback_reason(self, error: Exception) -> str:
+        """Metric label for a fallback; rejected calls are expected under load and only logged as warnings"""
+        if isinstance(error, AdmissionRejected):
+            logger.warning(f"LLM call rejected ({error.reason}) - serving fallback")
+            return error.reason
+        logger.error(f"OpenAI API error: {type(error).__name__}: {str(error)}")
+        return "error"
+    
+    def _flight_key(self, message: str, conversation_history: List[Dict[str, Any]],
+                    conversation_id: Optional[str], history_offset: int) -> str:
+        """Key identical prompts: the whole history plus the message.
+        
+        Conversations with evicted turns also depend on their own rolling
+        summary, so they only coalesce with themselves.
+        """
+        key = completion_cache_key(self.model, self.system_prompt, conversation_history, message,
+                                   context_turns=len(conversation_history))
+        return f"{key}:{conversation_id}" if history_offset else key
+    
+    async def stream_message(self, message: str, conversation_history: List[Dict] = None, user_profile: Dict = None,
+                             conversation_id: Optional[str] = None, history_offset: int = 0,
+                             signals: Optional[MessageSignals] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the reply as token events, followed by a single completion event"""
+        signals = signals or self.analyze_message(message)
+        if not self.openai_available:
+            FALLBACK_COUNTER.labels("unconfigured").inc()
+            async for event in self._stream_fallback(signals, confidence=0.7):
+                yield event
+            return
         
-        if any(word in message_lower for word in ['hello', 'hi', 'hey']):
-            return "Hello! I'm here to help you explore military career opportunities. What interests you most about potential military service?"
+        chunks = []
+        cache_key = None
+        try:
+            conversation_history = self._history_dicts(conversation_history)
+            
+            if self.completion_cache is not None:
+                cache_key = self.completion_cache.key(self.model, self.system_prompt, conversation_history, message)
+                cached = await self.completion_cache.get(cache_key)
+                if cached is not None:
+                    for word in re.findall(r'\S+\s*', cached):
+                        yield {"type": "token", "content": word}
+                    yield self._completion_event(signals, cached)
+                    return
+            
+            deadline = time.monotonic() + self.deadline_seconds
+            messages = await self._build_messages(message, conversation_history, conversation_id, history_offset)
+            
+            async with self._llm_call("stream", deadline) as call:
+                remaining = deadline - time.monotonic()
+                stream = await asyncio.wait_for(
+                    self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        max_tokens=self.max_reply_tokens,
+                        temperature=0.7,
+                        stream=True,
+                        timeout=min(self.request_timeout, remaining)
+                    ),
+                    remaining
+                )
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        if call.first_token_at is None:
+                            call.first_token_at = time.perf_counter()
+                        chunks.append(delta)
+                        yield {"type": "token", "content": delta}
+            
+        except Exception as e:
+            # Only fall back if nothing has reached the client yet
+            if not chunks:
+                FALLBACK_COUNTER.labels(self._fallback_reason(e)).inc()
+                async for event in self._stream_fallback(signals, confidence=0.5):
+                    yield event
+                return
+            logger.error(f"OpenAI streaming error: {str(e)}")
         
-        if 'aviation' in message_lower or 'pilot' in message_lower:
-            return "Aviation careers in the military are incredible! There are opportunities as pilots, air traffic controllers, aircraft mechanics, and avionics technicians. The training is world-class and leads to excellent civilian aviation careers. What specifically interests you about aviation?"
+        ai_response = "".join(chunks)
+        if cache_key is not None and ai_response:
+            await self.completion_cache.set(cache_key, ai_response)
+        yield self._completion_event(signals, ai_response)
+    
+    @asynccontextmanager
+    async def _llm_call(self, mode: str, deadline: Optional[float] = None):
+        """Admit one OpenAI call, hold a concurrency slot for it and record its metrics.
         
-        if any(word in message_lower for word in ['cyber', 'technology', 'computer']):
-            return "Technology and cybersecurity are huge growth areas in the military! You'd get cutting-edge training in network security, digital forensics, and IT systems. These skills are in high demand in the civilian world with great salaries. Are you interested in defensive cybersecurity or more general IT work?"
+        Raises AdmissionRejected without contacting the provider when the
+        breaker is open, the admission queue is full, no slot frees up in
+        time or too little of the deadline is left.
+        """
+        if deadline is not None and deadline - time.monotonic() < self.min_call_seconds:
+            raise AdmissionRejected("deadline", "Not enough time left for an LLM call")
+        if self.llm_queued >= self.max_queue_depth:
+            raise AdmissionRejected("shed", "LLM admission queue is full")
         
-        if 'medical' in message_lower:
-            return "Military medical careers offer amazing training opportunities! From combat medics to nurses, doctors, and medical technicians, you'd get hands-on experience that translates directly to civilian healthcare careers. What aspect of healthcare interests you most?"
+        took_probe = False
+        acquired = False
+        recorded = False
+        try:
+            took_probe = self.breaker.before_call()
+            if self.client is None:
+                # A call that arrives before startup finished builds the client itself
+                self.connect()
+            
+            self.llm_queued += 1
+            LLM_QUEUED.inc()
+            wait = self.max_queue_wait
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic() - self.min_call_seconds)
+            try:
+                if self._semaphore.locked():
+                    await asyncio.wait_for(self._semaphore.acquire(), max(wait, 0))
+                else:
+                    await self._semaphore.acquire()
+                acquired = True
+            except asyncio.TimeoutError:
+                raise AdmissionRejected("shed", "Timed out waiting for an LLM slot")
+            finally:
+                self.llm_queued -= 1
+                LLM_QUEUED.dec()
+            
+            self.llm_in_flight += 1
+            LLM_IN_FLIGHT.inc()
+            start = time.perf_counter()
+            call = SimpleNamespace(first_token_at=None)
+            outcome = "cancelled"
+            try:
+                yield call
+                outcome = "success"
+                self.last_success_at = time.time()
+            except Exception as e:
+                outcome = "error"
+                OPENAI_ERRORS.labels(type(e).__name__).inc()
+                self.last_error_at = time.time()
+                self.last_error = type(e).__name__
+                raise
+            finally:
+                self.llm_in_flight -= 1
+                LLM_IN_FLIGHT.dec()
+                duration = time.perf_counter() - start
+                LLM_LATENCY.labels(mode, outcome).observe(duration)
+                if outcome != "cancelled":
+                    # Streams are judged on time to first token, not total length
+                    responsive = (call.first_token_at - start) if call.first_token_at else duration
+                    self.breaker.record(outcome == "success", responsive)
+                    recorded = True
+        finally:
+            if acquired:
+                self._semaphore.release()
+            if took_probe and not recorded:
+                self.breaker.release_probe()
+    
+    def llm_status(self) -> Dict[str, Any]:
+        """Readiness details for the completion client"""
+        reachable = None
+        if self.openai_available and (self.last_success_at or self.last_error_at):
+            reachable = (self.last_success_at or 0) >= (self.last_error_at or 0)
+        return {
+            "configured": bool(self.openai_available),
+            "reachable": reachable,
+            "last_success_at": self.last_success_at,
+            "last_error_at": self.last_error_at,
+            "last_error": self.last_error,
+            "in_flight": self.llm_in_flight,
+            "queue_depth": self.llm_queued,
+            "max_queue_depth": self.max_queue_depth,
+            "max_concurrency": self.max_concurrency,
+            "circuit_breaker": self.breaker.status()
+        }
+    
+    def _completion_event(self, signals: MessageSignals, ai_response: str) -> Dict[str, Any]:
+        return {
+            "type": "complete",
+            "response": ai_response,
+            "trigger_recommendations": self._should_trigger_recommendations(signals, ai_response),
+            "confidence": 0.85,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
+    async def _stream_fallback(self, signals: MessageSignals, confidence: float) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a fallback response through the same event interface as the model"""
+        fallback_response = self._generate_fallback_response(signals)
+        for word in re.findall(r'\S+\s*', fallback_response):
+            yield {"type": "token", "content": word}
+        yield {
+            "type": "complete",
+            "response": fallback_response,
+            "trigger_recommendations": True,
+            "confidence": confidence,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
+    async def _build_messages(self, message: str, conversation_history: List[Dict] = None,
+                              conversation_id: Optional[str] = None, history_offset: int = 0) -> List[Dict[str, str]]:
+        """Build the chat completion message list, fitting history to the context token budget"""
+        return await self.context_builder.build(
+            self.system_prompt, self._history_dicts(conversation_history), message, conversation_id, history_offset
+        )
+    
+    async def _summarize(self, previous_summary: Optional[str], turns: List[Dict[str, str]]) -> str:
+        """Fold turns that dropped out of the context window into the rolling summary"""
+        if not self.openai_available:
+            return extractive_summary(previous_summary, turns)
         
-        return "That's a great question! Military service offers many paths with excellent training and career prospects. Would you like to explore areas like technology, aviation, medical, mechanics, or leadership roles? I'm here to help you understand what might be the best fit for your interests and goals."
+        transcript = "\n".join(f"{turn.get('role', 'user')}: {turn.get('content', '')}" for turn in turns)
+        prompt = (
+            "Update the summary of a military career counseling conversation. Keep the user's interests, "
+            "background, constraints and any careers already discussed. Answer in under 120 words.\n\n"
+            f"Current summary: {previous_summary or '(none)'}\n\nNew messages:\n{transcript}"
+        )
+        try:
+            async with self._llm_call("summary"):
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=200,
+                    temperature=0.2,
+                    timeout=self.request_timeout
+                )
+            return response.choices[0].message.content or extractive_summary(previous_summary, turns)
+        except Exception as e:
+            logger.error(f"Summary generation error: {str(e)}")
+            return extractive_summary(previous_summary, turns)
+    
+    def _history_dicts(self, conversation_history: List[Any] = None) -> List[Dict[str, Any]]:
+        """Accept history as dicts or ChatMessage models"""
+        return [msg if isinstance(msg, dict) else msg.model_dump() for msg in conversation_history or []]
+    
+    async def close(self):
+        """Release pooled HTTP connections held by the OpenAI client"""
+        if self.client is not None:
+            await self.client.close()
+        if self.completion_cache is not None:
+            await self.completion_cache.close()
+        await self.context_builder.close()
+    
+    def analyze_message(self, message: str) -> MessageSignals:
+        """Scan a user message once for interests, recommendation triggers and fallback intent"""
+        return self.message_matcher.scan(message)
+    
+    def _should_trigger_recommendations(self, signals: MessageSignals, ai_response: str) -> bool:
+        """Determine if we should show career recommendations based on the conversation"""
+        return signals.trigger_recommendations
+    
+    def _generate_fallback_response(self, signals: MessageSignals) -> str:
+        """Generate a fallback response when OpenAI is unavailable"""
+        return FALLBACK_RESPONSES.get(signals.fallback_intent, FALLBACK_RESPONSES['default'])
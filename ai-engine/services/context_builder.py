@@ -0,0 +1,267 @@
+from typing import List, Dict, Optional, Callable, Awaitable
+from collections import OrderedDict
+from dataclasses import dataclass
+import asyncio
+import hashlib
+import os
+import re
+import logging
+
+from services.database import Database, get_database
+
+logger = logging.getLogger(__name__)
+
+# Per-message overhead the chat format adds around role and content
+MESSAGE_OVERHEAD_TOKENS = 4
+
+class TokenCounter:
+    """Counts tokens with tiktoken when installed, otherwise estimates ~4 chars/token.
+
+    Counts are memoized by content hash, so each message in a conversation is
+    tokenized once no matter how many turns resend it.
+    """
+
+    def __init__(self, model: str = "gpt-3.5-turbo", max_entries: int = 50000):
+        self.model = model
+        self.max_entries = max_entries
+        self._counts: "OrderedDict[str, int]" = OrderedDict()
+        self._encoding = None
+        self._loaded = False
+
+    def load(self):
+        """Load the tiktoken encoding; deferred because it is slow to import and may download"""
+        if self._loaded:
+            return
+        try:
+            import tiktoken
+            self._encoding = tiktoken.encoding_for_model(self.model)
+        except Exception:
+            logger.info("tiktoken unavailable - estimating token counts from text length")
+        self._loaded = True
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if not self._loaded:
+            self.load()
+        key = hashlib.sha1(text.encode()).hexdigest()
+        cached = self._counts.get(key)
+        if cached is not None:
+            self._counts.move_to_end(key)
+            return cached
+
+        if self._encoding is not None:
+            tokens = len(self._encoding.encode(text))
+        else:
+            tokens = max(1, (len(text) + 3) // 4)
+
+        self._counts[key] = tokens
+        if len(self._counts) > self.max_entries:
+            self._counts.popitem(last=False)
+        return tokens
+
+    def message_tokens(self, content: str) -> int:
+        return self.count(content) + MESSAGE_OVERHEAD_TOKENS
+
+@dataclass(frozen=True)
+class ConversationSummary:
+    """Rolling summary of the first `covered` messages of a conversation"""
+    text: str
+    covered: int
+
+class InMemorySummaryStore:
+    """Bounded LRU of conversation summaries"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._summaries: "OrderedDict[str, ConversationSummary]" = OrderedDict()
+
+    async def get(self, conversation_key: str) -> Optional[ConversationSummary]:
+        summary = self._summaries.get(conversation_key)
+        if summary is not None:
+            self._summaries.move_to_end(conversation_key)
+        return summary
+
+    async def put(self, conversation_key: str, summary: ConversationSummary):
+        self._summaries[conversation_key] = summary
+        self._summaries.move_to_end(conversation_key)
+        while len(self._summaries) > self.max_entries:
+            self._summaries.popitem(last=False)
+
+    async def close(self):
+        pass
+
+class DatabaseSummaryStore(InMemorySummaryStore):
+    """Summary store that persists to conversations.context_summary.
+
+    Only conversation keys that are conversations-table UUIDs are persisted;
+    reads go through the in-memory LRU first.
+    """
+
+    UUID_PATTERN = re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$')
+
+    def __init__(self, database: Database, max_entries: int = 10000):
+        super().__init__(max_entries)
+        self.database = database
+
+    async def get(self, conversation_key: str) -> Optional[ConversationSummary]:
+        summary = await super().get(conversation_key)
+        if summary is not None or not self.UUID_PATTERN.match(conversation_key):
+            return summary
+
+        try:
+            rows = await self.database.fetch(
+                "SELECT context_summary, context_summary_message_count FROM conversations WHERE id = $1",
+                conversation_key
+            )
+            row = rows[0] if rows else None
+        except Exception as e:
+            logger.error(f"Summary load error: {str(e)}")
+            return None
+
+        if row is None or not row["context_summary"]:
+            return None
+        summary = ConversationSummary(text=row["context_summary"], covered=row["context_summary_message_count"])
+        await super().put(conversation_key, summary)
+        return summary
+
+    async def put(self, conversation_key: str, summary: ConversationSummary):
+        await super().put(conversation_key, summary)
+        if not self.UUID_PATTERN.match(conversation_key):
+            return
+
+        # The conversation row itself may still be waiting in the write-behind
+        # queue, so create it here; the queue's insert skips existing rows
+        try:
+            await self.database.execute(
+                """
+                INSERT INTO conversations (id, context_summary, context_summary_message_count) VALUES ($1, $2, $3)
+                ON CONFLICT (id) DO UPDATE SET context_summary = EXCLUDED.context_summary,
+                    context_summary_message_count = EXCLUDED.context_summary_message_count
+                """,
+                conversation_key, summary.text, summary.covered
+            )
+        except Exception as e:
+            logger.error(f"Summary save error: {str(e)}")
+
+Summarizer = Callable[[Optional[str], List[Dict[str, str]]], Awaitable[str]]
+
+class ContextBuilder:
+    """Fits conversation history into a token budget for each completion request.
+
+    The newest turns are kept verbatim while they fit. Older turns are
+    replaced by a rolling summary, which is extended incrementally in the
+    background: only turns that have newly fallen out of the window are
+    summarized, and the request never waits for it.
+    """
+
+    def __init__(self, summarizer: Summarizer, token_counter: Optional[TokenCounter] = None,
+                 summary_store=None, token_budget: int = 3000, reply_tokens: int = 500,
+                 max_messages: int = 20):
+        self.summarizer = summarizer
+        self.token_counter = token_counter or TokenCounter()
+        self.summary_store = summary_store or InMemorySummaryStore()
+        self.token_budget = token_budget
+        self.reply_tokens = reply_tokens
+        self.max_messages = max_messages
+        self._pending: Dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def from_env(cls, summarizer: Summarizer, model: str = "gpt-3.5-turbo",
+                 reply_tokens: int = 500) -> "ContextBuilder":
+        summary_store = None
+        if os.getenv('CONTEXT_SUMMARY_PERSIST', 'false').lower() == 'true' and os.getenv('DATABASE_URL'):
+            summary_store = DatabaseSummaryStore(get_database(os.getenv('DATABASE_URL')))
+        return cls(
+            summarizer=summarizer,
+            token_counter=TokenCounter(model),
+            summary_store=summary_store,
+            token_budget=int(os.getenv('CONTEXT_TOKEN_BUDGET', '3000')),
+            reply_tokens=reply_tokens,
+            max_messages=int(os.getenv('CONTEXT_MAX_MESSAGES', '20'))
+        )
+
+    async def build(self, system_prompt: str, history: List[Dict[str, str]], message: str,
+                    conversation_id: Optional[str] = None, offset: int = 0) -> List[Dict[str, str]]:
+        """Return the message list for a completion request within the token budget.
+
+        offset is the absolute index of history[0] when the caller only holds
+        the tail of a longer conversation. Rolling summaries are kept only for
+        conversations with a server-issued conversation_id; for stateless
+        requests the turns that do not fit are dropped, since nothing in the
+        request identifies whose summary it would be.
+        """
+        count = self.token_counter.message_tokens
+        available = self.token_budget - self.reply_tokens - count(system_prompt) - count(message)
+
+        kept = self._fit(history, available)
+        first_kept = len(history) - len(kept)
+
+        summary = None
+        if conversation_id and offset + first_kept > 0:
+            key = str(conversation_id)
+            summary = await self.summary_store.get(key)
+            if summary is not None and summary.covered <= offset + first_kept:
+                # Make room for the summary, then refit
+                kept = self._fit(history, available - count(summary.text))
+                first_kept = len(history) - len(kept)
+            else:
+                summary = None
+
+            covered = summary.covered if summary else 0
+            if covered < offset + first_kept:
+                new_turns = history[max(covered - offset, 0):first_kept]
+                self._schedule_summary(key, summary, new_turns, offset + first_kept)
+
+        messages = [{"role": "system", "content": system_prompt}]
+        if summary is not None:
+            messages.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation: {summary.text}"
+            })
+        messages.extend({"role": turn.get('role', 'user'), "content": turn.get('content', '')} for turn in kept)
+        messages.append({"role": "user", "content": message})
+        return messages
+
+    def _fit(self, history: List[Dict[str, str]], available: int) -> List[Dict[str, str]]:
+        """Newest turns, oldest first, that fit in the available tokens"""
+        kept = []
+        for turn in reversed(history[-self.max_messages:]):
+            tokens = self.token_counter.message_tokens(turn.get('content', ''))
+            if tokens > available:
+                break
+            kept.append(turn)
+            available -= tokens
+        kept.reverse()
+        return kept
+
+    def _schedule_summary(self, key: str, previous: Optional[ConversationSummary],
+                          new_turns: List[Dict[str, str]], covered: int):
+        """Extend the rolling summary in the background, one update per conversation at a time"""
+        if key in self._pending or not new_turns:
+            return
+
+        async def update():
+            try:
+                text = await self.summarizer(previous.text if previous else None, new_turns)
+                await self.summary_store.put(key, ConversationSummary(text=text, covered=covered))
+            except Exception as e:
+                logger.error(f"Conversation summary error: {str(e)}")
+            finally:
+                self._pending.pop(key, None)
+
+        self._pending[key] = asyncio.create_task(update())
+
+    async def close(self):
+        for task in list(self._pending.values()):
+            task.cancel()
+        await self.summary_store.close()
+
+def extractive_summary(previous: Optional[str], turns: List[Dict[str, str]], max_chars: int = 800) -> str:
+    """Cheap summary without a model call: carry forward what the user said"""
+    points = [previous] if previous else []
+    for turn in turns:
+        if turn.get('role') == 'user' and turn.get('content'):
+            points.append(f"User said: {turn['content'].strip()[:160]}")
+    text = " ".join(points)
+    return text[-max_chars:]
@@ -0,0 +1,124 @@
+from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+import os
+import uuid
+import logging
+from datetime import datetime
+
+from services.database import Database
+from services.write_behind import WriteBehindQueue
+
+logger = logging.getLogger(__name__)
+
+def is_uuid(value: str) -> bool:
+    try:
+        uuid.UUID(str(value))
+        return True
+    except ValueError:
+        return False
+
+@dataclass
+class ConversationState:
+    """Recent turns of one conversation; offset is the absolute index of turns[0]"""
+    turns: deque
+    offset: int = 0
+
+class ConversationStore:
+    """Bounded in-memory store of recent turns per conversation.
+
+    Holds at most max_conversations conversations (least recently used are
+    evicted) and the last max_turns turns of each. With a write-behind
+    queue, appended turns are persisted to the messages table off the
+    request path, and conversations missing from memory are reloaded from
+    the database.
+    """
+
+    MAX_KNOWN_CONVERSATIONS = 10000
+
+    def __init__(self, max_conversations: int = 10000, max_turns: int = 50,
+                 writer: Optional[WriteBehindQueue] = None):
+        self.max_conversations = max_conversations
+        self.max_turns = max_turns
+        self.writer = writer
+        self.database: Optional[Database] = writer.database if writer is not None else None
+        self._conversations: "OrderedDict[str, ConversationState]" = OrderedDict()
+        # Conversations already queued for the conversations table
+        self._known_conversations: "OrderedDict[str, None]" = OrderedDict()
+
+    @classmethod
+    def from_env(cls, writer: Optional[WriteBehindQueue] = None) -> "ConversationStore":
+        persist = os.getenv('CONVERSATION_PERSIST', 'false').lower() == 'true'
+        return cls(
+            max_conversations=int(os.getenv('CONVERSATION_STORE_MAX_CONVERSATIONS', '10000')),
+            max_turns=int(os.getenv('CONVERSATION_STORE_MAX_TURNS', '50')),
+            writer=writer if persist else None
+        )
+
+    async def _load(self, conversation_id: str) -> Tuple[List[Dict[str, str]], int]:
+        """Return the latest turns of a stored conversation and the index of the first one"""
+        rows = await self.database.fetch(
+            """
+            SELECT role, content, count(*) OVER () AS total
+            FROM messages WHERE conversation_id = $1
+            ORDER BY created_at DESC, id DESC LIMIT $2
+            """,
+            conversation_id, self.max_turns
+        )
+        if not rows:
+            return [], 0
+        turns = [{"role": row["role"], "content": row["content"]} for row in reversed(rows)]
+        return turns, rows[0]["total"] - len(turns)
+
+    def new_conversation_id(self) -> str:
+        return str(uuid.uuid4())
+
+    async def _state(self, conversation_id: str, seed: Optional[List[Dict[str, str]]] = None) -> ConversationState:
+        state = self._conversations.get(conversation_id)
+        if state is not None:
+            self._conversations.move_to_end(conversation_id)
+            return state
+
+        turns, offset = [], 0
+        if self.database is not None and is_uuid(conversation_id):
+            try:
+                turns, offset = await self._load(conversation_id)
+            except Exception as e:
+                logger.error(f"Conversation load error: {str(e)}")
+        if not turns and seed:
+            # Unknown conversation: adopt the history the client sent
+            turns = seed[-self.max_turns:]
+            offset = len(seed) - len(turns)
+
+        state = self._conversations.get(conversation_id)
+        if state is None:
+            state = ConversationState(turns=deque(turns, maxlen=self.max_turns), offset=offset)
+            self._conversations[conversation_id] = state
+            while len(self._conversations) > self.max_conversations:
+                self._conversations.popitem(last=False)
+        return state
+
+    async def history(self, conversation_id: str,
+                      seed: Optional[List[Dict[str, str]]] = None) -> Tuple[List[Dict[str, str]], int]:
+        """Return (recent turns, absolute index of the first turn)"""
+        state = await self._state(conversation_id, seed)
+        return list(state.turns), state.offset
+
+    async def append(self, conversation_id: str, role: str, content: str):
+        state = await self._state(conversation_id)
+        if len(state.turns) == state.turns.maxlen:
+            state.offset += 1
+        state.turns.append({"role": role, "content": content})
+        if self.writer is not None and is_uuid(conversation_id):
+            if conversation_id not in self._known_conversations:
+                # The parent row is queued first; without it the message would fail its foreign key
+                if not self.writer.enqueue("conversations", (conversation_id,)):
+                    return
+                self._known_conversations[conversation_id] = None
+                while len(self._known_conversations) > self.MAX_KNOWN_CONVERSATIONS:
+                    self._known_conversations.popitem(last=False)
+            # Stamp turns now so batched inserts keep their real order
+            self.writer.enqueue("messages", (conversation_id, role, content, datetime.utcnow()))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"conversations": len(self._conversations)}
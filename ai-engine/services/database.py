@@ -0,0 +1,263 @@
+from typing import List, Dict, Any, Optional, Tuple, Sequence
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class TableSpec:
+    """A table written through the write-behind queue.
+
+    Rows are tuples in column order. Tables whose rows may already exist
+    (skip_conflicts) are written with INSERT ... ON CONFLICT DO NOTHING;
+    append-only tables can be bulk-loaded with COPY. Values of json_columns
+    that are not already strings are serialized when the batch is written.
+    optional_references are (column, table) foreign keys to rows the engine
+    does not own; values with no matching id in that table are written as
+    NULL.
+    """
+    name: str
+    columns: Tuple[str, ...]
+    skip_conflicts: bool = False
+    json_columns: Tuple[str, ...] = ()
+    optional_references: Tuple[Tuple[str, str], ...] = ()
+
+    def encode(self, rows: List[tuple]) -> List[tuple]:
+        if not self.json_columns:
+            return rows
+        positions = [self.columns.index(column) for column in self.json_columns]
+        encoded = []
+        for row in rows:
+            row = list(row)
+            for position in positions:
+                if row[position] is not None and not isinstance(row[position], str):
+                    row[position] = json.dumps(row[position], default=str)
+            encoded.append(tuple(row))
+        return encoded
+
+class Database(ABC):
+    """Async access to the engine's database, shared by everything that persists.
+
+    Queries use asyncpg-style $1 placeholders on every backend.
+    """
+
+    url: str
+
+    @abstractmethod
+    async def fetch(self, query: str, *args) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    async def execute(self, query: str, *args):
+        pass
+
+    @abstractmethod
+    async def write_batch(self, batches: Sequence[Tuple[TableSpec, List[tuple]]]):
+        """Insert rows into several tables in one transaction, in the given order"""
+
+    def is_data_error(self, error: Exception) -> bool:
+        """Whether the database rejected the rows themselves (constraint or data errors), so retrying cannot help"""
+        return False
+
+    async def close(self):
+        pass
+
+class PostgresDatabase(Database):
+    """asyncpg connection pool, created on first use"""
+
+    def __init__(self, url: str, min_size: int = 1, max_size: int = 4):
+        self.url = url
+        self.min_size = min_size
+        self.max_size = max_size
+        self._pool = None
+        self._pool_lock = asyncio.Lock()
+
+    async def _get_pool(self):
+        if self._pool is None:
+            async with self._pool_lock:
+                if self._pool is None:
+                    import asyncpg
+                    self._pool = await asyncpg.create_pool(self.url, min_size=self.min_size, max_size=self.max_size)
+        return self._pool
+
+    async def fetch(self, query: str, *args) -> List[Dict[str, Any]]:
+        pool = await self._get_pool()
+        return [dict(row) for row in await pool.fetch(query, *args)]
+
+    async def execute(self, query: str, *args):
+        pool = await self._get_pool()
+        await pool.execute(query, *args)
+
+    async def write_batch(self, batches: Sequence[Tuple[TableSpec, List[tuple]]]):
+        pool = await self._get_pool()
+        async with pool.acquire() as connection:
+            async with connection.transaction():
+                for table, rows in batches:
+                    if not rows:
+                        continue
+                    if table.skip_conflicts:
+                        # Stay under the 32767 bind parameters a statement may have
+                        step = max(1, 32767 // len(table.columns))
+                        for start in range(0, len(rows), step):
+                            await connection.execute(*self._multirow_insert(table, rows[start:start + step]))
+                    else:
+                        await connection.copy_records_to_table(table.name, records=rows, columns=list(table.columns))
+
+    def is_data_error(self, error: Exception) -> bool:
+        # SQLSTATE class 22 is data exceptions, 23 integrity constraint violations
+        return str(getattr(error, "sqlstate", "") or "")[:2] in ("22", "23")
+
+    @staticmethod
+    def _multirow_insert(table: TableSpec, rows: List[tuple]) -> Tuple[str, ...]:
+        width = len(table.columns)
+        values = ", ".join(
+            "(" + ", ".join(f"${row * width + column + 1}" for column in range(width)) + ")"
+            for row in range(len(rows))
+        )
+        query = f"INSERT INTO {table.name} ({', '.join(table.columns)}) VALUES {values} ON CONFLICT DO NOTHING"
+        return (query, *[value for row in rows for value in row])
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+# Tables the engine reads and writes, for a SQLite stand-in database
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    user_id TEXT,
+    title TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    is_active BOOLEAN DEFAULT 1,
+    context_summary TEXT,
+    context_summary_message_count INTEGER DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    conversation_id TEXT REFERENCES conversations(id) ON DELETE CASCADE,
+    role TEXT NOT NULL CHECK (role IN ('user', 'assistant')),
+    content TEXT NOT NULL,
+    metadata TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_messages_conversation_id ON messages(conversation_id);
+CREATE TABLE IF NOT EXISTS recommendations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT,
+    recommendation_type TEXT NOT NULL,
+    content TEXT NOT NULL,
+    priority TEXT DEFAULT 'medium',
+    is_dismissed BOOLEAN DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS career_forecasts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT,
+    career_path_id TEXT,
+    forecast_data TEXT NOT NULL,
+    service_years INTEGER DEFAULT 4,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+class SqliteDatabase(Database):
+    """SQLite stand-in for local development and tests.
+
+    One connection is used from worker threads under a lock; the engine's
+    tables are created if missing.
+    """
+
+    _PLACEHOLDER = re.compile(r"\$(\d+)")
+
+    def __init__(self, url: str):
+        self.url = url
+        self.path = url[len("sqlite:///"):] if url.startswith("sqlite:///") else url
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.row_factory = sqlite3.Row
+            self._connection.executescript(SQLITE_SCHEMA)
+        return self._connection
+
+    def _sql(self, query: str) -> str:
+        return self._PLACEHOLDER.sub(r"?\1", query)
+
+    def _fetch(self, query: str, args: tuple) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in self._connect().execute(self._sql(query), args).fetchall()]
+
+    def _execute(self, query: str, args: tuple):
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute(self._sql(query), args)
+
+    def _write_batch(self, batches: Sequence[Tuple[TableSpec, List[tuple]]]):
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                for table, rows in batches:
+                    if not rows:
+                        continue
+                    verb = "INSERT OR IGNORE" if table.skip_conflicts else "INSERT"
+                    placeholders = ", ".join("?" for _ in table.columns)
+                    connection.executemany(
+                        f"{verb} INTO {table.name} ({', '.join(table.columns)}) VALUES ({placeholders})",
+                        rows
+                    )
+
+    def is_data_error(self, error: Exception) -> bool:
+        return isinstance(error, (sqlite3.IntegrityError, sqlite3.DataError))
+
+    async def fetch(self, query: str, *args) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._fetch, query, args)
+
+    async def execute(self, query: str, *args):
+        await asyncio.to_thread(self._execute, query, args)
+
+    async def write_batch(self, batches: Sequence[Tuple[TableSpec, List[tuple]]]):
+        await asyncio.to_thread(self._write_batch, batches)
+
+    async def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+_databases: Dict[str, Database] = {}
+
+def get_database(url: str) -> Database:
+    """The shared Database for a URL: one pool per process, whoever asks first creates it"""
+    database = _databases.get(url)
+    if database is None:
+        if url.startswith(("postgres://", "postgresql://")):
+            database = PostgresDatabase(url, max_size=int(os.getenv('DATABASE_POOL_SIZE', '4')))
+        else:
+            database = SqliteDatabase(url)
+        _databases[url] = database
+    return database
+
+async def close_databases():
+    """Close every shared pool; run last at shutdown, after write-behind queues have flushed"""
+    for database in list(_databases.values()):
+        try:
+            await database.close()
+        except Exception as e:
+            logger.error(f"Database close error: {str(e)}")
+    _databases.clear()
@@ -0,0 +1,160 @@
+from typing import List, Dict, Tuple, Iterable, Optional, FrozenSet, Any
+import re
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Education levels in ascending order; a career requires the highest level its requirements mention
+EDUCATION_LEVELS = ("none", "high_school", "associate", "bachelor", "master", "doctorate")
+
+_EDUCATION_PATTERNS = [
+    ("doctorate", re.compile(r"\b(doctor\w*|ph\.?d|md|jd)\b")),
+    ("master", re.compile(r"\b(master\w*|mba|graduate degree)\b")),
+    ("bachelor", re.compile(r"\b(bachelor\w*|college degree|4-year degree|four-year degree|undergraduate degree|ba|bs)\b")),
+    ("associate", re.compile(r"\b(associate\w*|some college|2-year degree|two-year degree|college)\b")),
+    ("high_school", re.compile(r"\b(high school|highschool|ged|diploma|hs)\b")),
+    ("none", re.compile(r"\b(none|no diploma|less than high school)\b")),
+]
+
+# Request values that name a catalog value differently; "part time" covers both part-time components
+FACET_ALIASES: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "branch": {
+        "marines": ("marine corps",),
+        "usmc": ("marine corps",),
+        "usaf": ("air force",),
+        "ussf": ("space force",),
+        "uscg": ("coast guard",),
+    },
+    "service_type": {
+        "active": ("active duty",),
+        "full time": ("active duty",),
+        "guard": ("national guard",),
+        "reserves": ("reserve",),
+        "part time": ("national guard", "reserve"),
+    },
+    "difficulty_level": {},
+}
+
+# Preference keys accepted for each facet
+PREFERENCE_KEYS = {
+    "branch": ("branch", "branches"),
+    "service_type": ("service_type", "service_types"),
+    "difficulty_level": ("difficulty", "difficulty_level", "difficulty_levels"),
+}
+
+Filters = Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+def _normalize(value: str) -> str:
+    return " ".join(re.sub(r"[_\-]+", " ", str(value).lower()).split())
+
+def education_rank(text: Optional[str]) -> Optional[int]:
+    """Position of the education level named in text within EDUCATION_LEVELS, or None if unrecognized"""
+    if not text:
+        return None
+    text = _normalize(text).replace("'", "")
+    for level, pattern in _EDUCATION_PATTERNS:
+        if pattern.search(text):
+            return EDUCATION_LEVELS.index(level)
+    return None
+
+def required_education_rank(requirements: Iterable[str]) -> int:
+    """Highest education level a career's requirements mention; none if they mention no level"""
+    ranks = [education_rank(requirement) for requirement in requirements]
+    return max((rank for rank in ranks if rank is not None), default=0)
+
+def build_filters(education_level: Optional[str] = None, preferences: Optional[Dict[str, Any]] = None) -> Filters:
+    """Normalize a request's education level and preferences into a hashable filter key.
+
+    Each facet maps to the catalog values it accepts (any of them); facets
+    combine with AND. Unrecognized education levels, empty preferences and
+    preference values that are not strings or lists of strings add no
+    filter.
+    """
+    filters: List[Tuple[str, Tuple[str, ...]]] = []
+    if not isinstance(preferences, dict):
+        preferences = {}
+
+    for facet, keys in PREFERENCE_KEYS.items():
+        values = next((preferences[key] for key in keys if preferences.get(key)), None)
+        if isinstance(values, str):
+            values = [values]
+        if not isinstance(values, (list, tuple)):
+            continue
+
+        accepted = set()
+        for value in values:
+            if not isinstance(value, str):
+                continue
+            value = _normalize(value)
+            accepted.update(FACET_ALIASES[facet].get(value, (value,)))
+        if accepted:
+            filters.append((facet, tuple(sorted(accepted))))
+
+    rank = education_rank(education_level)
+    if rank is not None:
+        filters.append(("education", (EDUCATION_LEVELS[rank],)))
+    return tuple(filters)
+
+class FacetIndex:
+    """Packed bitsets of catalog positions per facet value.
+
+    Branch, service type and difficulty have one bitset per distinct
+    (normalized) value. Education has one per level, holding every career
+    whose requirements are met at that level. A filter ORs the bitsets of
+    its accepted values and ANDs across facets, so eligibility for a whole
+    request is a few byte-wise operations over len(catalog) / 8 bytes.
+    """
+
+    FACETS = ("branch", "service_type", "difficulty_level")
+    MAX_SELECTION_CACHE = 1024
+
+    def __init__(self, careers: Iterable):
+        careers = list(careers)
+        self.career_count = len(careers)
+        self.bitsets: Dict[str, Dict[str, np.ndarray]] = {}
+        self._selections: Dict[Filters, Tuple[np.ndarray, FrozenSet[int]]] = {}
+
+        for facet in self.FACETS:
+            values = np.array([_normalize(getattr(career, facet)) for career in careers], dtype=object)
+            self.bitsets[facet] = {
+                value: np.packbits(values == value) for value in sorted(set(values.tolist()))
+            }
+
+        required = np.array([required_education_rank(career.requirements) for career in careers], dtype=np.int8)
+        self.bitsets["education"] = {
+            level: np.packbits(required <= rank) for rank, level in enumerate(EDUCATION_LEVELS)
+        }
+
+    def _empty(self) -> np.ndarray:
+        return np.zeros((self.career_count + 7) // 8, dtype=np.uint8)
+
+    def _select(self, filters: Filters) -> Tuple[np.ndarray, FrozenSet[int]]:
+        selection = self._selections.get(filters)
+        if selection is not None:
+            return selection
+
+        bits = None
+        for facet, values in filters:
+            facet_bits = self._empty()
+            for value in values:
+                value_bits = self.bitsets.get(facet, {}).get(value)
+                if value_bits is not None:
+                    facet_bits |= value_bits
+            bits = facet_bits if bits is None else bits & facet_bits
+
+        mask = np.unpackbits(bits, count=self.career_count).astype(bool)
+        selection = (mask, frozenset(np.flatnonzero(mask).tolist()))
+        if len(self._selections) >= self.MAX_SELECTION_CACHE:
+            self._selections.clear()
+        self._selections[filters] = selection
+        return selection
+
+    def mask(self, filters: Filters) -> Optional[np.ndarray]:
+        """Boolean mask of eligible catalog positions; None when nothing is filtered"""
+        return self._select(filters)[0] if filters else None
+
+    def positions(self, filters: Filters) -> Optional[FrozenSet[int]]:
+        """Eligible catalog positions as a set; None when nothing is filtered"""
+        return self._select(filters)[1] if filters else None
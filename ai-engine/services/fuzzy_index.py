@@ -0,0 +1,95 @@
+from typing import List, Dict, Tuple, Iterable
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def trigrams(word: str) -> List[str]:
+    """Character trigrams of a word padded with boundary markers; a word of n characters has n"""
+    padded = f"${word}$"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (an adjacent transposition is one edit).
+
+    Gives up as soon as every alignment needs more than limit edits and
+    returns limit + 1.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cost = min(cost, before[j - 2] + 1)
+            current[j] = cost
+        # A transposition in the next row can still reach back to this row's predecessor
+        if min(current) > limit and min(previous) + 1 > limit:
+            return limit + 1
+        before, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+class TrigramIndex:
+    """Typo-tolerant lookup of terms in a fixed vocabulary.
+
+    Words are indexed by their padded character trigrams. One edit changes
+    at most three of a word's trigrams (an adjacent transposition four), so
+    a word within the allowed edits of a term must share most of the
+    term's trigrams. Candidates are counted from the postings of the term's
+    own trigrams only, never by scanning the vocabulary; at most
+    MAX_CANDIDATES of them, most shared trigrams first, are verified with a
+    bounded edit distance. Lookups are memoized per term.
+    """
+
+    MIN_WORD_LENGTH = 4
+    MAX_CANDIDATES = 32
+    MAX_TERM_CACHE = 10000
+
+    def __init__(self, words: Iterable[str]):
+        self.words: Tuple[str, ...] = tuple(sorted({word for word in words if len(word) >= self.MIN_WORD_LENGTH}))
+        self.lengths = np.fromiter((len(word) for word in self.words), dtype=np.int32, count=len(self.words))
+        postings: Dict[str, List[int]] = {}
+        for position, word in enumerate(self.words):
+            for gram in set(trigrams(word)):
+                postings.setdefault(gram, []).append(position)
+        self.postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self._term_cache: Dict[str, Tuple[str, ...]] = {}
+
+    @staticmethod
+    def max_edits(term: str) -> int:
+        """Edits tolerated for a term: none under 4 characters, one under 8, two beyond"""
+        if len(term) < 4:
+            return 0
+        return 1 if len(term) < 8 else 2
+
+    def lookup(self, term: str) -> Tuple[str, ...]:
+        """Vocabulary words closest to the term within its allowed edits (all ties), or ()"""
+        cached = self._term_cache.get(term)
+        if cached is not None:
+            return cached
+
+        matched: Tuple[str, ...] = ()
+        edits = self.max_edits(term)
+        grams = set(trigrams(term))
+        postings = [self.postings[gram] for gram in grams if gram in self.postings]
+        if edits and postings:
+            candidates, shared = np.unique(np.concatenate(postings), return_counts=True)
+            keep = (shared >= max(1, len(grams) - 4 * edits)) & (np.abs(self.lengths[candidates] - len(term)) <= edits)
+            candidates, shared = candidates[keep], shared[keep]
+            if len(candidates) > self.MAX_CANDIDATES:
+                candidates = candidates[np.argsort(-shared, kind="stable")[:self.MAX_CANDIDATES]]
+
+            distances = [(edit_distance(term, self.words[position], edits), self.words[position])
+                         for position in candidates.tolist()]
+            best = min((distance for distance, _ in distances), default=edits + 1)
+            if best <= edits:
+                matched = tuple(sorted(word for distance, word in distances if distance == best))
+
+        if len(self._term_cache) >= self.MAX_TERM_CACHE:
+            self._term_cache.clear()
+        self._term_cache[term] = matched
+        return matched
@@ -0,0 +1,191 @@
+from typing import List, Dict, Set, FrozenSet, Tuple, Iterable, Optional
+import sys
+import logging
+
+import numpy as np
+
+from services.fuzzy_index import TrigramIndex
+from services.message_matcher import INTEREST_KEYWORDS
+
+logger = logging.getLogger(__name__)
+
+class KeywordIndex:
+    """Inverted index from normalized match keywords to career positions.
+
+    A term matches a keyword when either one contains the other (after
+    lowercasing), which is the rule the matcher has always used. Both
+    directions are answered from precomputed tables instead of scanning
+    every career:
+
+    - keyword in term: every substring of the term is looked up in the
+      keyword table (terms are short, keywords bounded in length)
+    - term in keyword: every substring of every keyword is indexed up front
+
+    Each career's keywords are also kept as integer IDs into a shared
+    vocabulary, in CSR form: the IDs of career i are
+    keyword_ids[keyword_offsets[i]:keyword_offsets[i + 1]].
+
+    A term that matches nothing as typed is resolved through a trigram
+    index over the keywords and their words to its closest spellings
+    ("aviaton" to "aviation"), which are matched instead. With
+    interest_synonyms the chat interest vocabulary is indexed too, and an
+    interest word also matches its interest ("programming" matches careers
+    with the keyword "technology").
+    """
+
+    MAX_TERM_CACHE = 10000
+
+    def __init__(self, careers: Iterable, interest_synonyms: bool = False):
+        self.use_interest_synonyms = interest_synonyms
+        self.vocabulary: Tuple[str, ...] = ()
+        self.keyword_offsets = np.zeros(1, dtype=np.int32)
+        self.keyword_ids = np.zeros(0, dtype=np.int32)
+        self.keyword_postings: Dict[str, FrozenSet[int]] = {}
+        self.substring_postings: Dict[str, FrozenSet[int]] = {}
+        self.all_keyword_careers: FrozenSet[int] = frozenset()
+        self.fuzzy_vocabulary = TrigramIndex(())
+        self.interest_synonyms: Dict[str, Tuple[str, ...]] = {}
+        self._term_cache: Dict[str, FrozenSet[int]] = {}
+        self._build(careers)
+
+    def _build(self, careers: Iterable):
+        vocabulary: Dict[str, int] = {}
+        offsets = [0]
+        ids: List[int] = []
+        for career in careers:
+            for keyword in career.match_keywords:
+                ids.append(vocabulary.setdefault(sys.intern(keyword.lower()), len(vocabulary)))
+            offsets.append(len(ids))
+
+        self.vocabulary = tuple(vocabulary)
+        self.keyword_offsets = np.asarray(offsets, dtype=np.int32)
+        self.keyword_ids = np.asarray(ids, dtype=np.int32)
+
+        # Postings straight from the ID arrays: group career positions by keyword ID
+        career_positions = np.repeat(np.arange(len(offsets) - 1, dtype=np.int32), np.diff(self.keyword_offsets))
+        order = np.argsort(self.keyword_ids, kind="stable")
+        bounds = np.searchsorted(self.keyword_ids[order], np.arange(len(self.vocabulary) + 1))
+        keyword_postings: Dict[str, Set[int]] = {
+            keyword: set(career_positions[order[bounds[i]:bounds[i + 1]]].tolist())
+            for i, keyword in enumerate(self.vocabulary)
+        }
+
+        substring_postings: Dict[str, Set[int]] = {}
+        for keyword, positions in keyword_postings.items():
+            for start in range(len(keyword)):
+                for end in range(start + 1, len(keyword) + 1):
+                    substring_postings.setdefault(keyword[start:end], set()).update(positions)
+
+        self.keyword_postings = {k: frozenset(v) for k, v in keyword_postings.items()}
+        self.substring_postings = {k: frozenset(v) for k, v in substring_postings.items()}
+        self.all_keyword_careers = frozenset().union(*self.keyword_postings.values())
+
+        words = set(self.vocabulary)
+        if self.use_interest_synonyms:
+            interest_synonyms: Dict[str, List[str]] = {}
+            for interest, keywords in INTEREST_KEYWORDS.items():
+                for keyword in keywords:
+                    interest_synonyms.setdefault(keyword.lower(), []).append(interest)
+            self.interest_synonyms = {word: tuple(interests) for word, interests in interest_synonyms.items()}
+            words |= set(self.interest_synonyms) | set(INTEREST_KEYWORDS)
+        self.fuzzy_vocabulary = TrigramIndex(words | {word for phrase in words for word in phrase.split()})
+
+        lengths = [len(k) for k in self.keyword_postings if k]
+        self._min_keyword_len = min(lengths) if lengths else 1
+        self._max_keyword_len = max(lengths) if lengths else 0
+
+        logger.info(
+            f"Built keyword index: {len(self.keyword_postings)} keywords, "
+            f"{len(self.substring_postings)} substrings, {len(self.fuzzy_vocabulary.words)} fuzzy words"
+        )
+
+    def career_keywords(self, position: int) -> Tuple[str, ...]:
+        """Normalized keywords of the career at a position"""
+        start, end = self.keyword_offsets[position], self.keyword_offsets[position + 1]
+        return tuple(self.vocabulary[i] for i in self.keyword_ids[start:end])
+
+    def match_term(self, term: str) -> FrozenSet[int]:
+        """Return positions of careers with a keyword that matches the term, or its closest spellings"""
+        term = term.lower()
+        cached = self._term_cache.get(term)
+        if cached is not None:
+            return cached
+
+        matched = self._match_exact(term)
+        if not matched:
+            matched = self._match_fuzzy(term)
+
+        if len(self._term_cache) >= self.MAX_TERM_CACHE:
+            self._term_cache.clear()
+        self._term_cache[term] = matched
+        return matched
+
+    def _match_fuzzy(self, term: str) -> FrozenSet[int]:
+        """Careers matching the vocabulary words closest to a term (or to each of its words)"""
+        words = term.split()
+        positions: Set[int] = set()
+        for word in ([term] + words if len(words) > 1 else words):
+            for resolved in self.fuzzy_vocabulary.lookup(word):
+                positions.update(self._match_exact(resolved))
+                for interest in self.interest_synonyms.get(resolved, ()):
+                    positions.update(self._match_exact(interest))
+        return frozenset(positions)
+
+    def _match_exact(self, term: str) -> FrozenSet[int]:
+        if not term:
+            # The empty string is contained in every keyword
+            return self.all_keyword_careers
+
+        positions: Set[int] = set(self.substring_postings.get(term, ()))
+
+        # An empty keyword is contained in every term
+        positions.update(self.keyword_postings.get("", ()))
+
+        max_len = min(self._max_keyword_len, len(term))
+        for start in range(len(term)):
+            for end in range(start + self._min_keyword_len, min(start + max_len, len(term)) + 1):
+                postings = self.keyword_postings.get(term[start:end])
+                if postings:
+                    positions.update(postings)
+        return frozenset(positions)
+
+    def score_candidates(self, interests: List[str], skills: List[str], interest_weight: float = 0.7,
+                         skill_weight: float = 0.3,
+                         eligible: Optional[FrozenSet[int]] = None) -> Dict[int, Tuple[float, List[str]]]:
+        """Score every career hit by at least one term in a single pass.
+
+        Returns {position: (score, reasons)} where reasons list the matched
+        interests and skills in request order. Careers that no term touches
+        score zero and are omitted; with eligible, postings are intersected
+        with it first so other careers are never scored.
+        """
+        interest_hits = [self.match_term(interest) for interest in interests]
+        skill_hits = [self.match_term(skill) for skill in skills]
+        if eligible is not None:
+            interest_hits = [hits & eligible for hits in interest_hits]
+            skill_hits = [hits & eligible for hits in skill_hits]
+
+        interest_counts: Dict[int, int] = {}
+        skill_counts: Dict[int, int] = {}
+        reasons: Dict[int, List[str]] = {}
+
+        for interest, hits in zip(interests, interest_hits):
+            for position in hits:
+                interest_counts[position] = interest_counts.get(position, 0) + 1
+                reasons.setdefault(position, []).append(f"Matches your interest in {interest}")
+
+        for skill, hits in zip(skills, skill_hits):
+            for position in hits:
+                skill_counts[position] = skill_counts.get(position, 0) + 1
+                reasons.setdefault(position, []).append(f"Utilizes your {skill} skills")
+
+        results = {}
+        for position, career_reasons in reasons.items():
+            score = 0.0
+            if interests:
+                score += min(interest_counts.get(position, 0) / len(interests), 1.0) * interest_weight
+            if skills:
+                score += min(skill_counts.get(position, 0) / len(skills), 1.0) * skill_weight
+            results[position] = (min(score, 1.0), career_reasons)
+
+        return results
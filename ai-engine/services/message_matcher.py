@@ -0,0 +1,128 @@
+from typing import List, Dict, Set, Optional, Tuple
+from dataclasses import dataclass
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Interest categories and the words that signal them, in reporting order
+INTEREST_KEYWORDS: Dict[str, List[str]] = {
+    'technology': ['computer', 'tech', 'cyber', 'IT', 'programming', 'software'],
+    'aviation': ['flying', 'pilot', 'aircraft', 'aviation', 'air force'],
+    'medical': ['medical', 'healthcare', 'doctor', 'nurse', 'health'],
+    'engineering': ['engineering', 'mechanical', 'electrical', 'build'],
+    'leadership': ['leadership', 'manage', 'lead', 'supervisor'],
+    'travel': ['travel', 'different places', 'world', 'deploy'],
+    'mechanics': ['mechanical', 'fix', 'repair', 'maintenance'],
+    'communications': ['communication', 'radio', 'signals', 'network']
+}
+
+# Words that mean the user is talking about careers and should see recommendations
+TRIGGER_KEYWORDS: List[str] = [
+    'interested in', 'like to', 'career', 'job', 'work', 'field',
+    'aviation', 'cyber', 'technology', 'medical', 'engineering',
+    'leadership', 'travel', 'benefits', 'training'
+]
+
+# Fallback reply intents, checked in priority order
+FALLBACK_INTENTS: List[Tuple[str, List[str]]] = [
+    ('greeting', ['hello', 'hi', 'hey']),
+    ('aviation', ['aviation', 'pilot']),
+    ('technology', ['cyber', 'technology', 'computer']),
+    ('medical', ['medical'])
+]
+
+# Short words that must match exactly rather than as a word prefix
+EXACT_WORDS: Set[str] = {'hello', 'hi', 'hey'}
+
+@dataclass(frozen=True)
+class MessageSignals:
+    interests: List[str]
+    trigger_recommendations: bool
+    fallback_intent: Optional[str]
+
+class MessageMatcher:
+    """Single-pass keyword matcher for chat messages.
+
+    All interest, trigger and fallback vocabulary is compiled into one
+    alternation regex at construction time and the message is scanned once.
+    Keywords match at a word start and may carry a suffix ("lead" matches
+    "leader" but not "misleading"). All-caps acronyms such as "IT" match
+    case-sensitively as whole words; greetings match as whole words.
+    """
+
+    def __init__(self, interest_keywords: Dict[str, List[str]] = None, trigger_keywords: List[str] = None,
+                 fallback_intents: List[Tuple[str, List[str]]] = None):
+        self.interest_keywords = interest_keywords or INTEREST_KEYWORDS
+        self.trigger_keywords = trigger_keywords or TRIGGER_KEYWORDS
+        self.fallback_intents = fallback_intents or FALLBACK_INTENTS
+        self.interest_order = {interest: i for i, interest in enumerate(self.interest_keywords)}
+        self.intent_order = {intent: i for i, (intent, _) in enumerate(self.fallback_intents)}
+        self._labels: Dict[str, Set[Tuple[str, str]]] = {}
+        self._pattern = self._compile()
+
+    def _compile(self) -> "re.Pattern":
+        direct: Dict[str, Set[Tuple[str, str]]] = {}
+
+        def add(keyword: str, label: Tuple[str, str]):
+            direct.setdefault(keyword, set()).add(label)
+
+        for interest, keywords in self.interest_keywords.items():
+            for keyword in keywords:
+                add(keyword, ('interest', interest))
+        for keyword in self.trigger_keywords:
+            add(keyword, ('trigger', ''))
+        for intent, keywords in self.fallback_intents:
+            for keyword in keywords:
+                add(keyword, ('intent', intent))
+
+        # A match on a longer keyword also counts for any prefix keyword, since
+        # the prefix would have matched the same word on its own
+        for keyword in direct:
+            labels = set(direct[keyword])
+            if not self._is_exact(keyword):
+                for other, other_labels in direct.items():
+                    if other != keyword and not self._is_exact(other) and keyword.lower().startswith(other.lower()):
+                        labels.update(other_labels)
+            self._labels[keyword] = labels
+
+        alternatives = []
+        # Longest first so the most specific keyword is captured; each
+        # alternative is its own group so the match maps straight back to it
+        self._group_keywords = sorted(direct, key=len, reverse=True)
+        for keyword in self._group_keywords:
+            body = r'\s+'.join(re.escape(part) for part in keyword.split())
+            if keyword.isupper():
+                alternatives.append(rf'(?-i:{body})\b')
+            elif self._is_exact(keyword):
+                alternatives.append(rf'{body}\b')
+            else:
+                alternatives.append(rf'{body}\w*')
+
+        logger.info(f"Compiled message matcher with {len(direct)} keywords")
+        return re.compile(r'\b(?:' + '|'.join(f'({alt})' for alt in alternatives) + ')', re.IGNORECASE)
+
+    def _is_exact(self, keyword: str) -> bool:
+        return keyword.isupper() or keyword.lower() in EXACT_WORDS
+
+    def scan(self, message: str) -> MessageSignals:
+        """Scan the message once and return interests, trigger flag and fallback intent"""
+        interests: Set[str] = set()
+        intents: Set[str] = set()
+        trigger = False
+
+        for match in self._pattern.finditer(message or ''):
+            labels = self._labels[self._group_keywords[match.lastindex - 1]]
+            for kind, value in labels:
+                if kind == 'interest':
+                    interests.add(value)
+                elif kind == 'trigger':
+                    trigger = True
+                else:
+                    intents.add(value)
+
+        return MessageSignals(
+            interests=sorted(interests, key=self.interest_order.__getitem__),
+            trigger_recommendations=trigger,
+            fallback_intent=min(intents, key=self.intent_order.__getitem__) if intents else None
+        )
@@ -0,0 +1,202 @@
+from typing import Callable, Dict, Any, List, Optional
+import os
+import time
+import logging
+
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY, CollectorRegistry, multiprocess
+from prometheus_client.core import GaugeMetricFamily, CounterMetricFamily
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30)
+SCORING_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+REQUEST_LATENCY = Histogram(
+    "ai_engine_request_duration_seconds",
+    "End-to-end HTTP request time until the response starts",
+    ["endpoint", "method", "status"],
+    buckets=LATENCY_BUCKETS
+)
+
+REQUESTS_IN_FLIGHT = Gauge(
+    "ai_engine_requests_in_flight",
+    "HTTP requests currently being handled",
+    multiprocess_mode="livesum"
+)
+
+LLM_LATENCY = Histogram(
+    "ai_engine_llm_duration_seconds",
+    "OpenAI chat completion latency",
+    ["mode", "outcome"],
+    buckets=LATENCY_BUCKETS
+)
+
+LLM_IN_FLIGHT = Gauge(
+    "ai_engine_llm_requests_in_flight",
+    "OpenAI completions currently in progress",
+    multiprocess_mode="livesum"
+)
+
+LLM_QUEUED = Gauge(
+    "ai_engine_llm_requests_queued",
+    "OpenAI completions waiting for a concurrency slot",
+    multiprocess_mode="livesum"
+)
+
+OPENAI_ERRORS = Counter(
+    "ai_engine_openai_errors_total",
+    "OpenAI API errors by exception type",
+    ["error_type"]
+)
+
+LLM_BREAKER_STATE = Gauge(
+    "ai_engine_llm_breaker_state",
+    "LLM circuit breaker state: 0 closed, 1 half-open, 2 open",
+    multiprocess_mode="max"
+)
+
+LLM_BREAKER_TRANSITIONS = Counter(
+    "ai_engine_llm_breaker_transitions_total",
+    "LLM circuit breaker state changes by new state",
+    ["state"]
+)
+
+LLM_HEDGES = Counter(
+    "ai_engine_llm_hedges_total",
+    "Hedged completion requests launched, and how many of them answered first",
+    ["outcome"]
+)
+
+FALLBACK_RESPONSES = Counter(
+    "ai_engine_fallback_responses_total",
+    "Chat replies served from the keyword fallback instead of the model",
+    ["reason"]
+)
+
+STARTUP_SECONDS = Gauge(
+    "ai_engine_startup_seconds",
+    "Cold-start time by stage, measured from process import; 'ready' is the total",
+    ["stage"],
+    multiprocess_mode="livemax"
+)
+
+SCORING_LATENCY = Histogram(
+    "ai_engine_scoring_duration_seconds",
+    "Time spent in recommendation and career scoring stages",
+    ["stage"],
+    buckets=SCORING_BUCKETS
+)
+
+SINGLE_FLIGHT_WAITERS = Gauge(
+    "ai_engine_single_flight_waiters",
+    "Callers currently waiting on another caller's in-flight call",
+    ["operation"],
+    multiprocess_mode="livesum"
+)
+
+SINGLE_FLIGHT_COALESCED = Counter(
+    "ai_engine_single_flight_coalesced_total",
+    "Calls served by joining an identical in-flight call",
+    ["operation"]
+)
+
+SINGLE_FLIGHT_LEADERS = Counter(
+    "ai_engine_single_flight_leaders_total",
+    "Calls that did the work themselves",
+    ["operation"]
+)
+
+class StatsCollector:
+    """Exposes a component's stats() dict as Prometheus metrics at scrape time.
+
+    Keys ending in _hits, _misses, _errors or _total become counters, every
+    other numeric value becomes a gauge. Constant labels, if given, are
+    attached to every sample.
+    """
+
+    COUNTER_SUFFIXES = ("hits", "misses", "errors", "total")
+
+    def __init__(self, prefix: str, description: str, stats: Callable[[], Optional[Dict[str, Any]]],
+                 labels: Optional[Dict[str, str]] = None):
+        self.prefix = prefix
+        self.description = description
+        self.stats = stats
+        self.labels = labels or {}
+
+    def collect(self):
+        try:
+            stats = self.stats() or {}
+        except Exception as e:
+            logger.error(f"Metrics collection error for {self.prefix}: {str(e)}")
+            return
+
+        for key, value in stats.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            name = f"{self.prefix}_{key}"
+            family = CounterMetricFamily if key.endswith(self.COUNTER_SUFFIXES) else GaugeMetricFamily
+            metric = family(name, f"{self.description}: {key}", labels=list(self.labels))
+            metric.add_metric(list(self.labels.values()), value)
+            yield metric
+
+_stats_collectors: List[StatsCollector] = []
+
+def register_stats(prefix: str, description: str, stats: Callable[[], Optional[Dict[str, Any]]]):
+    """Publish a stats() callable under the given metric name prefix"""
+    collector = StatsCollector(prefix, description, stats)
+    _stats_collectors.append(collector)
+    REGISTRY.register(collector)
+
+def multiprocess_registry() -> CollectorRegistry:
+    """Registry aggregating every worker's samples from PROMETHEUS_MULTIPROC_DIR.
+
+    stats() values live in each worker's memory and cannot be aggregated,
+    so the worker serving the scrape adds its own, labelled with its pid.
+    """
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    labels = {"pid": str(os.getpid())}
+    for collector in _stats_collectors:
+        registry.register(StatsCollector(collector.prefix, collector.description, collector.stats, labels=labels))
+    return registry
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route request latency and in-flight requests.
+
+    Latency is measured until the response starts, so streaming endpoints
+    report time to first byte rather than total stream duration.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = {"code": 500, "observed": False}
+        REQUESTS_IN_FLIGHT.inc()
+
+        def observe():
+            if status["observed"]:
+                return
+            status["observed"] = True
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or "unmatched"
+            REQUEST_LATENCY.labels(endpoint, scope.get("method", ""), str(status["code"])).observe(
+                time.perf_counter() - start
+            )
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                observe()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            observe()
@@ -1,12 +1,98 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Mapping, Tuple
+import hashlib
+import json
 import logging
+import time
+from dataclasses import dataclass
 from datetime import datetime
+from types import MappingProxyType
+
+from services.catalog import CatalogSource
+from services.metrics import SCORING_LATENCY
 
 logger = logging.getLogger(__name__)
 
+@dataclass(frozen=True)
+class RenderedRecommendation:
+    """A recommendation payload rendered once, stamped with a timestamp per response.
+    
+    The payload and its nested content are shared between responses and
+    must not be mutated.
+    """
+    payload: Dict[str, Any]
+    json_prefix: str
+    
+    @classmethod
+    def render(cls, payload: Dict[str, Any]) -> "RenderedRecommendation":
+        # Timestamp is the last key, so the pre-serialized JSON stops just before it
+        encoded = json.dumps(payload)
+        return cls(payload=payload, json_prefix=encoded[:-1] + ', "timestamp": ')
+    
+    def stamp(self, timestamp: str) -> Dict[str, Any]:
+        return {**self.payload, "timestamp": timestamp}
+    
+    def stamp_json(self, timestamp_json: str) -> str:
+        return self.json_prefix + timestamp_json + "}"
+
+@dataclass(frozen=True)
+class RecommendationSnapshot:
+    """Templates and the recommendation payloads pre-rendered from them"""
+    templates: Mapping[str, Dict[str, Any]]
+    rendered: Mapping[str, RenderedRecommendation]
+    version: str
+    
+    @classmethod
+    def build(cls, templates: Dict[str, Dict[str, Any]], version: str) -> "RecommendationSnapshot":
+        rendered = {}
+        for interest, template in templates.items():
+            rendered[interest] = RenderedRecommendation.render({
+                "category": interest.title(),
+                "type": "career_guidance",
+                "priority": "high",
+                "content": {
+                    "next_questions": list(template["next_questions"][:2]),  # Limit to 2 questions
+                    "suggested_actions": list(template["action_items"][:3]),  # Limit to 3 actions
+                    "learning_resources": list(template["learning_resources"][:2])  # Limit to 2 resources
+                }
+            })
+        return cls(
+            templates=MappingProxyType(dict(templates)),
+            rendered=MappingProxyType(rendered),
+            version=version
+        )
+
 class RecommendationEngine:
-    def __init__(self):
-        self.recommendation_templates = self._load_recommendation_templates()
+    def __init__(self, catalog_source: Optional[CatalogSource] = None):
+        self.catalog_source = catalog_source
+        self.snapshot = RecommendationSnapshot.build(self._load_recommendation_templates(), version="builtin")
+        self.general_recommendation = RenderedRecommendation.render(self._general_recommendation_payload())
+        self.exploration_recommendation = RenderedRecommendation.render(self._exploration_recommendation_payload())
+        self.fallback_recommendation = RenderedRecommendation.render(self._fallback_recommendation_payload())
+    
+    @property
+    def recommendation_templates(self) -> Mapping[str, Dict[str, Any]]:
+        return self.snapshot.templates
+    
+    @property
+    def templates_version(self) -> str:
+        return self.snapshot.version
+    
+    async def refresh_templates(self) -> bool:
+        """Reload templates from the configured source and swap them in atomically"""
+        if self.catalog_source is None:
+            return False
+        
+        templates = await self.catalog_source.load_recommendation_templates()
+        if not templates:
+            return False
+        
+        version = hashlib.sha1(json.dumps(templates, sort_keys=True).encode()).hexdigest()
+        if version == self.templates_version:
+            return False
+        
+        self.snapshot = RecommendationSnapshot.build(templates, version)
+        logger.info(f"Loaded {len(templates)} recommendation templates (version {version[:8]})")
+        return True
     
     def _load_recommendation_templates(self) -> Dict[str, Dict[str, Any]]:
         """Load recommendation templates for different interests"""
@@ -101,42 +187,66 @@ class RecommendationEngine:
     async def get_recommendations(self, interests: List[str], 
                                 conversation_context: Optional[List] = None) -> List[Dict[str, Any]]:
         """Generate personalized recommendations based on user interests"""
+        start = time.perf_counter()
         try:
-            recommendations = []
-            
-            for interest in interests:
-                if interest in self.recommendation_templates:
-                    template = self.recommendation_templates[interest]
-                    
-                    recommendation = {
-                        "category": interest.title(),
-                        "type": "career_guidance",
-                        "priority": "high",
-                        "content": {
-                            "next_questions": template["next_questions"][:2],  # Limit to 2 questions
-                            "suggested_actions": template["action_items"][:3],  # Limit to 3 actions
-                            "learning_resources": template["learning_resources"][:2]  # Limit to 2 resources
-                        },
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
-                    
-                    recommendations.append(recommendation)
-            
-            # Add general recommendations if no specific interests matched
-            if not recommendations:
-                recommendations.append(self._get_general_recommendation())
-            
-            # Add exploration recommendation
-            recommendations.append(self._get_exploration_recommendation())
-            
-            return recommendations[:3]  # Limit to 3 recommendations
+            timestamp = datetime.utcnow().isoformat()
+            return [rendered.stamp(timestamp) for rendered in self.select(interests)]
             
         except Exception as e:
             logger.error(f"Recommendation generation error: {str(e)}")
             return [self._get_fallback_recommendation()]
+        finally:
+            SCORING_LATENCY.labels("recommendations").observe(time.perf_counter() - start)
+    
+    def get_recommendations_json(self, interests: List[str],
+                                 timestamp: str) -> Tuple[List[str], List[RenderedRecommendation]]:
+        """Return recommendations as pre-serialized JSON objects stamped with one timestamp.
+        
+        The recommendations they were rendered from are returned alongside,
+        so callers can reuse the selection (or the fallback) without repeating it.
+        """
+        timestamp_json = json.dumps(timestamp)
+        try:
+            selected = self.select(interests)
+            return [rendered.stamp_json(timestamp_json) for rendered in selected], selected
+        except Exception as e:
+            logger.error(f"Recommendation generation error: {str(e)}")
+            return [self.fallback_recommendation.stamp_json(timestamp_json)], [self.fallback_recommendation]
+    
+    def select(self, interests: List[str]) -> List[RenderedRecommendation]:
+        """Pick the pre-rendered recommendations for a set of interests"""
+        recommendations = []
+        rendered = self.snapshot.rendered
+        
+        for interest in interests:
+            if interest in rendered:
+                recommendations.append(rendered[interest])
+                if len(recommendations) >= 3:
+                    break
+        
+        # Add general recommendations if no specific interests matched
+        if not recommendations:
+            recommendations.append(self.general_recommendation)
+        
+        # Add exploration recommendation
+        recommendations.append(self.exploration_recommendation)
+        
+        return recommendations[:3]  # Limit to 3 recommendations
     
     def _get_general_recommendation(self) -> Dict[str, Any]:
         """Get a general recommendation for users without specific interests"""
+        return self.general_recommendation.stamp(datetime.utcnow().isoformat())
+    
+    def _get_exploration_recommendation(self) -> Dict[str, Any]:
+        """Get a recommendation to explore more options"""
+        return self.exploration_recommendation.stamp(datetime.utcnow().isoformat())
+    
+    def _get_fallback_recommendation(self) -> Dict[str, Any]:
+        """Get a fallback recommendation when other methods fail"""
+        return self.fallback_recommendation.stamp(datetime.utcnow().isoformat())
+    
+    def _general_recommendation_payload(self) -> Dict[str, Any]:
+        """Payload of the general recommendation for users without specific interests"""
         return {
             "category": "General Exploration",
             "type": "career_guidance",
@@ -155,12 +265,11 @@ class RecommendationEngine:
                     "Explore military.com career exploration tools",
                     "Watch day-in-the-life videos of different military jobs"
                 ]
-            },
-            "timestamp": datetime.utcnow().isoformat()
+            }
         }
     
-    def _get_exploration_recommendation(self) -> Dict[str, Any]:
-        """Get a recommendation to explore more options"""
+    def _exploration_recommendation_payload(self) -> Dict[str, Any]:
+        """Payload of the recommendation to explore more options"""
         return {
             "category": "Next Steps",
             "type": "action_items",
@@ -179,12 +288,11 @@ class RecommendationEngine:
                     "Learn about military education benefits (GI Bill, tuition assistance)",
                     "Research how military experience translates to civilian careers"
                 ]
-            },
-            "timestamp": datetime.utcnow().isoformat()
+            }
         }
     
-    def _get_fallback_recommendation(self) -> Dict[str, Any]:
-        """Get a fallback recommendation when other methods fail"""
+    def _fallback_recommendation_payload(self) -> Dict[str, Any]:
+        """Payload of the fallback recommendation when other methods fail"""
         return {
             "category": "Getting Started",
             "type": "career_guidance",
@@ -203,6 +311,5 @@ class RecommendationEngine:
                     "Research basic information about military service",
                     "Learn about different service branches and their specialties"
                 ]
-            },
-            "timestamp": datetime.utcnow().isoformat()
+            }
         }
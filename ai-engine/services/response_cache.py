@@ -0,0 +1,170 @@
+from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import re
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+_TRAILING_PUNCTUATION = re.compile(r'[\s.!?,;:]+$')
+
+def normalize_text(text: str) -> str:
+    """Normalize message text so trivially different phrasings share a key"""
+    text = _WHITESPACE.sub(' ', (text or '').strip().lower())
+    return _TRAILING_PUNCTUATION.sub('', text)
+
+def completion_cache_key(model: str, system_prompt: str, conversation_history: Optional[List[Dict[str, str]]],
+                         message: str, context_turns: int) -> str:
+    """Hash the prompt, the last few turns and the normalized message"""
+    recent = list(conversation_history or [])[-context_turns:] if context_turns > 0 else []
+    payload = {
+        "model": model,
+        "system": hashlib.sha256(system_prompt.encode()).hexdigest(),
+        "history": [[turn.get('role', 'user'), normalize_text(turn.get('content', ''))] for turn in recent],
+        "message": normalize_text(message)
+    }
+    return "completion:" + hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+class LocalCacheTier:
+    """In-process LRU cache with per-entry TTL"""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl_seconds: Optional[float] = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def close(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class RedisCacheTier:
+    """Shared cache tier backed by Redis"""
+
+    def __init__(self, url: str, ttl_seconds: float = 3600):
+        import redis.asyncio as redis
+
+        self.ttl_seconds = ttl_seconds
+        self.client = redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.client.get(key)
+        return value.decode() if isinstance(value, bytes) else value
+
+    async def set(self, key: str, value: str, ttl_seconds: Optional[float] = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        await self.client.set(key, value, ex=max(int(ttl), 1))
+
+    async def close(self):
+        await self.client.aclose()
+
+class CompletionCache:
+    """Two-tier completion cache: in-process LRU in front of an optional shared tier.
+
+    Shared tier errors are logged and treated as misses so a cache outage
+    never fails a chat request.
+    """
+
+    def __init__(self, local: LocalCacheTier, shared=None, context_turns: int = 2):
+        self.local = local
+        self.shared = shared
+        self.context_turns = context_turns
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.shared_errors = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["CompletionCache"]:
+        if os.getenv('COMPLETION_CACHE_ENABLED', 'true').lower() != 'true':
+            return None
+
+        ttl_seconds = float(os.getenv('COMPLETION_CACHE_TTL_SECONDS', '3600'))
+        local = LocalCacheTier(
+            max_entries=int(os.getenv('COMPLETION_CACHE_MAX_ENTRIES', '10000')),
+            ttl_seconds=ttl_seconds
+        )
+
+        shared = None
+        redis_url = os.getenv('REDIS_URL')
+        if redis_url:
+            try:
+                shared = RedisCacheTier(redis_url, ttl_seconds=ttl_seconds)
+            except ImportError:
+                logger.warning("redis package not installed - completion cache is in-process only")
+
+        return cls(local, shared, context_turns=int(os.getenv('COMPLETION_CACHE_CONTEXT_TURNS', '2')))
+
+    def key(self, model: str, system_prompt: str, conversation_history: Optional[List[Dict[str, str]]],
+            message: str) -> str:
+        return completion_cache_key(model, system_prompt, conversation_history, message, self.context_turns)
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.local.get(key)
+        if value is not None:
+            self.local_hits += 1
+            return value
+
+        if self.shared is not None:
+            try:
+                value = await self.shared.get(key)
+            except Exception as e:
+                self.shared_errors += 1
+                logger.warning(f"Shared completion cache error: {str(e)}")
+                value = None
+            if value is not None:
+                self.shared_hits += 1
+                await self.local.set(key, value)
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str):
+        await self.local.set(key, value)
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, value)
+            except Exception as e:
+                self.shared_errors += 1
+                logger.warning(f"Shared completion cache error: {str(e)}")
+
+    async def close(self):
+        if self.shared is not None:
+            await self.shared.close()
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.local_hits + self.shared_hits
+        lookups = hits + self.misses
+        return {
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "shared_errors": self.shared_errors,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "local_entries": len(self.local),
+            "shared_tier": self.shared is not None
+        }
@@ -0,0 +1,154 @@
+from typing import Any, AsyncIterator, Dict, Optional, Union
+import json
+import os
+import zlib
+import logging
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+_fast_json_requested = os.getenv('FAST_JSON_ENABLED', 'false').lower() == 'true'
+if _fast_json_requested and orjson is None:
+    logger.warning("orjson not installed - API responses use the standard library encoder")
+FAST_JSON_ENABLED = _fast_json_requested and orjson is not None
+
+_ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson is not None else 0
+
+def dumps(content: Any) -> bytes:
+    """Encode a response body: orjson when enabled, otherwise compact stdlib JSON"""
+    if FAST_JSON_ENABLED:
+        return orjson.dumps(content, option=_ORJSON_OPTIONS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+def dumps_str(content: Any) -> str:
+    return dumps(content).decode()
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with dumps().
+
+    Returning it from an endpoint also bypasses the endpoint's
+    response_model: the content is built by the engine itself, so it is
+    not validated and re-encoded a second time.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def _accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            accepted[coding] = quality
+    return accepted
+
+class StreamEncoder:
+    """Incremental gzip or brotli encoder; every chunk is flushed so streamed lines arrive as they are produced"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def encode(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+class ResponseCompressor:
+    """Negotiates gzip or brotli (when the brotli package is installed) for large responses.
+
+    Bodies under min_bytes are sent as is: below a few kilobytes the
+    compression CPU costs more than the bytes it saves. Streams are always
+    compressed when the client accepts it, since their size is unknown.
+    """
+
+    def __init__(self, enabled: bool = True, min_bytes: int = 4096, gzip_level: int = 5, brotli_quality: int = 4):
+        self.enabled = enabled
+        self.min_bytes = min_bytes
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    @classmethod
+    def from_env(cls) -> "ResponseCompressor":
+        return cls(
+            enabled=os.getenv('RESPONSE_COMPRESSION', 'true').lower() == 'true',
+            min_bytes=int(os.getenv('RESPONSE_COMPRESSION_MIN_BYTES', '4096')),
+            gzip_level=int(os.getenv('RESPONSE_GZIP_LEVEL', '5')),
+            brotli_quality=int(os.getenv('RESPONSE_BROTLI_QUALITY', '4'))
+        )
+
+    def negotiate(self, request: Request) -> Optional[str]:
+        """Preferred encoding the client accepts, brotli winning ties; None for identity"""
+        if not self.enabled:
+            return None
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        wildcard = accepted.get("*", 0.0)
+        candidates = [("br", accepted.get("br", wildcard))] if brotli is not None else []
+        candidates.append(("gzip", accepted.get("gzip", wildcard)))
+        encoding, quality = max(candidates, key=lambda candidate: candidate[1])
+        return encoding if quality > 0 else None
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+        return compressor.compress(body) + compressor.flush()
+
+    def response(self, request: Request, body: Union[bytes, str], media_type: str = "application/json",
+                 status_code: int = 200) -> Response:
+        """Response for a pre-encoded body, compressed if it is large and the client accepts it"""
+        if isinstance(body, str):
+            body = body.encode()
+        headers = {"Vary": "Accept-Encoding"} if self.enabled else {}
+        encoding = self.negotiate(request) if len(body) >= self.min_bytes else None
+        if encoding is not None:
+            body = self.compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
+
+    def json_response(self, request: Request, content: Any, status_code: int = 200) -> Response:
+        return self.response(request, dumps(content), status_code=status_code)
+
+    def stream(self, request: Request, chunks: AsyncIterator[Union[bytes, str]],
+               headers: Dict[str, str]) -> AsyncIterator[bytes]:
+        """Compress a streamed body if the client accepts it; sets Content-Encoding in headers"""
+        encoding = self.negotiate(request)
+        if self.enabled:
+            headers["Vary"] = "Accept-Encoding"
+        if encoding is None:
+            return chunks
+        headers["Content-Encoding"] = encoding
+        return self._encode_stream(chunks, StreamEncoder(encoding, self.gzip_level, self.brotli_quality))
+
+    async def _encode_stream(self, chunks: AsyncIterator[Union[bytes, str]], encoder: StreamEncoder) -> AsyncIterator[bytes]:
+        async for chunk in chunks:
+            yield encoder.encode(chunk.encode() if isinstance(chunk, str) else chunk)
+        yield encoder.finish()
@@ -0,0 +1,73 @@
+from typing import List, Dict, Any, Optional, Iterable
+from datetime import datetime
+import os
+import logging
+
+from services.conversation_store import is_uuid
+from services.write_behind import WriteBehindQueue
+
+logger = logging.getLogger(__name__)
+
+class ResultRecorder:
+    """Queues generated recommendations, career matches and forecasts for persistence.
+
+    Rows only go onto the write-behind queue here; content is serialized
+    and written by the queue's background flush, off the request path.
+    The flush also checks user IDs against users and writes unknown ones
+    as NULL, so nothing here waits on the database.
+    """
+
+    def __init__(self, writer: WriteBehindQueue):
+        self.writer = writer
+
+    @classmethod
+    def from_env(cls, writer: Optional[WriteBehindQueue]) -> Optional["ResultRecorder"]:
+        if writer is None or os.getenv('RECOMMENDATION_PERSIST', 'false').lower() != 'true':
+            return None
+        return cls(writer)
+
+    def _user_id(self, user_id: Any) -> Optional[str]:
+        # Only users-table IDs can be stored; anything else is recorded anonymously
+        return str(user_id) if user_id and is_uuid(user_id) else None
+
+    def recommendations(self, user_id: Any, recommendations: Iterable[Dict[str, Any]]):
+        created_at = datetime.utcnow()
+        user_id = self._user_id(user_id)
+        for recommendation in recommendations:
+            self.writer.enqueue("recommendations", (
+                user_id,
+                recommendation.get("type", "career_guidance"),
+                recommendation,
+                recommendation.get("priority", "medium"),
+                created_at
+            ))
+
+    def career_matches(self, user_id: Any, profile: Dict[str, Any], matches: List[Dict[str, Any]]):
+        if not matches:
+            return
+        content = {
+            **profile,
+            "matches": [
+                {
+                    "career_path_id": match["career_path"]["id"],
+                    "match_score": match["match_score"],
+                    "match_reasons": match["match_reasons"]
+                }
+                for match in matches
+            ]
+        }
+        self.writer.enqueue("recommendations", (
+            self._user_id(user_id), "career_match", content, "medium", datetime.utcnow()
+        ))
+
+    def career_forecasts(self, user_id: Any, forecasts: List[Dict[str, Any]]):
+        # Forecasts are memoized and identical for everyone in a profile
+        # bucket, so only those requested for a user are worth a row
+        user_id = self._user_id(user_id)
+        if user_id is None:
+            return
+        created_at = datetime.utcnow()
+        for forecast in forecasts:
+            self.writer.enqueue("career_forecasts", (
+                user_id, forecast["career_path_id"], forecast, forecast["service_years"], created_at
+            ))
@@ -0,0 +1,180 @@
+from typing import List, Dict, Tuple, Iterable, Optional
+import hashlib
+import os
+import re
+import tempfile
+import zlib
+import logging
+
+import numpy as np
+
+from services.message_matcher import MessageMatcher
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+&'-]*")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can do for from have i i'm im in into is it its like love me my of on or
+our so that the their them they this to up us want was we what with would you your
+""".split())
+
+_SUFFIXES = ("ations", "ation", "ings", "ing", "ers", "er", "ies", "es", "ed", "ly", "s")
+
+def _stem(word: str) -> str:
+    """Crude suffix stripping so fixing/fixes/fixed share a feature"""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+class HashedNgramEncoder:
+    """Dependency-free text encoder: hashed word, bigram, trigram and concept features.
+
+    Words are lowercased, stopword-filtered and stemmed; character trigrams
+    give partial credit for related word forms; the chat interest
+    vocabulary adds concept features, so "fixing" and "repair" both land on
+    the mechanics concept. Features are hashed into a fixed-size signed
+    vector and L2-normalized.
+    """
+
+    WORD_WEIGHT = 1.0
+    BIGRAM_WEIGHT = 0.5
+    TRIGRAM_WEIGHT = 0.3
+    CONCEPT_WEIGHT = 1.5
+
+    def __init__(self, dim: int = 1024, matcher: Optional[MessageMatcher] = None):
+        self.dim = dim
+        self.matcher = matcher or MessageMatcher()
+
+    @property
+    def name(self) -> str:
+        return f"hashed-{self.dim}-v1"
+
+    def _features(self, text: str) -> Dict[str, float]:
+        features: Dict[str, float] = {}
+
+        def add(feature: str, weight: float):
+            features[feature] = features.get(feature, 0.0) + weight
+
+        words = [_stem(word) for word in _WORD.findall(text.lower()) if word not in STOPWORDS]
+        for word in words:
+            add(f"w:{word}", self.WORD_WEIGHT)
+            padded = f"<{word}>"
+            trigrams = [padded[i:i + 3] for i in range(len(padded) - 2)]
+            for trigram in trigrams:
+                add(f"c:{trigram}", self.TRIGRAM_WEIGHT / len(trigrams))
+        for first, second in zip(words, words[1:]):
+            add(f"b:{first}_{second}", self.BIGRAM_WEIGHT)
+        for concept in self.matcher.scan(text).interests:
+            add(f"k:{concept}", self.CONCEPT_WEIGHT)
+        return features
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text).items():
+                digest = zlib.crc32(feature.encode())
+                sign = 1.0 if digest & 0x80000000 else -1.0
+                matrix[row, digest % self.dim] += sign * weight
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+class SentenceTransformerEncoder:
+    """Local sentence-transformers model, used when SEMANTIC_ENCODER names one"""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name, device="cpu")
+
+    @property
+    def name(self) -> str:
+        return "st-" + re.sub(r"[^A-Za-z0-9]+", "-", self.model_name)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.model.encode(texts, normalize_embeddings=True), dtype=np.float32)
+
+def encoder_from_env():
+    """Build the encoder named by SEMANTIC_ENCODER, falling back to hashed n-grams"""
+    name = os.getenv('SEMANTIC_ENCODER', 'hashed')
+    if name != 'hashed':
+        try:
+            return SentenceTransformerEncoder(name)
+        except Exception as e:
+            logger.warning(f"Could not load encoder {name} ({str(e)}) - using hashed n-grams")
+    return HashedNgramEncoder(dim=int(os.getenv('SEMANTIC_DIM', '1024')))
+
+def career_document(career) -> str:
+    """Text embedded for a career: title, description, keywords and civilian job titles"""
+    parts = [career.title, career.description, " ".join(career.match_keywords)]
+    parts.extend(career.civilian_translation.get("job_titles", []))
+    return ". ".join(part for part in parts if part)
+
+class SemanticIndex:
+    """Brute-force cosine top-k over a float32 embedding matrix.
+
+    The matrix is written once per catalog content and encoder to
+    SEMANTIC_INDEX_DIR and memory-mapped, so restarts and worker processes
+    share the page cache instead of re-encoding. Rows are unit length, so
+    similarity is one matrix-vector product.
+    """
+
+    MAX_QUERY_CACHE = 10000
+
+    def __init__(self, matrix: np.ndarray, encoder):
+        self.matrix = matrix
+        self.encoder = encoder
+        self._queries: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def build(cls, careers: Iterable, encoder, cache_dir: Optional[str] = None) -> "SemanticIndex":
+        documents = [career_document(career) for career in careers]
+        cache_dir = cache_dir or os.getenv(
+            'SEMANTIC_INDEX_DIR', os.path.join(tempfile.gettempdir(), 'ai-engine-semantic')
+        )
+        digest = hashlib.sha1("\n".join(documents).encode()).hexdigest()[:16]
+        path = os.path.join(cache_dir, f"{encoder.name}-{digest}.npy")
+
+        if not os.path.exists(path):
+            matrix = encoder.encode(documents) if documents else np.zeros((0, 1), dtype=np.float32)
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                # Write then rename so concurrent builders never map a partial file
+                fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".npy")
+                with os.fdopen(fd, "wb") as f:
+                    np.save(f, matrix)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning(f"Could not write semantic index to {path}: {str(e)} - keeping it in memory")
+                return cls(matrix, encoder)
+            logger.info(f"Built semantic index for {len(documents)} careers at {path}")
+
+        return cls(np.load(path, mmap_mode="r"), encoder)
+
+    def query_vector(self, text: str) -> np.ndarray:
+        vector = self._queries.get(text)
+        if vector is None:
+            vector = self.encoder.encode([text])[0]
+            if len(self._queries) >= self.MAX_QUERY_CACHE:
+                self._queries.clear()
+            self._queries[text] = vector
+        return vector
+
+    def similarities(self, text: str) -> np.ndarray:
+        """Cosine similarity of the text to every career"""
+        if len(self.matrix) == 0:
+            return np.zeros(0, dtype=np.float32)
+        return self.matrix @ self.query_vector(text)
+
+    def top_k(self, similarities: np.ndarray, k: int, min_similarity: float) -> List[Tuple[int, float]]:
+        """(position, similarity) pairs at or above min_similarity, best first"""
+        eligible = np.flatnonzero(similarities >= min_similarity)
+        if eligible.size > k:
+            eligible = eligible[np.argpartition(-similarities[eligible], k - 1)[:k]]
+        return sorted(
+            ((int(position), float(similarities[position])) for position in eligible),
+            key=lambda item: (-item[1], item[0])
+        )
@@ -0,0 +1,47 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable
+import asyncio
+import logging
+
+from services.metrics import SINGLE_FLIGHT_WAITERS, SINGLE_FLIGHT_COALESCED, SINGLE_FLIGHT_LEADERS
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution.
+
+    The first caller for a key starts the work as its own task; callers that
+    arrive while it is running await the same result (or exception). A
+    cancelled caller never cancels the shared work for the others. Nothing
+    is remembered once the call completes - this is not a cache.
+    """
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._in_flight.get(key)
+        if task is not None:
+            SINGLE_FLIGHT_COALESCED.labels(self.operation).inc()
+            waiters = SINGLE_FLIGHT_WAITERS.labels(self.operation)
+            waiters.inc()
+            try:
+                return await asyncio.shield(task)
+            finally:
+                waiters.dec()
+
+        SINGLE_FLIGHT_LEADERS.labels(self.operation).inc()
+        task = asyncio.ensure_future(fn())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._forget(key, task))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Retrieve the exception so it is not reported as unhandled when every caller went away
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
@@ -0,0 +1,92 @@
+from typing import List, Dict, Tuple, Optional
+import logging
+
+import numpy as np
+
+from services.keyword_index import KeywordIndex
+
+logger = logging.getLogger(__name__)
+
+class VectorScorer:
+    """Scores a whole catalog with NumPy instead of per-career Python loops.
+
+    Each term is encoded as a sparse indicator vector over career positions
+    (the postings from the keyword index). Interest and skill hit counts for
+    every career are a single ``bincount`` over the concatenated postings,
+    the weighted score is one vectorized expression, and the top k are
+    selected with ``argpartition`` rather than sorting every row.
+    """
+
+    MAX_TERM_CACHE = 10000
+
+    def __init__(self, keyword_index: KeywordIndex, career_count: int):
+        self.keyword_index = keyword_index
+        self.career_count = career_count
+        self._term_vectors: Dict[str, np.ndarray] = {}
+
+    def term_vector(self, term: str) -> np.ndarray:
+        """Sparse encoding of a term: sorted positions of matching careers"""
+        key = term.lower()
+        vector = self._term_vectors.get(key)
+        if vector is None:
+            vector = np.fromiter(sorted(self.keyword_index.match_term(key)), dtype=np.int32)
+            if len(self._term_vectors) >= self.MAX_TERM_CACHE:
+                self._term_vectors.clear()
+            self._term_vectors[key] = vector
+        return vector
+
+    def hit_counts(self, terms: List[str], eligible: Optional[np.ndarray] = None) -> np.ndarray:
+        """Number of terms matching each career, as a dense vector.
+
+        With an eligible mask, postings of other careers are dropped before
+        counting and those careers count zero.
+        """
+        if not terms:
+            return np.zeros(self.career_count, dtype=np.float64)
+        postings = np.concatenate([self.term_vector(term) for term in terms])
+        if eligible is not None:
+            postings = postings[eligible[postings]]
+        return np.bincount(postings, minlength=self.career_count).astype(np.float64)
+
+    def scores(self, interests: List[str], skills: List[str],
+               interest_weight: float = 0.7, skill_weight: float = 0.3,
+               eligible: Optional[np.ndarray] = None) -> np.ndarray:
+        """Weighted match score for every career in the catalog (zero outside eligible)"""
+        scores = np.zeros(self.career_count, dtype=np.float64)
+        if interests:
+            scores += np.minimum(self.hit_counts(interests, eligible) / len(interests), 1.0) * interest_weight
+        if skills:
+            scores += np.minimum(self.hit_counts(skills, eligible) / len(skills), 1.0) * skill_weight
+        return np.minimum(scores, 1.0)
+
+    def top_k(self, interests: List[str], skills: List[str], k: int = 5, threshold: float = 0.3,
+              interest_weight: float = 0.7, skill_weight: float = 0.3,
+              eligible: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """Return up to k (position, score) pairs above the threshold, best first.
+
+        Ordering matches the keyword path: descending by score rounded to two
+        decimals, ties broken by catalog position. With an eligible mask only
+        those careers are returned.
+        """
+        if self.career_count == 0 or k <= 0:
+            return []
+
+        scores = self.scores(interests, skills, interest_weight, skill_weight, eligible)
+        passing = scores > threshold
+        if eligible is not None:
+            passing &= eligible
+        candidates = np.flatnonzero(passing)
+        if candidates.size == 0:
+            return []
+
+        if candidates.size > k:
+            candidate_scores = scores[candidates]
+            kth = candidate_scores[np.argpartition(-candidate_scores, k - 1)[k - 1]]
+            # Keep anything that could round to the same value as the kth score
+            candidates = candidates[candidate_scores >= kth - 0.01]
+
+        ranked = sorted(
+            ((int(position), float(scores[position])) for position in candidates),
+            key=lambda item: (-round(item[1], 2), item[0])
+        )
+        return ranked[:k]
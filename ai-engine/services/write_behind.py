@@ -0,0 +1,213 @@
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Set
+from collections import deque
+import asyncio
+import os
+import logging
+
+from services.database import Database, TableSpec, get_database
+
+logger = logging.getLogger(__name__)
+
+CONVERSATIONS = TableSpec("conversations", ("id",), skip_conflicts=True)
+MESSAGES = TableSpec("messages", ("conversation_id", "role", "content", "created_at"))
+RECOMMENDATIONS = TableSpec(
+    "recommendations", ("user_id", "recommendation_type", "content", "priority", "created_at"),
+    json_columns=("content",), optional_references=(("user_id", "users"),)
+)
+CAREER_FORECASTS = TableSpec(
+    "career_forecasts", ("user_id", "career_path_id", "forecast_data", "service_years", "created_at"),
+    json_columns=("forecast_data",), optional_references=(("user_id", "users"),)
+)
+
+class WriteBehindQueue:
+    """Bounded in-memory queue of rows flushed to the database in batches.
+
+    Request handlers only append to the queue; a background task writes up
+    to batch_size rows at a time, grouped per table (in the order tables
+    were given, so parents land before children) in one transaction:
+    COPY for append-only tables on Postgres, multi-row INSERT otherwise.
+    A failed batch is put back and retried up to max_retries times; after
+    that its rows are written one at a time, and rows the database rejects
+    as invalid (constraint or data errors) are dropped and counted as dead
+    letters so they cannot block everything queued behind them. When
+    max_pending rows are waiting, new rows are dropped rather than growing
+    without bound. Everything still queued is flushed on stop().
+    """
+
+    MAX_LOOKUP_IDS = 1000
+
+    def __init__(self, database: Database, tables: Iterable[TableSpec], batch_size: int = 500,
+                 flush_interval_seconds: float = 1.0, max_pending: int = 50000, max_retries: int = 3):
+        self.database = database
+        self.tables = {table.name: table for table in tables}
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.written: Dict[str, int] = {name: 0 for name in self.tables}
+        self.dropped = 0
+        self.write_errors = 0
+        self.dead_lettered = 0
+        self._batch_failures = 0
+        self._queue: "deque[Tuple[str, tuple]]" = deque()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls, tables: Iterable[TableSpec] = (CONVERSATIONS, MESSAGES, RECOMMENDATIONS, CAREER_FORECASTS)) -> Optional["WriteBehindQueue"]:
+        """Queue writing to DATABASE_URL, or None when no database is configured"""
+        url = os.getenv('DATABASE_URL')
+        if not url:
+            return None
+        return cls(
+            get_database(url),
+            tables,
+            batch_size=int(os.getenv('WRITE_BEHIND_BATCH_SIZE', '500')),
+            flush_interval_seconds=float(os.getenv('WRITE_BEHIND_INTERVAL_SECONDS', '1')),
+            max_pending=int(os.getenv('WRITE_BEHIND_MAX_PENDING', '50000')),
+            max_retries=int(os.getenv('WRITE_BEHIND_MAX_RETRIES', '3'))
+        )
+
+    def enqueue(self, table: str, row: tuple) -> bool:
+        """Queue one row; False if the queue is full and the row was dropped"""
+        if len(self._queue) >= self.max_pending:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(f"Write-behind queue full - dropped {self.dropped} rows so far")
+            return False
+        self._queue.append((table, row))
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            # Let a flush in progress finish rather than cancelling it with
+            # its batch already taken off the queue
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        failures = 0
+        while self._queue:
+            if await self.flush():
+                failures = 0
+                continue
+            failures += 1
+            if failures > self.max_retries:
+                logger.error(f"Write-behind shutdown flush failed - {len(self._queue)} rows not persisted")
+                break
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._queue and not self._stopping:
+                if not await self.flush():
+                    break
+
+    async def flush(self) -> bool:
+        """Write one batch; on failure the batch is put back for the next attempt.
+
+        After max_retries consecutive failures the batch is written row by
+        row to isolate the rows the database rejects.
+        """
+        batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+        if not batch:
+            return True
+
+        try:
+            await self._write(batch)
+        except Exception as e:
+            self.write_errors += 1
+            self._batch_failures += 1
+            logger.error(f"Write-behind flush error: {str(e)}")
+            if self._batch_failures <= self.max_retries:
+                self._queue.extendleft(reversed(batch))
+                return False
+            self._batch_failures = 0
+            return await self._write_rows(batch)
+
+        self._batch_failures = 0
+        return True
+
+    async def _write(self, batch: List[Tuple[str, tuple]]):
+        rows: Dict[str, List[tuple]] = {name: [] for name in self.tables}
+        for table, row in batch:
+            rows[table].append(row)
+        await self._drop_missing_references(rows)
+        await self.database.write_batch([
+            (table, table.encode(rows[name])) for name, table in self.tables.items() if rows[name]
+        ])
+        for name, table_rows in rows.items():
+            self.written[name] += len(table_rows)
+
+    async def _drop_missing_references(self, rows: Dict[str, List[tuple]]):
+        """Null optional references to ids that do not exist, so the foreign key cannot reject the batch"""
+        wanted: Dict[str, Set[str]] = {}
+        for name, table in self.tables.items():
+            for column, target in table.optional_references:
+                position = table.columns.index(column)
+                wanted.setdefault(target, set()).update(
+                    str(row[position]) for row in rows[name] if row[position] is not None
+                )
+
+        existing = {target: await self._existing_ids(target, ids) for target, ids in wanted.items()}
+        for name, table in self.tables.items():
+            for column, target in table.optional_references:
+                position = table.columns.index(column)
+                rows[name] = [
+                    row if row[position] is None or str(row[position]) in existing[target]
+                    else row[:position] + (None,) + row[position + 1:]
+                    for row in rows[name]
+                ]
+
+    async def _existing_ids(self, table: str, ids: Set[str]) -> Set[str]:
+        found: Set[str] = set()
+        ids = sorted(ids)
+        for start in range(0, len(ids), self.MAX_LOOKUP_IDS):
+            chunk = ids[start:start + self.MAX_LOOKUP_IDS]
+            placeholders = ", ".join(f"${i + 1}" for i in range(len(chunk)))
+            found.update(
+                str(row["id"]) for row in await self.database.fetch(
+                    f"SELECT id FROM {table} WHERE id IN ({placeholders})", *chunk
+                )
+            )
+        return found
+
+    async def _write_rows(self, batch: List[Tuple[str, tuple]]) -> bool:
+        """Write a failing batch one row at a time, dead-lettering rows the database rejects.
+
+        Any other error (the database being unreachable) puts the unwritten
+        rows back and ends the attempt.
+        """
+        for index, (table, row) in enumerate(batch):
+            try:
+                await self._write([(table, row)])
+            except Exception as e:
+                if not self.database.is_data_error(e):
+                    self.write_errors += 1
+                    logger.error(f"Write-behind flush error: {str(e)}")
+                    self._queue.extendleft(reversed(batch[index:]))
+                    return False
+                self.dead_lettered += 1
+                logger.error(f"Write-behind dropped a {table} row the database rejected: {str(e)}")
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._queue),
+            "written_total": sum(self.written.values()),
+            "dropped_total": self.dropped,
+            "dead_lettered_total": self.dead_lettered,
+            "write_errors": self.write_errors
+        }
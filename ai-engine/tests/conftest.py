@@ -0,0 +1,22 @@
+import os
+import time
+
+import pytest
+
+# The engine under test runs on its fallbacks: no OpenAI key, no database
+os.environ.pop("OPENAI_API_KEY", None)
+os.environ.pop("DATABASE_URL", None)
+os.environ.pop("REDIS_URL", None)
+os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    import main
+
+    with TestClient(main.app) as test_client:
+        # Startup finishes in the background; tests start once it has
+        deadline = time.monotonic() + 60
+        while not main.services_ready.is_set() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        yield test_client
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from services.backpressure import AdmissionRejected, CircuitBreaker
+from services.chat_service import ChatService
+
+def half_open_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker(min_calls=1, open_seconds=0)
+    breaker.record(False, 0.0)
+    assert breaker.state == CircuitBreaker.OPEN
+    return breaker
+
+def test_before_call_reports_whether_it_took_the_probe():
+    assert CircuitBreaker().before_call() is False
+
+    breaker = half_open_breaker()
+    assert breaker.before_call() is True
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(AdmissionRejected):
+        breaker.before_call()
+
+def test_probe_is_released_when_setup_fails_after_admission(monkeypatch):
+    service = ChatService()
+    service.breaker = half_open_breaker()
+
+    def failing_connect():
+        raise RuntimeError("SDK import failed")
+
+    monkeypatch.setattr(service, "connect", failing_connect)
+
+    async def run():
+        async with service._llm_call("completion"):
+            pass
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+    assert service.llm_queued == 0
+    # The probe slot is free again for the next call
+    assert service.breaker.before_call() is True
+
+def test_unrecorded_call_does_not_release_another_calls_probe():
+    service = ChatService()
+    service.client = object()
+    breaker = service.breaker = CircuitBreaker(min_calls=1, open_seconds=0)
+
+    async def run():
+        entered = asyncio.Event()
+
+        async def in_flight():
+            async with service._llm_call("completion"):
+                entered.set()
+                await asyncio.sleep(30)
+
+        task = asyncio.create_task(in_flight())
+        await entered.wait()
+        # Meanwhile the breaker trips and another call takes the half-open probe
+        breaker.record(False, 0.0)
+        assert breaker.before_call() is True
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run())
+    with pytest.raises(AdmissionRejected):
+        breaker.before_call()
@@ -0,0 +1,26 @@
+from services.career_matcher import CareerMatcher
+
+def semantic_matcher(monkeypatch, threshold):
+    monkeypatch.setenv('CAREER_SCORING_MODE', 'semantic')
+    monkeypatch.setenv('SEMANTIC_ENCODER', 'hashed')
+    monkeypatch.setenv('CAREER_SEMANTIC_MIN_SIMILARITY', '0')
+    monkeypatch.setenv('CAREER_MATCH_THRESHOLD', threshold)
+    return CareerMatcher()
+
+def test_similarity_only_careers_must_clear_the_match_threshold(monkeypatch):
+    matcher = semantic_matcher(monkeypatch, '0.3')
+    interests = ["airplane engines"]
+    keyword_scores = matcher.snapshot.vector_scorer.scores(interests, [], matcher.interest_weight,
+                                                           matcher.skill_weight, None)
+    assert not keyword_scores.any()
+
+    ranked = matcher._rank_semantic(matcher.snapshot, interests, [])
+    assert ranked
+    assert all(score > matcher.min_match_score for _, score, _ in ranked)
+    assert len(ranked) < len(semantic_matcher(monkeypatch, '-1')._rank_semantic(matcher.snapshot, interests, []))
+
+def test_semantic_mode_keeps_keyword_matches(monkeypatch):
+    matcher = semantic_matcher(monkeypatch, '0.3')
+    ranked = matcher._rank_semantic(matcher.snapshot, ["helping people"], [])
+    assert matcher.career_database[ranked[0][0]].title == "Combat Medic / Healthcare Specialist"
+    assert ranked[0][1] > 0.7
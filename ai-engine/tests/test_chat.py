@@ -0,0 +1,25 @@
+import main
+
+def test_chat_stays_stateless_unless_a_conversation_is_started(client):
+    stateless = client.post("/chat", json={"message": "I like computers"})
+    started = client.post("/chat", json={"message": "I like computers", "start_conversation": True})
+
+    assert stateless.status_code == started.status_code == 200
+    assert stateless.json()["conversation_id"] is None
+    assert started.json()["conversation_id"]
+
+def test_chat_scans_the_message_once(client, monkeypatch):
+    matcher = main.chat_service.message_matcher
+    scan = matcher.scan
+    scanned = []
+
+    def counting_scan(message):
+        scanned.append(message)
+        return scan(message)
+
+    monkeypatch.setattr(matcher, "scan", counting_scan)
+    response = client.post("/chat", json={"message": "I worked on aircraft engines and like computers"})
+
+    assert response.status_code == 200
+    assert response.json()["career_paths"]
+    assert scanned == ["I worked on aircraft engines and like computers"]
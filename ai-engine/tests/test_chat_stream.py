@@ -0,0 +1,34 @@
+import asyncio
+
+import main
+
+def test_disconnecting_mid_stream_cancels_guidance(client, monkeypatch):
+    guidance = {}
+    recorded = []
+
+    async def slow_guidance(request, signals, timings=None):
+        guidance["started"] = True
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            guidance["cancelled"] = True
+            raise
+        return [], []
+
+    monkeypatch.setattr(main, "build_career_guidance", slow_guidance)
+    monkeypatch.setattr(main, "record_guidance", lambda *args: recorded.append(args))
+
+    async def run():
+        response = await main.chat_stream_endpoint(main.ChatRequest(message="I like computers"))
+        stream = response.body_iterator
+        first = await stream.__anext__()
+        await asyncio.sleep(0)
+        # What the server does when the client goes away
+        await stream.aclose()
+        await asyncio.sleep(0)
+        return first, dict(guidance)
+
+    first, state = asyncio.run(run())
+    assert first.startswith("event: token")
+    assert state == {"started": True, "cancelled": True}
+    assert recorded == []
@@ -0,0 +1,67 @@
+import asyncio
+from datetime import datetime
+
+from services.context_builder import ContextBuilder, ConversationSummary, DatabaseSummaryStore
+from services.database import SqliteDatabase
+from services.write_behind import WriteBehindQueue, CONVERSATIONS, MESSAGES
+
+CONVERSATION_ID = "33333333-3333-4333-8333-333333333333"
+
+def test_summary_saved_before_the_conversation_row_is_flushed_survives_a_restart(tmp_path):
+    path = str(tmp_path / "engine.db")
+
+    async def run():
+        database = SqliteDatabase(path)
+        queue = WriteBehindQueue(database, (CONVERSATIONS, MESSAGES))
+        queue.enqueue("conversations", (CONVERSATION_ID,))
+        queue.enqueue("messages", (CONVERSATION_ID, "user", "hello", datetime.utcnow()))
+
+        # The summary lands while the conversation row is still queued
+        await DatabaseSummaryStore(database).put(CONVERSATION_ID, ConversationSummary(text="likes aviation", covered=4))
+        assert await queue.flush()
+        await database.close()
+
+        # A fresh store, as after a restart, reads it back from the database
+        restarted = SqliteDatabase(path)
+        summary = await DatabaseSummaryStore(restarted).get(CONVERSATION_ID)
+        messages = await restarted.fetch("SELECT COUNT(*) AS n FROM messages")
+        await restarted.close()
+        return summary, messages[0]["n"]
+
+    summary, messages = asyncio.run(run())
+    assert (summary.text, summary.covered) == ("likes aviation", 4)
+    assert messages == 1
+
+class RecordingSummarizer:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, previous, turns):
+        self.calls.append(list(turns))
+        return f"{len(turns)} earlier turns"
+
+HISTORY = [{"role": "user" if i % 2 == 0 else "assistant", "content": f"turn {i} " + "word " * 40}
+           for i in range(10)]
+
+def build_context(conversation_id):
+    summarizer = RecordingSummarizer()
+    builder = ContextBuilder(summarizer, token_budget=300, reply_tokens=50)
+
+    async def run():
+        messages = await builder.build("system", HISTORY, "next question", conversation_id=conversation_id)
+        await asyncio.gather(*builder._pending.values())
+        return messages, await builder.summary_store.get(CONVERSATION_ID)
+
+    messages, summary = asyncio.run(run())
+    return summarizer, messages, summary
+
+def test_stateless_requests_drop_old_turns_without_summarizing():
+    summarizer, messages, summary = build_context(None)
+    assert len(messages) < len(HISTORY) + 2
+    assert summarizer.calls == []
+    assert summary is None
+
+def test_conversations_with_an_id_are_summarized():
+    summarizer, messages, summary = build_context(CONVERSATION_ID)
+    assert len(summarizer.calls) == 1
+    assert summary.covered == len(HISTORY) - (len(messages) - 2)
@@ -0,0 +1,24 @@
+import asyncio
+
+from services.career_matcher import CareerMatcher
+from services.facet_index import build_filters
+
+def test_build_filters_normalizes_aliases():
+    assert build_filters("Bachelor's degree", {"branch": ["USAF", "navy"], "service_type": "part-time"}) == (
+        ("branch", ("air force", "navy")),
+        ("service_type", ("national guard", "reserve")),
+        ("education", ("bachelor",)),
+    )
+
+def test_build_filters_ignores_values_that_are_not_strings():
+    assert build_filters(None, {"branch": 5}) == ()
+    assert build_filters(None, {"branch": {"name": "navy"}, "difficulty": True}) == ()
+    assert build_filters(None, {"branch": ["navy", 5, None]}) == (("branch", ("navy",)),)
+    assert build_filters(None, ["navy"]) == ()
+
+def test_matching_with_a_malformed_preference_is_unfiltered():
+    matcher = CareerMatcher()
+    unfiltered = asyncio.run(matcher.find_matching_careers(["technology"], [], None))
+    malformed = asyncio.run(matcher.find_matching_careers(["technology"], [], None, {"branch": 5}))
+    assert malformed == unfiltered
+    assert malformed
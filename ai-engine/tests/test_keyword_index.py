@@ -0,0 +1,20 @@
+from services.career_matcher import CareerMatcher
+from services.keyword_index import KeywordIndex
+
+CAREERS = CareerMatcher().career_database
+
+def titles(index: KeywordIndex, term: str):
+    return sorted(CAREERS[position].title for position in index.match_term(term))
+
+def test_misspelled_terms_match_the_closest_keyword():
+    index = KeywordIndex(CAREERS)
+    assert titles(index, "aviaton") == titles(index, "aviation")
+    assert titles(index, "aviaton")
+
+def test_interest_synonyms_are_off_by_default():
+    assert titles(KeywordIndex(CAREERS), "programming") == []
+
+def test_interest_synonyms_expand_when_enabled():
+    index = KeywordIndex(CAREERS, interest_synonyms=True)
+    assert titles(index, "programming") == titles(index, "technology")
+    assert titles(index, "programming")
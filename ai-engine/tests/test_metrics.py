@@ -0,0 +1,14 @@
+import os
+
+from services import metrics
+
+def test_multiprocess_scrapes_label_worker_stats_with_the_pid(monkeypatch, tmp_path):
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    collector = metrics.StatsCollector("test_queue", "Test queue", lambda: {"pending": 3, "written_total": 7})
+    monkeypatch.setattr(metrics, "_stats_collectors", [collector])
+
+    registry = metrics.multiprocess_registry()
+    pid = str(os.getpid())
+
+    assert registry.get_sample_value("test_queue_pending", {"pid": pid}) == 3
+    assert registry.get_sample_value("test_queue_written_total", {"pid": pid}) == 7
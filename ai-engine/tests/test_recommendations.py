@@ -0,0 +1,44 @@
+import main
+
+class RecordingRecorder:
+    def __init__(self):
+        self.recorded = []
+
+    def recommendations(self, user_id, recommendations):
+        self.recorded.append(recommendations)
+
+def test_recommendations_select_once_and_record_the_same_selection(client, monkeypatch):
+    engine = main.recommendation_engine
+    recorder = RecordingRecorder()
+    calls = []
+    select = engine.select
+
+    def counting_select(interests):
+        calls.append(interests)
+        return select(interests)
+
+    monkeypatch.setattr(engine, "select", counting_select)
+    monkeypatch.setattr(main, "result_recorder", recorder)
+
+    response = client.post("/recommendations", json={"interests": ["technology"]})
+    assert response.status_code == 200
+    assert calls == [["technology"]]
+    assert [item["category"] for item in recorder.recorded[0]] == \
+        [item["category"] for item in response.json()["recommendations"]]
+
+def test_recommendations_fall_back_when_selection_fails(client, monkeypatch):
+    engine = main.recommendation_engine
+    recorder = RecordingRecorder()
+
+    def failing_select(interests):
+        raise RuntimeError("catalog unavailable")
+
+    monkeypatch.setattr(engine, "select", failing_select)
+    monkeypatch.setattr(main, "result_recorder", recorder)
+
+    response = client.post("/recommendations", json={"interests": ["technology"]})
+    assert response.status_code == 200
+    assert response.json()["recommendations"] == [engine.fallback_recommendation.payload | {
+        "timestamp": response.json()["timestamp"]
+    }]
+    assert recorder.recorded == [[engine.fallback_recommendation.payload]]
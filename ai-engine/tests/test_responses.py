@@ -0,0 +1,22 @@
+import main
+from services import responses
+
+def test_fast_json_is_off_by_default():
+    assert responses.FAST_JSON_ENABLED is False
+    assert responses.dumps({"a": 1}) == b'{"a":1}'
+
+def test_chat_is_validated_unless_fast_json_is_enabled(client, monkeypatch):
+    async def process_message(**kwargs):
+        return {"response": "hi", "trigger_recommendations": False, "confidence": "0.5"}
+
+    monkeypatch.setattr(main.chat_service, "process_message", process_message)
+
+    monkeypatch.setattr(main, "FAST_JSON_ENABLED", False)
+    validated = client.post("/chat", json={"message": "hello"})
+    assert validated.json()["confidence"] == 0.5
+    assert "Server-Timing" in validated.headers
+
+    monkeypatch.setattr(main, "FAST_JSON_ENABLED", True)
+    fast = client.post("/chat", json={"message": "hello"})
+    assert fast.json()["confidence"] == "0.5"
+    assert "Server-Timing" in fast.headers
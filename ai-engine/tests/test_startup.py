@@ -0,0 +1,57 @@
+import asyncio
+import gc
+import os
+import pickle
+import subprocess
+import sys
+
+import main
+from services.career_matcher import CareerMatcher
+from services.catalog_artifact import read_artifact, write_artifact
+
+ENGINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_importing_the_app_builds_no_services():
+    script = "import main; assert not main.services_built and main.career_matcher is None"
+    subprocess.run([sys.executable, "-c", script], cwd=ENGINE_DIR, check=True)
+
+def test_workers_keep_the_catalogs_the_master_loaded(client, monkeypatch):
+    started = []
+
+    class Refresher:
+        def start(self, refresh_now=False):
+            started.append(refresh_now)
+
+    def load_artifact():
+        raise AssertionError("the master already loaded the catalogs")
+
+    monkeypatch.setattr(main, "catalogs_loaded", True)
+    monkeypatch.setattr(main, "refreshers", [Refresher(), Refresher()])
+    monkeypatch.setattr(main, "load_catalog_artifact", load_artifact)
+    monkeypatch.setattr(main, "write_behind", None)
+    monkeypatch.setattr(main, "startup_seconds", main.startup_seconds)
+
+    asyncio.run(main.start_services())
+    assert main.startup_error is None
+    assert started == [False, False]
+
+def test_collector_is_frozen_only_after_a_usable_artifact(tmp_path):
+    stale = tmp_path / "stale.artifact"
+    with open(stale, "wb") as f:
+        pickle.dump({"format": -1}, f)
+    corrupt = tmp_path / "corrupt.artifact"
+    corrupt.write_bytes(b"not a pickle")
+    usable = tmp_path / "usable.artifact"
+    write_artifact(CareerMatcher().snapshot, str(usable))
+
+    gc.unfreeze()
+    try:
+        for path in (tmp_path / "missing.artifact", stale, corrupt):
+            assert read_artifact(str(path)) is None
+            assert gc.get_freeze_count() == 0
+            assert gc.isenabled()
+
+        assert read_artifact(str(usable)).careers
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
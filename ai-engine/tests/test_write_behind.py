@@ -0,0 +1,91 @@
+import asyncio
+from datetime import datetime
+
+from services.database import SqliteDatabase
+from services.result_recorder import ResultRecorder
+from services.write_behind import WriteBehindQueue, CONVERSATIONS, MESSAGES, RECOMMENDATIONS, CAREER_FORECASTS
+
+KNOWN_USER = "11111111-1111-4111-8111-111111111111"
+UNKNOWN_USER = "22222222-2222-4222-8222-222222222222"
+
+def make_queue(tmp_path, tables=(CONVERSATIONS, MESSAGES, RECOMMENDATIONS, CAREER_FORECASTS), **kwargs):
+    return WriteBehindQueue(SqliteDatabase(str(tmp_path / "engine.db")), tables, **kwargs)
+
+def test_recorder_enqueues_without_touching_the_database(tmp_path):
+    queue = make_queue(tmp_path)
+    recorder = ResultRecorder(queue)
+
+    assert recorder.recommendations(KNOWN_USER, [{"type": "career_guidance"}]) is None
+    assert queue.stats()["pending"] == 1
+    assert queue.database._connection is None
+
+def test_flush_writes_unknown_user_ids_as_null(tmp_path):
+    async def run():
+        queue = make_queue(tmp_path)
+        await queue.database.execute("INSERT INTO users (id) VALUES ($1)", KNOWN_USER)
+        recorder = ResultRecorder(queue)
+        recorder.recommendations(KNOWN_USER, [{"type": "known"}])
+        recorder.recommendations(UNKNOWN_USER, [{"type": "unknown"}])
+        recorder.recommendations("not-a-uuid", [{"type": "anonymous"}])
+        assert await queue.flush()
+        return await queue.database.fetch(
+            "SELECT recommendation_type, user_id FROM recommendations ORDER BY id"
+        )
+
+    rows = asyncio.run(run())
+    assert [(row["recommendation_type"], row["user_id"]) for row in rows] == [
+        ("known", KNOWN_USER), ("unknown", None), ("anonymous", None)
+    ]
+
+class SlowDatabase(SqliteDatabase):
+    """Holds every batch long enough for stop() to arrive mid-write"""
+
+    async def write_batch(self, batches):
+        await asyncio.sleep(0.05)
+        await super().write_batch(batches)
+
+def test_stop_during_a_flush_loses_no_rows(tmp_path):
+    async def run():
+        queue = WriteBehindQueue(SlowDatabase(str(tmp_path / "engine.db")), (CONVERSATIONS,),
+                                 batch_size=2, flush_interval_seconds=0.01)
+        for i in range(5):
+            queue.enqueue("conversations", (f"c{i}",))
+        queue.start()
+        await asyncio.sleep(0.02)
+        await queue.stop()
+        return queue, await queue.database.fetch("SELECT COUNT(*) AS n FROM conversations")
+
+    queue, rows = asyncio.run(run())
+    assert rows[0]["n"] == 5
+    assert queue.stats()["pending"] == 0
+
+def test_a_rejected_row_is_dead_lettered_after_the_retries(tmp_path):
+    async def run():
+        queue = make_queue(tmp_path, tables=(CONVERSATIONS, MESSAGES), max_retries=2)
+        queue.enqueue("conversations", ("c1",))
+        queue.enqueue("messages", ("c1", "user", "hello", datetime.utcnow()))
+        queue.enqueue("messages", ("c1", "narrator", "rejected by the role check", datetime.utcnow()))
+        results = [await queue.flush() for _ in range(3)]
+        return queue, results, await queue.database.fetch("SELECT content FROM messages")
+
+    queue, results, rows = asyncio.run(run())
+    assert results == [False, False, True]
+    assert [row["content"] for row in rows] == ["hello"]
+    stats = queue.stats()
+    assert (stats["pending"], stats["dead_lettered_total"], stats["write_errors"]) == (0, 1, 3)
+
+class UnreachableDatabase(SqliteDatabase):
+    async def write_batch(self, batches):
+        raise ConnectionError("database is unreachable")
+
+def test_an_outage_keeps_the_rows_queued(tmp_path):
+    async def run():
+        queue = WriteBehindQueue(UnreachableDatabase(str(tmp_path / "engine.db")), (CONVERSATIONS,), max_retries=1)
+        queue.enqueue("conversations", ("c1",))
+        queue.enqueue("conversations", ("c2",))
+        return queue, [await queue.flush() for _ in range(4)]
+
+    queue, results = asyncio.run(run())
+    assert not any(results)
+    assert queue.stats()["pending"] == 2
+    assert queue.stats()["dead_lettered_total"] == 0
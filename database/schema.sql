@@ -58,7 +58,9 @@ CREATE TABLE conversations (
     title VARCHAR(200),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    is_active BOOLEAN DEFAULT TRUE
+    is_active BOOLEAN DEFAULT TRUE,
+    context_summary TEXT, -- Rolling summary of turns that no longer fit the prompt budget
+    context_summary_message_count INTEGER DEFAULT 0 -- Number of leading messages the summary covers
 );
 
 -- Messages table